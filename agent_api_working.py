@@ -8,8 +8,7 @@ import time
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, Set, List
-from queue import Queue
+from typing import Optional, Dict, Any, List
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
@@ -21,6 +20,8 @@ from browser_use import Agent, Controller, ActionResult
 from browser_use.browser.profile import BrowserProfile
 from browser_use.agent.views import AgentOutput, BrowserStateHistory, AgentStepInfo
 from browser_use.browser.views import BrowserStateSummary
+from utils.scheduler import AgentScheduler, QueueFullError, ScheduledJob
+from utils.broadcaster import LogBroadcaster
 
 load_dotenv()
 
@@ -28,9 +29,9 @@ load_dotenv()
 class StreamingLogHandler(logging.Handler):
     """Custom log handler that captures logs and queues them for streaming"""
     
-    def __init__(self, log_queue: Queue):
+    def __init__(self, broadcaster: LogBroadcaster):
         super().__init__()
-        self.log_queue = log_queue
+        self.broadcaster = broadcaster
     
     def emit(self, record):
         try:
@@ -50,8 +51,8 @@ class StreamingLogHandler(logging.Handler):
                 }
             }
             
-            # Add to queue for streaming
-            self.log_queue.put(('log', log_message))
+            # Push straight to connected clients
+            self.broadcaster.publish('log', log_message)
             
         except Exception:
             # Handle errors in log handler silently to avoid recursion
@@ -87,16 +88,14 @@ class AgentStepData(BaseModel):
     model_output: Optional[dict] = None
 
 # Global log streaming state
-log_queue: Queue = Queue()
-active_connections: Set[WebSocket] = set()
-session_connections: Dict[str, Set[WebSocket]] = {}  # session_id -> set of websockets
+broadcaster = LogBroadcaster(max_queue_size=int(os.getenv("WS_CLIENT_MAX_QUEUE_SIZE", "500")))
 tracked_agents: Dict[str, AgentStatus] = {}
 
 # Setup streaming logging
 def setup_streaming_logging():
     """Setup logging to capture and stream all log messages"""
     # Create our custom handler
-    streaming_handler = StreamingLogHandler(log_queue)
+    streaming_handler = StreamingLogHandler(broadcaster)
     streaming_handler.setLevel(logging.DEBUG)
     formatter = logging.Formatter('%(levelname)-8s [%(name)s] %(message)s')
     streaming_handler.setFormatter(formatter)
@@ -138,57 +137,6 @@ ACTION_TYPE_ICONS = {
     'HoverAction': '🔍'
 }
 
-# Background task for log broadcasting
-async def broadcast_logs():
-    """Background task to broadcast logs to all connected WebSocket clients"""
-    global log_queue, active_connections, session_connections
-    
-    while True:
-        try:
-            if not log_queue.empty():
-                message_type, data = log_queue.get_nowait()
-                
-                # Extract session_id from data if available
-                session_id = None
-                if isinstance(data, dict):
-                    session_id = data.get('session_id')
-                
-                message = {
-                    "type": message_type,
-                    "data": data
-                }
-                
-                # Broadcast to general connections
-                if active_connections:
-                    disconnected = set()
-                    for connection in active_connections:
-                        try:
-                            await connection.send_text(json.dumps(message, ensure_ascii=False))
-                        except Exception:
-                            disconnected.add(connection)
-                    
-                    # Remove disconnected clients
-                    active_connections -= disconnected
-                
-                # Broadcast to session-specific connections
-                if session_id and session_id in session_connections:
-                    disconnected = set()
-                    for connection in session_connections[session_id]:
-                        try:
-                            await connection.send_text(json.dumps(message, ensure_ascii=False))
-                        except Exception:
-                            disconnected.add(connection)
-                    
-                    # Remove disconnected clients
-                    session_connections[session_id] -= disconnected
-                    if not session_connections[session_id]:
-                        del session_connections[session_id]
-                            
-            await asyncio.sleep(0.1)  # Small delay to prevent CPU spinning
-        except Exception as e:
-            print(f"Error in broadcast_logs: {e}")
-            await asyncio.sleep(1)
-
 def create_step_callback(agent_id: str, session_id: str):
     """Create a callback function for agent steps"""
     
@@ -239,20 +187,20 @@ def create_step_callback(agent_id: str, session_id: str):
                 "session_id": session_id
             }
             
-            # Queue the step data for broadcasting
-            log_queue.put(('agent_step', enhanced_step_data))
+            # Push the step data to connected clients
+            broadcaster.publish('agent_step', enhanced_step_data)
                             
         except Exception as e:
             error_msg = f"❌ Error in step callback for agent {agent_id}: {e}"
             print(error_msg)
-            log_queue.put(('log', {
+            broadcaster.publish('log', {
                 "timestamp": datetime.now().isoformat(),
                 "level": "ERROR",
                 "logger_name": "agent_api",
                 "message": error_msg,
                 "metadata": {"agent_id": agent_id, "error_context": "step_callback"},
                 "session_id": session_id
-            }))
+            })
     
     return step_callback
 
@@ -272,14 +220,14 @@ def create_done_callback(agent_id: str, session_id: str):
                 status_message = f"{status_icon} Agent {agent_id} completed {'successfully' if is_successful else 'with issues'}"
                 
                 # Log completion with icon and metadata
-                log_queue.put(('log', {
+                broadcaster.publish('log', {
                     "timestamp": datetime.now().isoformat(),
                     "level": "INFO",
                     "logger_name": "agent_api",
                     "message": status_message,
                     "metadata": {"agent_id": agent_id, "action": "agent_completion"},
                     "session_id": session_id
-                }))
+                })
                 
                 # Completion data
                 completion_data = {
@@ -292,20 +240,20 @@ def create_done_callback(agent_id: str, session_id: str):
                     "completion_message": status_message
                 }
                 
-                # Queue completion data for broadcasting
-                log_queue.put(('agent_completed', completion_data))
+                # Push completion data to connected clients
+                broadcaster.publish('agent_completed', completion_data)
                         
         except Exception as e:
             error_msg = f"❌ Error in done callback for agent {agent_id}: {e}"
             print(error_msg)
-            log_queue.put(('log', {
+            broadcaster.publish('log', {
                 "timestamp": datetime.now().isoformat(),
                 "level": "ERROR",
                 "logger_name": "agent_api",
                 "message": error_msg,
                 "metadata": {"agent_id": agent_id, "error_context": "done_callback"},
                 "session_id": session_id
-            }))
+            })
     
     return done_callback
 
@@ -327,14 +275,14 @@ def register_agent(agent_id: str, task: str, session_id: Optional[str] = None, d
         metadata=metadata
     )
       # Log agent registration
-    log_queue.put(('log', {
+    broadcaster.publish('log', {
         "timestamp": datetime.now().isoformat(),
         "level": "INFO",
         "logger_name": "agent_api",
         "message": f"🚀 Agent {agent_id} registered and starting task: {task}",
         "metadata": {"agent_id": agent_id, "action": "agent_registration"},
         "session_id": session_id
-    }))
+    })
 
 def get_agent_callbacks(agent_id: str, session_id: str):
     """Get callback functions for an agent to enable real-time logging"""
@@ -360,12 +308,20 @@ controller = Controller()
 
 active_agents: Dict[str, Dict[str, Any]] = {}
 
+# Admission control shared by every /agent/start request
+agent_scheduler = AgentScheduler(
+    max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENT", "4")),
+    max_queue_size=int(os.getenv("AGENT_MAX_QUEUE_SIZE", "100")),
+    max_memory_percent=float(os.getenv("AGENT_MAX_MEMORY_PERCENT", "90")),
+)
+
 class TaskRequest(BaseModel):
     task: str
     user_id: Optional[str] = "default_user"
     headless: Optional[bool] = False
     agent_id: Optional[str] = None
     session_id: Optional[str] = None
+    priority: Optional[int] = 0
 
 class TaskResponse(BaseModel):
     agent_id: str
@@ -374,6 +330,7 @@ class TaskResponse(BaseModel):
     websocket_url: str
     session_websocket_url: str
     debug_port: int
+    queue_position: Optional[int] = None
 
 class AgentStatusResponse(BaseModel):
     agent_id: str
@@ -403,8 +360,8 @@ def ask_human(question: str) -> ActionResult:
             "action": "user_interaction"
         }
     }
-    log_queue.put(('log', question_log))
-    log_queue.put(('agent_question', question_log))
+    broadcaster.publish('log', question_log)
+    broadcaster.publish('agent_question', question_log)
     
     # Display to console and get input
     print(f"\n🤔 Agent Question: {question}")
@@ -426,8 +383,8 @@ def ask_human(question: str) -> ActionResult:
             "action": "user_interaction"
         }
     }
-    log_queue.put(('log', answer_log))
-    log_queue.put(('human_response', answer_log))
+    broadcaster.publish('log', answer_log)
+    broadcaster.publish('human_response', answer_log)
     
     return ActionResult(
         extracted_content=f'The human responded with: {answer}',
@@ -461,9 +418,20 @@ def get_user_browser_profile(user_id: str, headless: bool = False, debug_port: i
         highlight_elements=False
     )
 
-async def run_agent_task(task: str, agent_id: str, session_id: str, user_id: str, headless: bool):
+async def run_agent_task(task: str, agent_id: str, session_id: str, user_id: str, headless: bool, scheduled_job: ScheduledJob):
     """Run an agent task with proper logging and streaming"""
     try:
+        # Stream queue position updates until the scheduler hands us a slot
+        async for position in scheduled_job.positions():
+            broadcaster.publish('agent_queued', {
+                "agent_id": agent_id,
+                "session_id": session_id,
+                "position": position,
+                "timestamp": datetime.now().isoformat()
+            })
+        await agent_scheduler.wait(scheduled_job)
+        active_agents[agent_id]["status"] = "running"
+
         # Log startup
         startup_message = f"🚀 Starting agent with ID: {agent_id}"
         print(startup_message)
@@ -487,13 +455,10 @@ async def run_agent_task(task: str, agent_id: str, session_id: str, user_id: str
         step_callback, done_callback = get_agent_callbacks(agent_id, session_id)
         user_profile_config = get_user_browser_profile(user_id, headless=False, debug_port=debug_port)
         
-        active_agents[agent_id] = {
-            "status": "running",
-            "task": task,
-            "session_id": session_id,
+        active_agents[agent_id].update({
             "debug_port": debug_port,
             "started_at": datetime.now().isoformat()
-        }
+        })
         
         # Create agent with enhanced logging
         agent = Agent(
@@ -536,6 +501,9 @@ async def run_agent_task(task: str, agent_id: str, session_id: str, user_id: str
         logger.error(error_message)
         active_agents[agent_id]["status"] = "error"
         raise
+
+    finally:
+        agent_scheduler.release(scheduled_job)
     
     # finally:
     #     if hasattr(agent, 'close'):
@@ -546,40 +514,35 @@ async def run_agent_task(task: str, agent_id: str, session_id: str, user_id: str
 async def websocket_logs(websocket: WebSocket):
     """WebSocket endpoint for real-time log streaming"""
     await websocket.accept()
-    active_connections.add(websocket)
+    connection = broadcaster.connect(websocket)
     try:
         while True:
             # Keep connection alive
             await websocket.receive_text()
     except WebSocketDisconnect:
-        active_connections.discard(websocket)
+        pass
+    finally:
+        broadcaster.disconnect(connection)
 
 @app.websocket("/ws/session/{session_id}/logs")
 async def websocket_session_logs(websocket: WebSocket, session_id: str):
     """WebSocket endpoint for session-specific real-time log streaming"""
     await websocket.accept()
-    
-    # Initialize session connections if not exists
-    if session_id not in session_connections:
-        session_connections[session_id] = set()
-    
-    session_connections[session_id].add(websocket)
+    connection = broadcaster.connect(websocket, session_id=session_id)
     
     try:
         while True:
             # Keep connection alive
             await websocket.receive_text()
     except WebSocketDisconnect:
-        if session_id in session_connections:
-            session_connections[session_id].discard(websocket)
-            if not session_connections[session_id]:
-                del session_connections[session_id]
+        pass
+    finally:
+        broadcaster.disconnect(connection)
 
 @app.on_event("startup")
 async def startup_event():
-    # Start the background log broadcasting task
-    asyncio.create_task(broadcast_logs())
-    await asyncio.sleep(1)
+    # Bind the broadcaster to the server's event loop, messages are pushed to clients as they are published
+    broadcaster.start()
     print("📡 Log streaming server integrated successfully!")
 
 @app.post("/agent/start", response_model=TaskResponse)
@@ -588,24 +551,42 @@ async def start_agent(request: TaskRequest, background_tasks: BackgroundTasks):
     session_id = request.session_id or f"session_{uuid.uuid4().hex[:8]}"
     debug_port = get_free_port()
     
-    if agent_id in active_agents and active_agents[agent_id]["status"] == "running":
+    if agent_id in active_agents and active_agents[agent_id]["status"] in ("running", "queued"):
         raise HTTPException(status_code=400, detail="Agent is already running")
+
+    try:
+        scheduled_job = agent_scheduler.submit(agent_id, priority=request.priority or 0)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        # the scheduler refuses a second job with the same id
+        raise HTTPException(status_code=409, detail=str(e))
+
+    active_agents[agent_id] = {
+        "status": "running" if scheduled_job.admitted.is_set() else "queued",
+        "task": request.task,
+        "session_id": session_id,
+        "debug_port": debug_port,
+        "started_at": datetime.now().isoformat()
+    }
     
     background_tasks.add_task(
         run_agent_task,
         request.task,
         agent_id,
         session_id,        request.user_id or "default_user",
-        request.headless or False
+        request.headless or False,
+        scheduled_job
     )
     
     return TaskResponse(
         agent_id=agent_id,
         session_id=session_id,
-        status="starting",
+        status="starting" if scheduled_job.admitted.is_set() else "queued",
         websocket_url="ws://localhost:8007/ws/logs",
         session_websocket_url=f"ws://localhost:8007/ws/session/{session_id}/logs",
-        debug_port=debug_port
+        debug_port=debug_port,
+        queue_position=scheduled_job.position
     )
 
 @app.get("/agent/{agent_id}/status", response_model=AgentStatusResponse)
@@ -641,6 +622,8 @@ async def health_check():
         "status": "healthy",
         "active_agents": len([a for a in active_agents.values() if a["status"] == "running"]),
         "total_agents": len(active_agents),
+        "scheduler": agent_scheduler.stats(),
+        "streaming": broadcaster.metrics(),
         "timestamp": datetime.now().isoformat()
     }
 
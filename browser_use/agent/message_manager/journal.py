@@ -0,0 +1,121 @@
+"""
+Append-only JSONL journal of the conversation with the LLM (Agent(save_conversation_path=...)).
+
+Consecutive prompts share almost all of their messages, so each step only records how many messages of the previous
+prompt are still at the start of the new one, the messages after them, and the model output. Records are serialized
+and written by a background task, and fsynced in batches. read_conversation_step() rebuilds the full prompt of any step.
+
+Record format, one JSON object per line:
+	{"step": 3, "keep": 5, "messages": [<langchain message dicts>], "response": {<AgentOutput>}}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import IO, Any
+
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationJournal:
+	def __init__(self, path: str | Path, encoding: str | None = 'utf-8', fsync_every: int = 20, fsync_interval: float = 5.0):
+		self.path = Path(path)
+		self.encoding = encoding or 'utf-8'
+		self.fsync_every = fsync_every  # records
+		self.fsync_interval = fsync_interval  # seconds
+		# (message, its content) of the last recorded prompt, to find what the next prompt has in common with it
+		self._previous: list[tuple[BaseMessage, Any]] = []
+		self._queue: asyncio.Queue[dict | None] = asyncio.Queue()
+		self._writer: asyncio.Task | None = None
+
+	def record_step(self, step: int, input_messages: list[BaseMessage], response: BaseModel) -> None:
+		"""Queue the prompt and response of a step, never waits for the disk"""
+		keep = 0
+		for (previous, previous_content), message in zip(self._previous, input_messages):
+			# messages are edited by replacing their content (e.g. when the history is cut), not in place
+			if message is not previous or message.content is not previous_content:
+				break
+			keep += 1
+		self._previous = [(message, message.content) for message in input_messages]
+
+		# only the new messages are converted here, json encoding and writing happen in the writer's thread
+		record = {
+			'step': step,
+			'keep': keep,
+			'messages': messages_to_dict(input_messages[keep:]),
+			'response': response.model_dump(mode='json', exclude_unset=True),
+		}
+		if self._writer is None or self._writer.done():
+			self._writer = asyncio.create_task(self._write_records())
+			self._writer.add_done_callback(_log_writer_error)
+		self._queue.put_nowait(record)
+
+	async def close(self) -> None:
+		"""Write and fsync everything recorded so far"""
+		if self._writer is None:
+			return
+		self._queue.put_nowait(None)
+		await asyncio.gather(self._writer, return_exceptions=True)
+		self._writer = None
+
+	async def _write_records(self) -> None:
+		file = await asyncio.to_thread(self._open)
+		unsynced = 0
+		last_synced_at = time.monotonic()
+		try:
+			while True:
+				records = [await self._queue.get()]
+				while not self._queue.empty():
+					records.append(self._queue.get_nowait())
+				closing = None in records
+				records = [record for record in records if record is not None]
+
+				unsynced += len(records)
+				fsync = closing or unsynced >= self.fsync_every or time.monotonic() - last_synced_at >= self.fsync_interval
+				await asyncio.to_thread(_append, file, records, fsync)
+				if fsync:
+					unsynced = 0
+					last_synced_at = time.monotonic()
+				if closing:
+					return
+		finally:
+			await asyncio.to_thread(file.close)
+
+	def _open(self) -> IO[str]:
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		return open(self.path, 'a', encoding=self.encoding)
+
+
+def _append(file: IO[str], records: list[dict], fsync: bool) -> None:
+	file.write(''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records))
+	file.flush()
+	if fsync:
+		os.fsync(file.fileno())
+
+
+def _log_writer_error(task: asyncio.Task) -> None:
+	if not task.cancelled() and task.exception() is not None:
+		logger.warning(f'❌ Failed to write conversation journal: {type(task.exception()).__name__}: {task.exception()}')
+
+
+def read_conversation_step(path: str | Path, step: int, encoding: str | None = 'utf-8') -> tuple[list[BaseMessage], dict]:
+	"""Rebuild the full prompt sent to the LLM at a step, and the model output it returned"""
+	messages: list[dict] = []
+	with open(path, encoding=encoding or 'utf-8') as file:
+		for line in file:
+			try:
+				record = json.loads(line)
+			except json.JSONDecodeError:
+				break  # a partially written last line, e.g. after a crash
+			messages = messages[: record['keep']] + record['messages']
+			if record['step'] == step:
+				return messages_from_dict(messages), record['response']
+	raise KeyError(f'Step {step} not found in conversation journal {path}')
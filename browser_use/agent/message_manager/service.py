@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import logging
 import re
 import shutil
@@ -13,11 +14,13 @@ from langchain_core.messages import (
 )
 from pydantic import BaseModel
 
-from browser_use.agent.message_manager.views import MessageMetadata
+from browser_use.agent.message_manager.tokens import TokenCounter, Tokenizer, get_token_counter
+from browser_use.agent.message_manager.views import ManagedMessage, MessageMetadata
 from browser_use.agent.prompts import AgentMessagePrompt
 from browser_use.agent.views import ActionResult, AgentOutput, AgentStepInfo, MessageManagerState
 from browser_use.browser.views import BrowserStateSummary
-from browser_use.utils import match_url_with_domain_pattern, time_execution_sync
+from browser_use.sensitive_data import SensitiveDataRedactor, get_redactor
+from browser_use.utils import time_execution_sync
 
 logger = logging.getLogger(__name__)
 
@@ -183,9 +186,26 @@ def _log_format_message_line(
 # ========== End of Logging Helper Functions ==========
 
 
+def _with_appended_text(message: BaseMessage, text: str) -> HumanMessage:
+	"""Copy of a (state) message with text added at its end"""
+	if isinstance(message.content, list):
+		return HumanMessage(content=[*message.content, {'type': 'text', 'text': text}])
+	return HumanMessage(content=f'{message.content}\n{text}')
+
+
+def _message_size(message: BaseMessage) -> int:
+	"""Size in bytes of what the provider receives for a message, images included"""
+	size = len(json.dumps(message.content, ensure_ascii=False).encode())
+	if getattr(message, 'tool_calls', None):
+		size += len(json.dumps(message.tool_calls, ensure_ascii=False, default=str).encode())  # type: ignore
+	return size
+
+
 class MessageManagerSettings(BaseModel):
 	max_input_tokens: int = 128000
-	estimated_characters_per_token: int = 3
+	estimated_characters_per_token: int = 3  # only used when no tokenizer can be loaded
+	tokenizer_encoding: str | None = None
+	tokenizer_vocab_file: str | None = None
 	image_tokens: int = 800
 	include_attributes: list[str] = []
 	message_context: str | None = None
@@ -193,6 +213,17 @@ class MessageManagerSettings(BaseModel):
 	sensitive_data: dict[str, str | dict[str, str]] | None = None
 	available_file_paths: list[str] | None = None
 
+	# applied before every new browser state is added, so the history never fills the context window by itself
+	# action results older than this many steps are shortened, None keeps them (e.g. extracted content needed for
+	# the final answer) until the history is over its budget and whole steps are dropped
+	compact_results_after_steps: int | None = None
+	compacted_result_max_chars: int = 300
+	max_history_tokens_ratio: float = 0.6  # beyond this share of max_input_tokens the oldest steps are dropped
+
+	# keep every prompt an append-only extension of the previous one, so provider-side prompt caching hits:
+	# step-only content goes into the state message at the tail and the history is compacted rarely but in bulk
+	stable_prompt_prefix: bool = False
+
 
 class MessageManager:
 	def __init__(
@@ -201,11 +232,26 @@ class MessageManager:
 		system_message: SystemMessage,
 		settings: MessageManagerSettings = MessageManagerSettings(),
 		state: MessageManagerState = MessageManagerState(),
+		tokenizer: Tokenizer | None = None,
 	):
 		self.task = task
 		self.settings = settings
 		self.state = state
 		self.system_prompt = system_message
+		self.token_counter: TokenCounter = (
+			TokenCounter(tokenizer)
+			if tokenizer is not None
+			else get_token_counter(
+				settings.tokenizer_encoding, settings.tokenizer_vocab_file, settings.estimated_characters_per_token
+			)
+		)
+
+		# texts for the current step only, merged into its state message when using stable_prompt_prefix
+		self._step_messages: list[str] = []
+		self._announced_placeholders: set[str] = set()
+		self._redactor: SensitiveDataRedactor | None = None
+		# (message, size in bytes) of the last prompt, to measure how much of the next one is unchanged
+		self._last_prompt: list[tuple[BaseMessage, int]] = []
 
 		# Only initialize messages if state is empty
 		if len(self.state.history.messages) == 0:
@@ -270,10 +316,12 @@ class MessageManager:
 			filepaths_msg = HumanMessage(content=f'Here are file paths you can use: {self.settings.available_file_paths}')
 			self._add_message_with_tokens(filepaths_msg, message_type='init')
 
+		self.state.history.pin_messages()
+
 	def add_new_task(self, new_task: str) -> None:
 		content = f'Your new ultimate task is: """{new_task}""". Take the previous context into account and finish your new ultimate task. '
 		msg = HumanMessage(content=content)
-		self._add_message_with_tokens(msg)
+		self._add_message_with_tokens(msg, message_type='task')
 		self.task = new_task
 
 	def add_sensitive_data(self, current_page_url) -> None:
@@ -281,17 +329,10 @@ class MessageManager:
 		if not sensitive_data:
 			return
 
-		# Collect placeholders for sensitive data
-		placeholders = set()
-
-		for key, value in sensitive_data.items():
-			if isinstance(value, dict):
-				# New format: {domain: {key: value}}
-				if match_url_with_domain_pattern(current_page_url, key, True):
-					placeholders.update(value.keys())
-			else:
-				# Old format: {key: value}
-				placeholders.add(key)
+		placeholders = set(self._get_redactor().secrets_for_url(current_page_url))
+		if placeholders == self._announced_placeholders:
+			return  # already in the history, repeating it every step only grows the prompt
+		self._announced_placeholders = placeholders
 		if placeholders:
 			info = f'Here are placeholders for sensitive data: {list(placeholders)}'
 			info += '\nTo use them, write <secret>the placeholder name</secret>'
@@ -307,6 +348,7 @@ class MessageManager:
 		use_vision=True,
 	) -> None:
 		"""Add browser state as human message"""
+		self._compact_history()
 
 		# if keep in memory, add to directly to history and add state without result
 		if result:
@@ -314,7 +356,7 @@ class MessageManager:
 				if r.include_in_memory:
 					if r.extracted_content:
 						msg = HumanMessage(content='Action result: ' + str(r.extracted_content))
-						self._add_message_with_tokens(msg)
+						self._add_message_with_tokens(msg, message_type='action_result')
 					if r.error:
 						# if endswith \n, remove it
 						if r.error.endswith('\n'):
@@ -322,7 +364,7 @@ class MessageManager:
 						# get only last line of error
 						last_line = r.error.split('\n')[-1]
 						msg = HumanMessage(content='Action error: ' + last_line)
-						self._add_message_with_tokens(msg)
+						self._add_message_with_tokens(msg, message_type='action_result')
 					result = None  # if result in history, we dont want to add it again
 
 		# otherwise add state message and result to next message (which will not stay in memory)
@@ -332,8 +374,26 @@ class MessageManager:
 			result=result,
 			include_attributes=self.settings.include_attributes,
 			step_info=step_info,
+			step_info_last=self.settings.stable_prompt_prefix,
 		).get_user_message(use_vision)
-		self._add_message_with_tokens(state_message)
+		for text in self._step_messages:
+			state_message = _with_appended_text(state_message, text)
+		self._step_messages.clear()
+		self._add_message_with_tokens(state_message, message_type='state')
+
+	def add_step_message(self, content: str) -> None:
+		"""Add instructions that only concern the current step (e.g. page-specific actions, last step warning)"""
+		if not self.settings.stable_prompt_prefix:
+			self._add_message_with_tokens(HumanMessage(content=content))
+			return
+
+		# kept out of the history (which would change the prompt of every later step), they go at the tail instead
+		history = self.state.history
+		if history.body and history.body[-1].metadata.message_type == 'state':
+			state_message = _with_appended_text(history.body[-1].message, content)
+			history.replace_last_message(state_message, self._count_tokens(state_message))
+		else:
+			self._step_messages.append(content)
 
 	def add_model_output(self, model_output: AgentOutput) -> None:
 		"""Add model output as AI message"""
@@ -351,10 +411,50 @@ class MessageManager:
 			tool_calls=tool_calls,
 		)
 
+		# the output starts a new step, it is kept or dropped together with the results that follow it
+		self.state.history.current_step += 1
 		self._add_message_with_tokens(msg)
 		# empty tool response
 		self.add_tool_message(content='')
 
+	def _compact_history(self) -> None:
+		"""Shorten old action results, then drop the oldest steps while the history is over its share of the context"""
+		history = self.state.history
+		max_history_tokens = int(self.settings.max_input_tokens * self.settings.max_history_tokens_ratio)
+		if self.settings.stable_prompt_prefix:
+			if history.current_tokens <= max_history_tokens:
+				return
+			# every change busts the prompt cache from that message on, so change a lot at once and then nothing for a while
+			max_history_tokens //= 2
+
+		if self.settings.compact_results_after_steps is not None:
+			history.compact_messages(
+				before_step=history.current_step - self.settings.compact_results_after_steps,
+				message_type='action_result',
+				compact=self._compact_action_result,
+			)
+
+		n_dropped = 0
+		while history.current_tokens > max_history_tokens:
+			removed = history.drop_oldest_step(keep_types=('init', 'task'))
+			if not removed:
+				break
+			n_dropped += removed
+		if n_dropped:
+			logger.debug(
+				f'Dropped {n_dropped} messages of the oldest steps - total tokens now: {history.current_tokens}/{self.settings.max_input_tokens}'
+			)
+
+	def _compact_action_result(self, managed_message: ManagedMessage) -> ManagedMessage:
+		content = managed_message.message.content
+		message, tokens = managed_message.message, managed_message.metadata.tokens
+		if isinstance(content, str) and len(content) > self.settings.compacted_result_max_chars:
+			message = HumanMessage(content=content[: self.settings.compacted_result_max_chars] + '... (shortened)')
+			tokens = self._count_tokens(message)
+		return ManagedMessage(
+			message=message, metadata=managed_message.metadata.model_copy(update={'tokens': tokens, 'message_type': 'compacted_result'})
+		)
+
 	def add_plan(self, plan: str | None, position: int | None = None) -> None:
 		if plan:
 			msg = AIMessage(content=plan)
@@ -367,10 +467,11 @@ class MessageManager:
 			message_lines = []
 			terminal_width = shutil.get_terminal_size((80, 20)).columns
 
-			for i, m in enumerate(self.state.history.messages):
+			messages = self.state.history.messages
+			for i, m in enumerate(messages):
 				try:
 					total_input_tokens += m.metadata.tokens
-					is_last_message = i == len(self.state.history.messages) - 1
+					is_last_message = i == len(messages) - 1
 
 					# Extract content for logging
 					content = _log_extract_message_content(m.message, is_last_message, m.metadata)
@@ -385,7 +486,7 @@ class MessageManager:
 
 			# Build final log message
 			return (
-				f'📜 LLM Message history ({len(self.state.history.messages)} messages, {total_input_tokens} tokens):\n'
+				f'📜 LLM Message history ({len(messages)} messages, {total_input_tokens} tokens):\n'
 				+ '\n'.join(message_lines)
 			)
 		except Exception as e:
@@ -403,6 +504,28 @@ class MessageManager:
 
 		return msg
 
+	def record_prompt(self, messages: list[BaseMessage]) -> None:
+		"""Measure how much of a prompt sent to the LLM starts exactly like the previous one (reusable by prompt caching)"""
+		stats = self.state.prompt_prefix
+		# messages are never modified in place, an unchanged message is the same object
+		n_stable = 0
+		for (previous, _), message in zip(self._last_prompt, messages):
+			if message is not previous:
+				break
+			n_stable += 1
+		prompt = self._last_prompt[:n_stable] + [(message, _message_size(message)) for message in messages[n_stable:]]
+		self._last_prompt = prompt
+
+		stats.prompts += 1
+		stats.last_total_bytes = sum(size for _, size in prompt)
+		stats.last_stable_bytes = sum(size for _, size in prompt[:n_stable])
+		stats.total_bytes += stats.last_total_bytes
+		stats.stable_bytes += stats.last_stable_bytes
+		logger.debug(
+			f'♻️ Prompt prefix unchanged since the last step: {stats.last_stable_bytes}/{stats.last_total_bytes} bytes '
+			f'({n_stable}/{len(messages)} messages), {stats.stable_ratio:.0%} over {stats.prompts} prompts'
+		)
+
 	def _add_message_with_tokens(
 		self, message: BaseMessage, position: int | None = None, message_type: str | None = None
 	) -> None:
@@ -418,38 +541,16 @@ class MessageManager:
 		metadata = MessageMetadata(tokens=token_count, message_type=message_type)
 		self.state.history.add_message(message, metadata, position)
 
+	def _get_redactor(self) -> SensitiveDataRedactor:
+		# only recompiled when settings.sensitive_data changes
+		self._redactor = get_redactor(self.settings.sensitive_data, self._redactor)
+		return self._redactor
+
 	@time_execution_sync('--filter_sensitive_data')
 	def _filter_sensitive_data(self, message: BaseMessage) -> BaseMessage:
 		"""Filter out sensitive data from the message"""
 
-		def replace_sensitive(value: str) -> str:
-			if not self.settings.sensitive_data:
-				return value
-
-			# Collect all sensitive values, immediately converting old format to new format
-			sensitive_values: dict[str, str] = {}
-
-			# Process all sensitive data entries
-			for key_or_domain, content in self.settings.sensitive_data.items():
-				if isinstance(content, dict):
-					# Already in new format: {domain: {key: value}}
-					for key, val in content.items():
-						if val:  # Skip empty values
-							sensitive_values[key] = val
-				elif content:  # Old format: {key: value} - convert to new format internally
-					# We treat this as if it was {'http*://*': {key_or_domain: content}}
-					sensitive_values[key_or_domain] = content
-
-			# If there are no valid sensitive data entries, just return the original value
-			if not sensitive_values:
-				logger.warning('No valid entries found in sensitive_data dictionary')
-				return value
-
-			# Replace all valid sensitive data values with their placeholder tags
-			for key, val in sensitive_values.items():
-				value = value.replace(val, f'<secret>{key}</secret>')
-
-			return value
+		replace_sensitive = self._get_redactor().redact
 
 		if isinstance(message.content, str):
 			message.content = replace_sensitive(message.content)
@@ -470,41 +571,37 @@ class MessageManager:
 				elif isinstance(item, dict) and 'text' in item:
 					tokens += self._count_text_tokens(item['text'])
 		else:
-			msg = message.content
-			if hasattr(message, 'tool_calls'):
-				msg += str(message.tool_calls)  # type: ignore
-			tokens += self._count_text_tokens(msg)
+			tokens += self._count_text_tokens(message.content)
+		if getattr(message, 'tool_calls', None):
+			# the provider sees the arguments as JSON, not as a python repr
+			tokens += self._count_text_tokens(json.dumps(message.tool_calls, ensure_ascii=False, default=str))  # type: ignore
 		return tokens
 
 	def _count_text_tokens(self, text: str) -> int:
-		"""Count tokens in a text string"""
-		tokens = len(text) // self.settings.estimated_characters_per_token  # Rough estimate if no tokenizer available
-		return tokens
+		"""Count tokens in a text string, identical texts are only tokenized once"""
+		return self.token_counter.count(text)
 
 	def cut_messages(self):
 		"""Get current message list, potentially trimmed to max tokens"""
-		diff = self.state.history.current_tokens - self.settings.max_input_tokens
-		if diff <= 0:
+		history = self.state.history
+		diff = history.current_tokens - self.settings.max_input_tokens
+		if diff <= 0 or not history.body:
 			return None
 
-		msg = self.state.history.messages[-1]
+		msg = history.body[-1]
+		content = msg.message.content
 
 		# if list with image remove image
-		if isinstance(msg.message.content, list):
-			text = ''
-			for item in msg.message.content:
-				if 'image_url' in item:
-					msg.message.content.remove(item)
-					diff -= self.settings.image_tokens
-					msg.metadata.tokens -= self.settings.image_tokens
-					self.state.history.current_tokens -= self.settings.image_tokens
-					logger.debug(
-						f'Removed image with {self.settings.image_tokens} tokens - total tokens now: {self.state.history.current_tokens}/{self.settings.max_input_tokens}'
-					)
-				elif 'text' in item and isinstance(item, dict):
-					text += item['text']
-			msg.message.content = text
-			self.state.history.messages[-1] = msg
+		if isinstance(content, list):
+			n_images = sum(1 for item in content if 'image_url' in item)
+			content = ''.join(item['text'] for item in content if isinstance(item, dict) and 'text' in item)
+			tokens = msg.metadata.tokens - n_images * self.settings.image_tokens
+			history.replace_last_message(HumanMessage(content=content), tokens)
+			diff -= n_images * self.settings.image_tokens
+			logger.debug(
+				f'Removed {n_images} images with {self.settings.image_tokens} tokens each - total tokens now: {history.current_tokens}/{self.settings.max_input_tokens}'
+			)
+			msg = history.body[-1]
 
 		if diff <= 0:
 			return None
@@ -521,21 +618,13 @@ class MessageManager:
 			f'Removing {proportion_to_remove * 100:.2f}% of the last message  {proportion_to_remove * msg.metadata.tokens:.2f} / {msg.metadata.tokens:.2f} tokens)'
 		)
 
-		content = msg.message.content
 		characters_to_remove = int(len(content) * proportion_to_remove)
-		content = content[:-characters_to_remove]
-
-		# remove tokens and old long message
-		self.state.history.remove_last_state_message()
-
-		# new message with updated content
-		msg = HumanMessage(content=content)
-		self._add_message_with_tokens(msg)
-
-		last_msg = self.state.history.messages[-1]
+		# new message with updated content, only the shortened text is tokenized again
+		msg = HumanMessage(content=content[:-characters_to_remove])
+		history.replace_last_message(msg, self._count_tokens(msg))
 
 		logger.debug(
-			f'Added message with {last_msg.metadata.tokens} tokens - total tokens now: {self.state.history.current_tokens}/{self.settings.max_input_tokens} - total messages: {len(self.state.history.messages)}'
+			f'Added message with {history.body[-1].metadata.tokens} tokens - total tokens now: {history.current_tokens}/{self.settings.max_input_tokens} - total messages: {len(history.pinned) + len(history.body)}'
 		)
 
 	def _remove_last_state_message(self) -> None:
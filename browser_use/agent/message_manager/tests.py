@@ -1,11 +1,18 @@
+import asyncio
+import json
+
 import pytest
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
 
+from browser_use.agent.message_manager.journal import ConversationJournal, read_conversation_step
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
-from browser_use.agent.views import ActionResult
+from browser_use.agent.message_manager.tokens import CharacterEstimateTokenizer, TokenCounter
+from browser_use.agent.message_manager.views import MessageMetadata
+from browser_use.agent.views import ActionResult, AgentBrain, AgentOutput, MessageManagerState
 from browser_use.browser.views import BrowserStateSummary, TabInfo
+from browser_use.sensitive_data import get_redactor
 from browser_use.dom.views import DOMElementNode, DOMTextNode
 
 
@@ -234,4 +241,171 @@ def test_token_overflow_handling_with_real_flow(message_manager: MessageManager,
 		assert message_manager.state.history.current_tokens == total_tokens
 
 
+class _CountingTokenizer(CharacterEstimateTokenizer):
+	def __init__(self):
+		super().__init__(characters_per_token=4)
+		self.calls = 0
+
+	def count_tokens(self, text: str) -> int:
+		self.calls += 1
+		return super().count_tokens(text)
+
+
+def test_repeated_messages_are_tokenized_once():
+	"""Test that identical message contents are only tokenized once and tool calls are counted as JSON"""
+	tokenizer = _CountingTokenizer()
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions ' * 100),
+		settings=MessageManagerSettings(max_input_tokens=10000),
+		state=MessageManagerState(),
+		tokenizer=tokenizer,
+	)
+	calls_after_init = tokenizer.calls
+
+	for message in message_manager.get_messages():
+		message_manager._add_message_with_tokens(message.model_copy())
+	assert tokenizer.calls == calls_after_init
+
+	tool_calls = [{'name': 'AgentOutput', 'args': {'action': [{'done': {'text': 'ok'}}]}, 'id': '1', 'type': 'tool_call'}]
+	message = AIMessage(content='', tool_calls=tool_calls)
+	assert message_manager._count_tokens(message) == len(json.dumps(message.tool_calls)) // 4
+
+
+def test_token_counter_evicts_least_recently_used():
+	counter = TokenCounter(CharacterEstimateTokenizer(1), max_entries=2)
+	assert counter.count('a' * 1000) == 1000
+	counter.count('b')
+	counter.count('a' * 1000)
+	counter.count('c')  # evicts 'b'
+	assert len(counter._counts) == 2
+	counter.count('b')
+	assert (counter.hits, counter.misses) == (1, 4)
+
+
+def test_sensitive_data_is_redacted_and_scoped_by_domain():
+	sensitive_data = {
+		'api_key': 'sk-123',
+		'https://*.example.com': {'password': 'hunter2', 'long_password': 'hunter2hunter2'},
+		'https://bank.com': {'pin': '0000', 'empty': ''},
+	}
+	redactor = get_redactor(sensitive_data)
+	assert get_redactor(dict(sensitive_data), redactor) is redactor
+	# a fresh compile for another caller, nothing is shared between agents
+	assert get_redactor(sensitive_data) is not redactor
+	assert get_redactor({**sensitive_data, 'api_key': 'sk-456'}, redactor) is not redactor
+
+	redacted = redactor.redact('login with hunter2hunter2 / hunter2, key sk-123, pin 0000')
+	assert redacted == (
+		'login with <secret>long_password</secret> / <secret>password</secret>, '
+		'key <secret>api_key</secret>, pin <secret>pin</secret>'
+	)
+
+	assert redactor.secrets_for_url('https://login.example.com/form') == {
+		'api_key': 'sk-123',
+		'password': 'hunter2',
+		'long_password': 'hunter2hunter2',
+	}
+	assert redactor.secrets_for_url('http://login.example.com/') == {'api_key': 'sk-123'}
+	assert redactor.secrets_for_url('about:blank') == {'api_key': 'sk-123'}
+	assert redactor.secrets_for_url('https://bank.com/') == {'api_key': 'sk-123', 'pin': '0000'}
+
+
+def test_conversation_journal_only_appends_new_messages(tmp_path):
+	"""Test that each step only writes the messages that changed and any step's prompt can be rebuilt"""
+	system, task, output = SystemMessage(content='system'), HumanMessage(content='task'), AIMessage(content='output 1')
+	prompts = [
+		[system, task, HumanMessage(content='state 1')],
+		[system, task, output, HumanMessage(content='state 2')],
+		[system, task, output, HumanMessage(content='state 3')],
+	]
+
+	async def run():
+		journal = ConversationJournal(tmp_path / 'conversation.jsonl')
+		for step, prompt in enumerate(prompts, start=1):
+			journal.record_step(step, prompt, ActionResult(extracted_content=f'response {step}'))
+		await journal.close()
+		return journal.path
+
+	path = asyncio.run(run())
+	records = [json.loads(line) for line in path.read_text().splitlines()]
+	assert [(record['keep'], len(record['messages'])) for record in records] == [(0, 3), (2, 2), (3, 1)]
+
+	messages, response = read_conversation_step(path, 3)
+	assert [message.content for message in messages] == ['system', 'task', 'output 1', 'state 3']
+	assert response == {'extracted_content': 'response 3'}
+
+
+def test_history_compacts_old_results_and_drops_oldest_steps():
+	"""Test that old action results are shortened and the oldest steps dropped, never the pinned init messages"""
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions'),
+		settings=MessageManagerSettings(max_input_tokens=100000, compact_results_after_steps=2, compacted_result_max_chars=50),
+		state=MessageManagerState(),
+		tokenizer=CharacterEstimateTokenizer(3),
+	)
+	history = message_manager.state.history
+	n_pinned = len(history.pinned)
+	for step in range(5):
+		history.add_message(HumanMessage(content='x' * 600), MessageMetadata(tokens=200, message_type='action_result'))
+		message_manager.add_model_output(AgentOutput(current_state=AgentBrain(evaluation_previous_goal='', memory='', next_goal=''), action=[]))
+
+	def result_lengths() -> list[int]:
+		return [len(m.message.content) for m in history.body if m.metadata.message_type in ('action_result', 'compacted_result')]
+
+	message_manager.settings.compact_results_after_steps = None  # the default, results are kept while there is room
+	message_manager._compact_history()
+	assert result_lengths() == [600] * 5
+
+	message_manager.settings.compact_results_after_steps = 2
+	message_manager._compact_history()
+	assert result_lengths() == [65, 65, 65, 600, 600]
+	assert history.current_tokens == sum(m.metadata.tokens for m in history.messages)
+
+	message_manager.settings.max_history_tokens_ratio = 0.001
+	message_manager._compact_history()
+	assert len(history.pinned) == n_pinned
+	assert [m.metadata.step for m in history.body] == [5, 5]  # the last model output and its tool message
+	assert history.current_tokens == sum(m.metadata.tokens for m in history.messages)
+
+
+def test_stable_prompt_prefix_only_appends_to_the_prompt():
+	"""Test that with stable_prompt_prefix every prompt starts with the whole previous prompt except its state message"""
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions'),
+		settings=MessageManagerSettings(stable_prompt_prefix=True, sensitive_data={'password': 'hunter2'}),
+		state=MessageManagerState(),
+		tokenizer=CharacterEstimateTokenizer(3),
+	)
+	state = BrowserStateSummary(
+		element_tree=DOMElementNode(tag_name='div', xpath='', attributes={}, children=[], is_visible=True, parent=None),
+		selector_map={},
+		url='https://example.com',
+		title='Example',
+		tabs=[TabInfo(page_id=0, url='https://example.com', title='Example')],
+	)
+
+	previous_prompt: list = []
+	for step in range(3):
+		message_manager.add_sensitive_data(state.url)
+		message_manager.add_step_message('For this page, these additional actions are available: ...')
+		message_manager.add_state_message(state, [ActionResult(extracted_content=f'result {step}', include_in_memory=True)])
+		prompt = message_manager.get_messages()
+		message_manager.record_prompt(prompt)
+
+		if previous_prompt:
+			assert prompt[: len(previous_prompt) - 1] == previous_prompt[:-1]
+		assert prompt[-1].content.rstrip().endswith('available: ...')
+		previous_prompt = prompt
+		message_manager._remove_last_state_message()
+		message_manager.add_model_output(AgentOutput(current_state=AgentBrain(evaluation_previous_goal='', memory='', next_goal=''), action=[]))
+
+	assert sum('placeholders for sensitive data' in str(message.content) for message in previous_prompt) == 1
+	stats = message_manager.state.prompt_prefix
+	assert stats.prompts == 3
+	assert 0 < stats.last_stable_bytes < stats.last_total_bytes
+
+
 # pytest -s browser_use/agent/message_manager/tests.py
@@ -0,0 +1,125 @@
+"""
+Token counting for the message history.
+
+MessageManager counts every message it adds to decide when the history has to be cut. A real (tiktoken-compatible)
+tokenizer keeps that close to what the LLM provider counts, and an LRU of counts keyed by the message content means the
+parts that repeat on every step (system prompt, examples, action descriptions) are only tokenized once per process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from functools import cache
+from pathlib import Path
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+# all of OpenAI's public encodings are published under this URL, tiktoken caches the downloads keyed by sha1(url)
+_TIKTOKEN_VOCAB_URL = 'https://openaipublic.blob.core.windows.net/encodings/{encoding_name}.tiktoken'
+# encoding of a tokenizer_vocab_file given without tokenizer_encoding
+DEFAULT_ENCODING = 'o200k_base'
+# texts up to this length are used as cache keys directly, longer ones are replaced by a digest so they are not kept alive
+_MAX_RAW_KEY_LENGTH = 256
+
+
+class Tokenizer(Protocol):
+	def count_tokens(self, text: str) -> int: ...
+
+
+class CharacterEstimateTokenizer:
+	"""Fallback when no real tokenizer is available: a fixed number of characters per token"""
+
+	def __init__(self, characters_per_token: int = 3):
+		self.characters_per_token = characters_per_token
+
+	def count_tokens(self, text: str) -> int:
+		return len(text) // self.characters_per_token
+
+
+class TiktokenTokenizer:
+	"""Counts tokens with a tiktoken Encoding (or anything else with a compatible encode_ordinary())"""
+
+	def __init__(self, encoding):
+		self.encoding = encoding
+
+	def count_tokens(self, text: str) -> int:
+		# encode_ordinary treats special tokens like <|endoftext|> in page content as plain text instead of raising
+		return len(self.encoding.encode_ordinary(text))
+
+
+class TokenCounter:
+	"""Wraps a Tokenizer with an LRU of token counts keyed by the text's content"""
+
+	def __init__(self, tokenizer: Tokenizer, max_entries: int = 4096):
+		self.tokenizer = tokenizer
+		self.max_entries = max_entries
+		self._counts: OrderedDict[str | bytes, int] = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def count(self, text: str) -> int:
+		if not text:
+			return 0
+		key: str | bytes = text if len(text) <= _MAX_RAW_KEY_LENGTH else hashlib.blake2b(text.encode(), digest_size=16).digest()
+		tokens = self._counts.get(key)
+		if tokens is not None:
+			self._counts.move_to_end(key)
+			self.hits += 1
+			return tokens
+
+		self.misses += 1
+		tokens = self._counts[key] = self.tokenizer.count_tokens(text)
+		if len(self._counts) > self.max_entries:
+			self._counts.popitem(last=False)
+		return tokens
+
+
+def _install_offline_vocab(encoding_name: str, vocab_file: str | Path) -> None:
+	"""Put a local .tiktoken vocab file where tiktoken looks for its cached download, so no network is needed"""
+	cache_dir = os.environ.get('TIKTOKEN_CACHE_DIR', os.environ.get('DATA_GYM_CACHE_DIR'))
+	if cache_dir is None:
+		cache_dir = os.path.join(tempfile.gettempdir(), 'data-gym-cache')
+	if not cache_dir:
+		raise ValueError('tiktoken caching is disabled (TIKTOKEN_CACHE_DIR=""), cannot use an offline vocab file')
+
+	url = _TIKTOKEN_VOCAB_URL.format(encoding_name=encoding_name)
+	cached_path = Path(cache_dir) / hashlib.sha1(url.encode()).hexdigest()
+	if not cached_path.exists():
+		cached_path.parent.mkdir(parents=True, exist_ok=True)
+		shutil.copyfile(Path(vocab_file).expanduser(), cached_path)
+
+
+@cache
+def get_token_counter(
+	encoding_name: str | None = None,
+	vocab_file: str | None = None,
+	characters_per_token: int = 3,
+) -> TokenCounter:
+	"""
+	Shared TokenCounter for a tokenizer configuration, falling back to a character estimate if tiktoken or its vocab
+	(downloaded once, or provided offline via vocab_file) is not available.
+
+	Without an encoding_name or vocab_file the character estimate is used: tiktoken downloads its vocab synchronously
+	and without a timeout, which must not happen implicitly inside Agent() on a server's event loop.
+	"""
+	if vocab_file and not encoding_name:
+		encoding_name = DEFAULT_ENCODING
+	if encoding_name:
+		try:
+			import tiktoken
+
+			if vocab_file:
+				_install_offline_vocab(encoding_name, vocab_file)
+			return TokenCounter(TiktokenTokenizer(tiktoken.get_encoding(encoding_name)))
+		except Exception as e:
+			logger.warning(
+				f'⚠️ Could not load the {encoding_name} tokenizer ({type(e).__name__}: {e}), '
+				f'estimating {characters_per_token} characters per token instead'
+			)
+	return TokenCounter(CharacterEstimateTokenizer(characters_per_token))
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Callable, Collection
 from typing import TYPE_CHECKING, Any
 from warnings import filterwarnings
 
 from langchain_core._api import LangChainBetaWarning
 from langchain_core.load import dumpd, load
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
 from pydantic import BaseModel, ConfigDict, Field, model_serializer, model_validator
 
 filterwarnings('ignore', category=LangChainBetaWarning)
@@ -19,6 +21,7 @@ class MessageMetadata(BaseModel):
 
 	tokens: int = 0
 	message_type: str | None = None
+	step: int = 0  # MessageHistory.current_step when the message was added
 
 
 class ManagedMessage(BaseModel):
@@ -67,21 +70,99 @@ class ManagedMessage(BaseModel):
 
 
 class MessageHistory(BaseModel):
-	"""History of messages with metadata"""
+	"""
+	History of messages with metadata.
 
-	messages: list[ManagedMessage] = Field(default_factory=list)
+	The messages that start every prompt (system prompt, task, examples) are pinned and never dropped, everything
+	after them is kept in a deque so the oldest steps can be dropped from the front and the state message of the
+	current step replaced at the back in O(1).
+	"""
+
+	pinned: list[ManagedMessage] = Field(default_factory=list)
+	body: deque[ManagedMessage] = Field(default_factory=deque)
 	current_tokens: int = 0
+	current_step: int = 0  # incremented for every model output, groups each output with the messages that follow it
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
+	@model_validator(mode='before')
+	@classmethod
+	def _split_legacy_messages(cls, data: Any) -> Any:
+		"""States saved before the history was split into pinned and body only have a flat list of messages"""
+		if isinstance(data, dict) and 'messages' in data:
+			data = dict(data)
+			messages = list(data.pop('messages'))
+			n_pinned = 0
+			while n_pinned < len(messages) and _message_type_of(messages[n_pinned]) == 'init':
+				n_pinned += 1
+			data.setdefault('pinned', messages[:n_pinned])
+			data.setdefault('body', messages[n_pinned:])
+		return data
+
+	@property
+	def messages(self) -> list[ManagedMessage]:
+		"""All messages in prompt order"""
+		return [*self.pinned, *self.body]
+
 	def add_message(self, message: BaseMessage, metadata: MessageMetadata, position: int | None = None) -> None:
-		"""Add message with metadata to history"""
+		"""Add message with metadata to history
+		position: None for last, -1 for second last, etc.
+		"""
+		metadata.step = self.current_step
+		managed_message = ManagedMessage(message=message, metadata=metadata)
 		if position is None:
-			self.messages.append(ManagedMessage(message=message, metadata=metadata))
+			self.body.append(managed_message)
+		elif position < 0:
+			self.body.insert(max(len(self.body) + position, 0), managed_message)
 		else:
-			self.messages.insert(position, ManagedMessage(message=message, metadata=metadata))
+			self.body.insert(max(position - len(self.pinned), 0), managed_message)
 		self.current_tokens += metadata.tokens
 
+	def pin_messages(self) -> None:
+		"""Pin every message added so far, they stay at the start of every prompt"""
+		self.pinned.extend(self.body)
+		self.body.clear()
+
+	def replace_messages(self, messages: list[ManagedMessage]) -> None:
+		"""Replace the whole history with messages that are all pinned (e.g. consolidated into a memory)"""
+		self.pinned = list(messages)
+		self.body.clear()
+		self.current_tokens = sum(m.metadata.tokens for m in self.pinned)
+
+	def replace_last_message(self, message: BaseMessage, tokens: int) -> None:
+		"""Swap the last message for a new one (the message objects themselves are never modified)"""
+		last = self.body.pop()
+		self.body.append(ManagedMessage(message=message, metadata=last.metadata.model_copy(update={'tokens': tokens})))
+		self.current_tokens += tokens - last.metadata.tokens
+
+	def compact_messages(self, before_step: int, message_type: str, compact: Callable[[ManagedMessage], ManagedMessage]) -> None:
+		"""Replace the messages of message_type added before before_step with compact(message)"""
+		for i, managed_message in enumerate(self.body):
+			if managed_message.metadata.step >= before_step:
+				break
+			if managed_message.metadata.message_type == message_type:
+				compacted = compact(managed_message)
+				self.body[i] = compacted
+				self.current_tokens += compacted.metadata.tokens - managed_message.metadata.tokens
+
+	def drop_oldest_step(self, keep_types: Collection[str] = ()) -> int:
+		"""
+		Drop the messages of the oldest step that is not the current one, returns how many left the body.
+		Messages of keep_types are pinned instead, they are the oldest left so the prompt order stays the same.
+		"""
+		if not self.body or self.body[0].metadata.step >= self.current_step:
+			return 0
+		oldest_step = self.body[0].metadata.step
+		removed = 0
+		while self.body and self.body[0].metadata.step == oldest_step:
+			managed_message = self.body.popleft()
+			if managed_message.metadata.message_type in keep_types:
+				self.pinned.append(managed_message)
+			else:
+				self.current_tokens -= managed_message.metadata.tokens
+			removed += 1
+		return removed
+
 	def add_model_output(self, output: AgentOutput) -> None:
 		"""Add model output as AI message"""
 		tool_calls = [
@@ -112,18 +193,35 @@ class MessageHistory(BaseModel):
 		return self.current_tokens
 
 	def remove_oldest_message(self) -> None:
-		"""Remove oldest non-system message"""
-		for i, msg in enumerate(self.messages):
-			if not isinstance(msg.message, SystemMessage):
-				self.current_tokens -= msg.metadata.tokens
-				self.messages.pop(i)
-				break
+		"""Remove oldest non-pinned message"""
+		if self.body:
+			self.current_tokens -= self.body.popleft().metadata.tokens
 
 	def remove_last_state_message(self) -> None:
 		"""Remove last state message from history"""
-		if len(self.messages) > 2 and isinstance(self.messages[-1].message, HumanMessage):
-			self.current_tokens -= self.messages[-1].metadata.tokens
-			self.messages.pop()
+		if self.body and isinstance(self.body[-1].message, HumanMessage):
+			self.current_tokens -= self.body.pop().metadata.tokens
+
+
+def _message_type_of(message: ManagedMessage | dict) -> str | None:
+	metadata = message.metadata if isinstance(message, ManagedMessage) else message.get('metadata')
+	if isinstance(metadata, MessageMetadata):
+		return metadata.message_type
+	return metadata.get('message_type') if isinstance(metadata, dict) else None
+
+
+class PromptPrefixStats(BaseModel):
+	"""How much of the prompts sent to the LLM was identical to the start of the previous prompt (prefix cache hits)"""
+
+	prompts: int = 0
+	total_bytes: int = 0
+	stable_bytes: int = 0  # bytes at the start of each prompt that are unchanged since the prompt before it
+	last_total_bytes: int = 0
+	last_stable_bytes: int = 0
+
+	@property
+	def stable_ratio(self) -> float:
+		return self.stable_bytes / self.total_bytes if self.total_bytes else 0.0
 
 
 class MessageManagerState(BaseModel):
@@ -131,5 +229,6 @@ class MessageManagerState(BaseModel):
 
 	history: MessageHistory = Field(default_factory=MessageHistory)
 	tool_id: int = 1
+	prompt_prefix: PromptPrefixStats = Field(default_factory=PromptPrefixStats)
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
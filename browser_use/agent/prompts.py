@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING, Optional
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from browser_use.browser.screenshot import screenshot_mime_type
+
 if TYPE_CHECKING:
 	from browser_use.agent.views import ActionResult, AgentStepInfo
 	from browser_use.browser.views import BrowserStateSummary
@@ -66,11 +68,13 @@ class AgentMessagePrompt:
 		result: list['ActionResult'] | None = None,
 		include_attributes: list[str] | None = None,
 		step_info: Optional['AgentStepInfo'] = None,
+		step_info_last: bool = False,
 	):
 		self.state: 'BrowserStateSummary' = browser_state_summary
 		self.result = result
 		self.include_attributes = include_attributes or []
 		self.step_info = step_info
+		self.step_info_last = step_info_last  # step counter and date/time after the action results, at the very end
 		assert self.state
 
 	def get_user_message(self, use_vision: bool = True) -> HumanMessage:
@@ -111,7 +115,7 @@ Available tabs:
 {self.state.tabs}
 Interactive elements from top layer of the current page inside the viewport:
 {elements_text}
-{step_info_description}
+{'' if self.step_info_last else step_info_description}
 """
 
 		if self.result:
@@ -123,6 +127,9 @@ Interactive elements from top layer of the current page inside the viewport:
 					error = result.error.split('\n')[-1]
 					state_description += f'\nAction error {i + 1}/{len(self.result)}: ...{error}'
 
+		if self.step_info_last:
+			state_description += f'\n{step_info_description}\n'
+
 		if self.state.screenshot and use_vision is True:
 			# Format message for vision model
 			return HumanMessage(
@@ -130,7 +137,7 @@ Interactive elements from top layer of the current page inside the viewport:
 					{'type': 'text', 'text': state_description},
 					{
 						'type': 'image_url',
-						'image_url': {'url': f'data:image/png;base64,{self.state.screenshot}'},  # , 'detail': 'low'
+						'image_url': {'url': f'data:{screenshot_mime_type(self.state.screenshot)};base64,{self.state.screenshot}'},  # , 'detail': 'low'
 					},
 				]
 			)
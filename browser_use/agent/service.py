@@ -8,7 +8,7 @@ import re
 import shutil
 import sys
 import time
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
 from pathlib import Path
 from threading import Thread
 from typing import Any, Generic, TypeVar
@@ -29,16 +29,18 @@ from uuid_extensions import uuid7str
 
 from browser_use.agent.gif import create_history_gif
 from browser_use.agent.memory import Memory, MemoryConfig
+from browser_use.agent.message_manager.journal import ConversationJournal
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
 from browser_use.agent.message_manager.utils import (
 	convert_input_messages,
 	extract_json_from_model_output,
 	is_model_without_tool_support,
-	save_conversation,
 )
 from browser_use.agent.prompts import AgentMessagePrompt, PlannerPrompt, SystemPrompt
+from browser_use.agent.streaming import ActionStream
 from browser_use.agent.views import (
 	ActionResult,
+	AgentBrain,
 	AgentError,
 	AgentHistory,
 	AgentHistoryList,
@@ -61,6 +63,16 @@ from browser_use.dom.history_tree_processor.service import (
 	DOMHistoryElement,
 	HistoryTreeProcessor,
 )
+from browser_use.events import (
+	ActionResultEvent,
+	AgentEvent,
+	EventBus,
+	ModelOutputEvent,
+	StepErrorEvent,
+	StepStartedEvent,
+	TaskCompletedEvent,
+	TaskStartedEvent,
+)
 from browser_use.exceptions import LLMException
 from browser_use.telemetry.service import ProductTelemetry
 from browser_use.telemetry.views import (
@@ -92,6 +104,17 @@ def log_response(response: AgentOutput, registry=None, logger=None) -> None:
 	logger.info(f'🎯 Next goal: {response.current_state.next_goal}\n')
 
 
+async def _iterate_actions(actions: list[ActionModel]) -> AsyncIterator[ActionModel]:
+	for action in actions:
+		yield action
+
+
+def _retrieve_task_exception(task: asyncio.Task) -> None:
+	"""Done callback for background tasks, so a failure nobody awaits is logged instead of warned about at exit"""
+	if not task.cancelled() and task.exception() is not None:
+		logger.debug(f'Background task failed: {type(task.exception()).__name__}: {task.exception()}')
+
+
 Context = TypeVar('Context')
 
 AgentHookFunc = Callable[['Agent'], Awaitable[None]]
@@ -128,6 +151,8 @@ class Agent(Generic[Context]):
 			| None
 		) = None,
 		register_external_agent_status_raise_error_callback: Callable[[], Awaitable[bool]] | None = None,
+		# structured event stream for live consumers (SSE, WebSocket), see browser_use.events
+		event_bus: EventBus | None = None,
 		# Agent settings
 		use_vision: bool = True,
 		use_vision_for_planner: bool = False,
@@ -138,6 +163,9 @@ class Agent(Generic[Context]):
 		override_system_message: str | None = None,
 		extend_system_message: str | None = None,
 		max_input_tokens: int = 128000,
+		tokenizer_encoding: str | None = None,
+		tokenizer_vocab_file: str | None = None,
+		stable_prompt_prefix: bool = False,
 		validate_output: bool = False,
 		message_context: str | None = None,
 		generate_gif: bool | str = False,
@@ -158,6 +186,8 @@ class Agent(Generic[Context]):
 			'aria-checked',
 		],
 		max_actions_per_step: int = 10,
+		prefetch_browser_state: bool = True,
+		stream_actions: bool = False,
 		tool_calling_method: ToolCallingMethod | None = 'auto',
 		page_extraction_llm: BaseChatModel | None = None,
 		planner_llm: BaseChatModel | None = None,
@@ -183,6 +213,7 @@ class Agent(Generic[Context]):
 		self.llm = llm
 		self.controller = controller
 		self.sensitive_data = sensitive_data
+		self.event_bus = event_bus
 
 		self.settings = AgentSettings(
 			use_vision=use_vision,
@@ -194,12 +225,17 @@ class Agent(Generic[Context]):
 			override_system_message=override_system_message,
 			extend_system_message=extend_system_message,
 			max_input_tokens=max_input_tokens,
+			tokenizer_encoding=tokenizer_encoding,
+			tokenizer_vocab_file=tokenizer_vocab_file,
+			stable_prompt_prefix=stable_prompt_prefix,
 			validate_output=validate_output,
 			message_context=message_context,
 			generate_gif=generate_gif,
 			available_file_paths=available_file_paths,
 			include_attributes=include_attributes,
 			max_actions_per_step=max_actions_per_step,
+			prefetch_browser_state=prefetch_browser_state,
+			stream_actions=stream_actions,
 			tool_calling_method=tool_calling_method,
 			page_extraction_llm=page_extraction_llm,
 			planner_llm=planner_llm,
@@ -275,6 +311,9 @@ class Agent(Generic[Context]):
 			).get_system_message(),
 			settings=MessageManagerSettings(
 				max_input_tokens=self.settings.max_input_tokens,
+				tokenizer_encoding=self.settings.tokenizer_encoding,
+				tokenizer_vocab_file=self.settings.tokenizer_vocab_file,
+				stable_prompt_prefix=self.settings.stable_prompt_prefix,
 				include_attributes=self.settings.include_attributes,
 				message_context=self.settings.message_context,
 				sensitive_data=sensitive_data,
@@ -415,12 +454,26 @@ class Agent(Generic[Context]):
 		# Telemetry
 		self.telemetry = ProductTelemetry()
 
+		self._conversation_journal: ConversationJournal | None = None
 		if self.settings.save_conversation_path:
 			self.settings.save_conversation_path = Path(self.settings.save_conversation_path).expanduser().resolve()
-			self.logger.info(f'💬 Saving conversation to {_log_pretty_path(self.settings.save_conversation_path)}')
+			# Treat save_conversation_path as a directory (consistent with other recording paths)
+			self._conversation_journal = ConversationJournal(
+				self.settings.save_conversation_path / f'conversation_{self.id}.jsonl',
+				encoding=self.settings.save_conversation_path_encoding,
+			)
+			self.logger.info(f'💬 Saving conversation to {_log_pretty_path(self._conversation_journal.path)}')
 		self._external_pause_event = asyncio.Event()
 		self._external_pause_event.set()
 
+		# Pipelining: browser state captured in the background right after the actions of a step ran
+		self._prefetched_state: asyncio.Task[BrowserStateSummary] | None = None
+
+		# with_structured_output() runnables per (AgentOutput type, tool calling method), the tool schema is built once per action set
+		self._structured_llms: dict[tuple[type[AgentOutput], str | None], Any] = {}
+		# (actions description, message context built from it) for the raw tool calling method
+		self._raw_message_context: tuple[str, str] | None = None
+
 	@property
 	def logger(self) -> logging.Logger:
 		"""Get instance-specific logger with task ID in the name"""
@@ -805,10 +858,18 @@ class Agent(Generic[Context]):
 		tokens = 0
 
 		try:
-			browser_state_summary = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=True)
+			browser_state_summary = await self._get_browser_state_summary()
 			current_page = await self.browser_session.get_current_page()
 
 			self._log_step_context(current_page, browser_state_summary)
+			self._publish_event(
+				StepStartedEvent(
+					step=self.state.n_steps,
+					url=current_page.url,
+					interactive_elements=len(browser_state_summary.selector_map),
+					message=f'Step {self.state.n_steps}: {current_page.url}',
+				)
+			)
 
 			# generate procedural memory if needed
 			if self.enable_memory and self.memory and self.state.n_steps % self.memory.config.memory_interval == 0:
@@ -828,7 +889,7 @@ class Agent(Generic[Context]):
 			# If there are page-specific actions, add them as a special message for this step only
 			if page_filtered_actions:
 				page_action_message = f'For this page, these additional actions are available:\n{page_filtered_actions}'
-				self._message_manager._add_message_with_tokens(HumanMessage(content=page_action_message))
+				self._message_manager.add_step_message(page_action_message)
 
 			# If using raw tool calling method, we need to update the message context with new actions
 			if self.tool_calling_method == 'raw':
@@ -838,14 +899,17 @@ class Agent(Generic[Context]):
 				if page_filtered_actions:
 					all_actions += '\n' + page_filtered_actions
 
-				context_lines = (self._message_manager.settings.message_context or '').split('\n')
-				non_action_lines = [line for line in context_lines if not line.startswith('Available actions:')]
-				updated_context = '\n'.join(non_action_lines)
-				if updated_context:
-					updated_context += f'\n\nAvailable actions: {all_actions}'
-				else:
-					updated_context = f'Available actions: {all_actions}'
-				self._message_manager.settings.message_context = updated_context
+				# only rebuild the context when the available actions changed since the last step
+				if self._raw_message_context != (all_actions, self._message_manager.settings.message_context):
+					context_lines = (self._message_manager.settings.message_context or '').split('\n')
+					non_action_lines = [line for line in context_lines if not line.startswith('Available actions:')]
+					updated_context = '\n'.join(non_action_lines)
+					if updated_context:
+						updated_context += f'\n\nAvailable actions: {all_actions}'
+					else:
+						updated_context = f'Available actions: {all_actions}'
+					self._message_manager.settings.message_context = updated_context
+					self._raw_message_context = (all_actions, updated_context)
 
 			self._message_manager.add_state_message(
 				browser_state_summary=browser_state_summary,
@@ -867,14 +931,21 @@ class Agent(Generic[Context]):
 				msg += '\nIf the task is fully finished, set success in "done" to true.'
 				msg += '\nInclude everything you found out for the ultimate task in the done text.'
 				self.logger.info('Last step finishing up')
-				self._message_manager._add_message_with_tokens(HumanMessage(content=msg))
+				self._message_manager.add_step_message(msg)
 				self.AgentOutput = self.DoneAgentOutput
 
 			input_messages = self._message_manager.get_messages()
 			tokens = self._message_manager.state.history.current_tokens
+			self._message_manager.record_prompt(input_messages)
 
+			stream = self._stream_next_action(input_messages) if self.settings.stream_actions else None
+			streamed_result: list[ActionResult] | None = None
 			try:
-				model_output = await self.get_next_action(input_messages)
+				if stream:
+					# the actions run while the rest of the response is still being generated
+					model_output, streamed_result = await self._act_on_stream(stream)
+				else:
+					model_output = await self.get_next_action(input_messages)
 				if (
 					not model_output.action
 					or not isinstance(model_output.action, list)
@@ -909,12 +980,9 @@ class Agent(Generic[Context]):
 						await self.register_new_step_callback(browser_state_summary, model_output, self.state.n_steps)
 					else:
 						self.register_new_step_callback(browser_state_summary, model_output, self.state.n_steps)
-				if self.settings.save_conversation_path:
-					# Treat save_conversation_path as a directory (consistent with other recording paths)
-					conversation_dir = Path(self.settings.save_conversation_path)
-					conversation_filename = f'conversation_{self.id}_{self.state.n_steps}.txt'
-					target = conversation_dir / conversation_filename
-					await save_conversation(input_messages, model_output, target, self.settings.save_conversation_path_encoding)
+				if self._conversation_journal:
+					# only the messages that changed since the last step are written, in the background
+					self._conversation_journal.record_step(self.state.n_steps, input_messages, model_output)
 
 				self._message_manager._remove_last_state_message()  # we dont want the whole state in the chat history
 
@@ -922,25 +990,48 @@ class Agent(Generic[Context]):
 				await self._raise_if_stopped_or_paused()
 
 				self._message_manager.add_model_output(model_output)
+				self._publish_event(
+					ModelOutputEvent(
+						step=self.state.n_steps,
+						evaluation_previous_goal=model_output.current_state.evaluation_previous_goal,
+						memory=model_output.current_state.memory,
+						next_goal=model_output.current_state.next_goal,
+						actions=[action.model_dump(exclude_unset=True) for action in model_output.action],
+						message=model_output.current_state.next_goal,
+					)
+				)
 			except asyncio.CancelledError:
 				# Task was cancelled due to Ctrl+C
+				if stream:
+					stream.cancel()
 				self._message_manager._remove_last_state_message()
 				raise InterruptedError('Model query cancelled by user')
 			except InterruptedError:
 				# Agent was paused during get_next_action
+				if stream:
+					stream.cancel()
 				self._message_manager._remove_last_state_message()
 				raise  # Re-raise to be caught by the outer try/except
 			except Exception as e:
 				# model call failed, remove last state message from history
+				if stream:
+					stream.cancel()
 				self._message_manager._remove_last_state_message()
 				raise e
 
-			result: list[ActionResult] = await self.multi_act(model_output.action)
+			if streamed_result is not None:
+				result = streamed_result
+			else:
+				result = await self.multi_act(model_output.action)
 
 			self.state.last_result = result
 
 			if len(result) > 0 and result[-1].is_done:
 				self.logger.info(f'📄 Result: {result[-1].extracted_content}')
+			elif self.settings.prefetch_browser_state and not (step_info and step_info.is_last_step()):
+				# the page is not touched again until the next step, start capturing its state right away
+				# so it overlaps with the history bookkeeping below and the run loop
+				await self._prefetch_browser_state()
 
 			self.state.consecutive_failures = 0
 
@@ -978,6 +1069,39 @@ class Agent(Generic[Context]):
 			# Log step completion summary
 			self._log_step_completion_summary(step_start_time, result)
 
+	async def _prefetch_browser_state(self) -> None:
+		"""Start capturing the browser state for the next step in the background"""
+		self._discard_prefetched_state()
+		# the hashes used to mark new elements are only updated once the state is actually used, a discarded
+		# prefetch must not make the next state's elements look old
+		self._prefetched_state = asyncio.create_task(
+			self.browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+		)
+		self._prefetched_state.add_done_callback(_retrieve_task_exception)
+		# let the task send its first requests to the browser before we carry on with our own work
+		await asyncio.sleep(0)
+
+	def _discard_prefetched_state(self) -> None:
+		"""Drop a prefetched browser state, e.g. because the page may have been changed from outside the agent"""
+		if self._prefetched_state is not None:
+			self._prefetched_state.cancel()
+			self._prefetched_state = None
+
+	async def _get_browser_state_summary(self) -> BrowserStateSummary:
+		"""Get the browser state for this step, reusing the prefetched one when it is available"""
+		prefetched, self._prefetched_state = self._prefetched_state, None
+		if prefetched is not None:
+			try:
+				browser_state_summary = await prefetched
+				self.browser_session.update_clickable_elements_hashes(browser_state_summary)
+				return browser_state_summary
+			except asyncio.CancelledError:
+				if not prefetched.cancelled():
+					raise  # we were cancelled ourselves, not the prefetch
+			except Exception as e:
+				self.logger.debug(f'Prefetched browser state failed, capturing it again: {type(e).__name__}: {e}')
+		return await self.browser_session.get_state_summary(cache_clickable_elements_hashes=True)
+
 	@time_execution_async('--handle_step_error')
 	async def _handle_step_error(self, error: Exception) -> list[ActionResult]:
 		"""Handle all types of errors that can occur during a step"""
@@ -985,6 +1109,14 @@ class Agent(Generic[Context]):
 		error_msg = AgentError.format_error(error, include_trace=include_trace)
 		prefix = f'❌ Result failed {self.state.consecutive_failures + 1}/{self.settings.max_failures} times:\n '
 		self.state.consecutive_failures += 1
+		self._publish_event(
+			StepErrorEvent(
+				step=self.state.n_steps,
+				error=AgentError.format_error(error),
+				consecutive_failures=self.state.consecutive_failures,
+				message=f'Step {self.state.n_steps} failed: {type(error).__name__}',
+			)
+		)
 
 		if 'Browser closed' in error_msg:
 			self.logger.error('❌  Browser is closed or disconnected, unable to proceed')
@@ -1067,6 +1199,16 @@ class Agent(Generic[Context]):
 		else:
 			return input_messages
 
+	def _get_structured_llm(self, output_model: type[AgentOutput], method: str | None):
+		"""The LLM bound to output_model, AgentOutput types are memoized per action set so this is built once per set"""
+		key = (output_model, method)
+		if key not in self._structured_llms:
+			if method is None:
+				self._structured_llms[key] = self.llm.with_structured_output(output_model, include_raw=True)
+			else:
+				self._structured_llms[key] = self.llm.with_structured_output(output_model, include_raw=True, method=method)
+		return self._structured_llms[key]
+
 	@time_execution_async('--get_next_action')
 	async def get_next_action(self, input_messages: list[BaseMessage]) -> AgentOutput:
 		"""Get next action from LLM based on current state"""
@@ -1094,7 +1236,7 @@ class Agent(Generic[Context]):
 				raise ValueError('Could not parse response.')
 
 		elif self.tool_calling_method is None:
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True)
+			structured_llm = self._get_structured_llm(self.AgentOutput, None)
 			try:
 				response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
 				parsed: AgentOutput | None = response['parsed']
@@ -1105,7 +1247,7 @@ class Agent(Generic[Context]):
 
 		else:
 			self._log_llm_call_info(input_messages, self.tool_calling_method)
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True, method=self.tool_calling_method)
+			structured_llm = self._get_structured_llm(self.AgentOutput, self.tool_calling_method)
 			response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
 
 		# Handle tool call responses
@@ -1144,6 +1286,9 @@ class Agent(Generic[Context]):
 				self.logger.warning(f'Failed to parse model output: {response["raw"].content} {str(e)}')
 				raise ValueError('Could not parse response.')
 
+		return self._finalize_next_action(parsed)
+
+	def _finalize_next_action(self, parsed: AgentOutput) -> AgentOutput:
 		# cut the number of actions to max_actions_per_step if needed
 		if len(parsed.action) > self.settings.max_actions_per_step:
 			parsed.action = parsed.action[: self.settings.max_actions_per_step]
@@ -1154,9 +1299,104 @@ class Agent(Generic[Context]):
 		self._log_next_action_summary(parsed)
 		return parsed
 
+	def _stream_next_action(self, input_messages: list[BaseMessage]) -> ActionStream | None:
+		"""Start generating the next action, its actions can be iterated while the rest is still being generated"""
+		if self.tool_calling_method == 'raw':
+			llm = self.llm
+		elif self.tool_calling_method in ('function_calling', 'tools'):
+			key = (self.AgentOutput, 'stream')
+			if key not in self._structured_llms:
+				try:
+					# what with_structured_output does, but without the parser that only runs on the complete message
+					self._structured_llms[key] = self.llm.bind_tools([self.AgentOutput], tool_choice=self.AgentOutput.__name__)
+				except NotImplementedError:
+					self._structured_llms[key] = None
+			llm = self._structured_llms[key]
+		else:
+			llm = None
+		if llm is None:
+			return None
+
+		input_messages = self._convert_input_messages(input_messages)
+		self._log_llm_call_info(input_messages, self.tool_calling_method)
+		is_raw = self.tool_calling_method == 'raw'
+
+		async def read_chunks() -> AsyncIterator[str]:
+			tool_call_index = None
+			# raw responses of reasoning models start with <think>...</think>, hold everything back until it is over
+			pending: str | None = ''
+			try:
+				async for chunk in llm.astream(input_messages):
+					if is_raw:
+						text = chunk.content if isinstance(chunk.content, str) else ''
+					else:
+						text = ''
+						for tool_call_chunk in chunk.tool_call_chunks:
+							if tool_call_index is None and tool_call_chunk.get('name'):
+								tool_call_index = tool_call_chunk.get('index')
+							if tool_call_chunk.get('index') == tool_call_index:
+								text += tool_call_chunk.get('args') or ''
+					if pending is not None:
+						pending += text
+						if '<think>'.startswith(pending.lstrip()[:7]) and '</think>' not in pending:
+							continue
+						text, pending = pending.split('</think>', 1)[-1], None
+					yield text
+			except Exception as e:
+				self.logger.error(f'Failed to invoke model: {str(e)}')
+				# Extract status code if available (e.g., from HTTP exceptions)
+				status_code = getattr(e, 'status_code', None) or getattr(e, 'code', None) or 500
+				raise LLMException(status_code, f'LLM API call failed: {type(e).__name__}: {str(e)}') from e
+			if pending:
+				yield pending
+
+		def parse_output(text: str) -> AgentOutput:
+			try:
+				parsed = self.AgentOutput(**extract_json_from_model_output(self._remove_think_tags(text)))
+			except (ValueError, ValidationError) as e:
+				self.logger.warning(f'Failed to parse model output: {text} {str(e)}')
+				raise ValueError('Could not parse response.')
+			return self._finalize_next_action(parsed)
+
+		action_model = self.DoneActionModel if self.AgentOutput is self.DoneAgentOutput else self.ActionModel
+		return ActionStream(read_chunks(), parse_output, action_model, self.settings.max_actions_per_step)
+
+	async def _act_on_stream(self, stream: ActionStream) -> tuple[AgentOutput, list[ActionResult] | None]:
+		"""Run the actions of a response while it is being generated, then wait for the complete response"""
+		results = await self.multi_act(stream)
+		try:
+			return await stream.output(), results or None
+		except Exception as e:
+			if not stream.n_actions:
+				raise
+			# the streamed actions already ran, retrying the step would make the model repeat them (double submits),
+			# so they are recorded like a complete response and the model is told the rest of it failed
+			self.logger.warning(
+				f'❌ Response failed after {stream.n_actions} of its actions already ran: {type(e).__name__}: {e}'
+			)
+			model_output = self.AgentOutput(
+				current_state=AgentBrain(evaluation_previous_goal='Unknown', memory='', next_goal='Unknown'),
+				action=stream.actions,
+			)
+			error = ActionResult(
+				error=f'Your response failed after these actions ran ({type(e).__name__}: {e}), continue from the current state',
+				include_in_memory=True,
+			)
+			return model_output, results + [error]
+
+	def _publish_event(self, event: AgentEvent) -> None:
+		"""Publish to the event bus if one was passed in, a broken consumer must never break the agent"""
+		if self.event_bus is None:
+			return
+		try:
+			self.event_bus.publish(event)
+		except Exception as e:
+			self.logger.debug(f'Failed to publish {event.event} event: {type(e).__name__}: {e}')
+
 	def _log_agent_run(self) -> None:
 		"""Log the agent run"""
 		self.logger.info(f'🚀 Starting task: {self.task}')
+		self._publish_event(TaskStartedEvent(task=self.task, message='Initiating Agents ...'))
 
 		self.logger.debug(f'🤖 Browser-Use Library Version {self.version} ({self.source})')
 
@@ -1394,12 +1634,15 @@ class Agent(Generic[Context]):
 						break
 
 				if on_step_start is not None:
+					# hooks may drive the browser themselves, so the prefetched state can't be trusted anymore
+					self._discard_prefetched_state()
 					await on_step_start(self)
 
 				step_info = AgentStepInfo(step_number=step, max_steps=max_steps)
 				await self.step(step_info)
 
 				if on_step_end is not None:
+					self._discard_prefetched_state()
 					await on_step_end(self)
 
 				if self.state.history.is_done():
@@ -1448,6 +1691,16 @@ class Agent(Generic[Context]):
 			# Unregister signal handlers before cleanup
 			signal_handler.unregister()
 
+			self._publish_event(
+				TaskCompletedEvent(
+					success=self.state.history.is_successful(),
+					final_result=self.state.history.final_result(),
+					steps=self.state.n_steps,
+					error=agent_run_error,
+					message='Task completed' if agent_run_error is None else agent_run_error,
+				)
+			)
+
 			if not self._force_exit_telemetry_logged:  # MODIFIED: Check the flag
 				try:
 					self._log_agent_event(max_steps=max_steps, agent_run_error=agent_run_error)
@@ -1470,18 +1723,25 @@ class Agent(Generic[Context]):
 	@time_execution_async('--multi_act')
 	async def multi_act(
 		self,
-		actions: list[ActionModel],
+		actions: list[ActionModel] | AsyncIterable[ActionModel],
 		check_for_new_elements: bool = True,
 	) -> list[ActionResult]:
-		"""Execute multiple actions"""
+		"""Execute multiple actions, either a list or an ActionStream whose actions arrive while the LLM is still generating"""
 		results = []
+		total = f'{len(actions)}' if isinstance(actions, list) else '?'
+		action_iterator = _iterate_actions(actions) if isinstance(actions, list) else actions
 
 		cached_selector_map = await self.browser_session.get_selector_map()
 		cached_path_hashes = {e.hash.branch_path_hash for e in cached_selector_map.values()}
 
 		await self.browser_session.remove_highlights()
 
-		for i, action in enumerate(actions):
+		i = -1
+		async for action in action_iterator:
+			i += 1
+			if i != 0:
+				await asyncio.sleep(self.browser_profile.wait_between_actions)
+
 			if action.get_index() is not None and i != 0:
 				new_browser_state_summary = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=False)
 				new_selector_map = new_browser_state_summary.selector_map
@@ -1492,7 +1752,7 @@ class Agent(Generic[Context]):
 				new_target = new_selector_map.get(action.get_index())  # type: ignore
 				new_target_hash = new_target.hash.branch_path_hash if new_target else None
 				if orig_target_hash != new_target_hash:
-					msg = f'Element index changed after action {i} / {len(actions)}, because page changed.'
+					msg = f'Element index changed after action {i} / {total}, because page changed.'
 					self.logger.info(msg)
 					results.append(ActionResult(extracted_content=msg, include_in_memory=True))
 					break
@@ -1500,7 +1760,7 @@ class Agent(Generic[Context]):
 				new_path_hashes = {e.hash.branch_path_hash for e in new_selector_map.values()}
 				if check_for_new_elements and not new_path_hashes.issubset(cached_path_hashes):
 					# next action requires index but there are new elements on the page
-					msg = f'Something new appeared after action {i} / {len(actions)}'
+					msg = f'Something new appeared after action {i} / {total}'
 					self.logger.info(msg)
 					results.append(ActionResult(extracted_content=msg, include_in_memory=True))
 					break
@@ -1523,13 +1783,24 @@ class Agent(Generic[Context]):
 				action_data = action.model_dump(exclude_unset=True)
 				action_name = next(iter(action_data.keys())) if action_data else 'unknown'
 				action_params = getattr(action, action_name, '')
-				self.logger.info(f'☑️ Executed action {i + 1}/{len(actions)}: {action_name}({action_params})')
-				if results[-1].is_done or results[-1].error or i == len(actions) - 1:
+				self.logger.info(f'☑️ Executed action {i + 1}/{total}: {action_name}({action_params})')
+				self._publish_event(
+					ActionResultEvent(
+						step=self.state.n_steps,
+						action_index=i,
+						action_count=len(actions) if isinstance(actions, list) else i + 1,
+						action_name=action_name,
+						is_done=result.is_done or False,
+						success=result.success,
+						error=result.error,
+						extracted_content=result.extracted_content,
+						info='Task Result' if result.is_done else 'Action Result',
+						message=(result.extracted_content or '') if result.is_done else f'Executed {action_name}',
+					)
+				)
+				if results[-1].is_done or results[-1].error:
 					break
 
-				await asyncio.sleep(self.browser_profile.wait_between_actions)
-				# hash all elements. if it is a subset of cached_state its fine - else break (new elements on page)
-
 			except asyncio.CancelledError:
 				# Gracefully handle task cancellation
 				self.logger.info(f'Action {i + 1} was cancelled due to Ctrl+C')
@@ -1740,6 +2011,8 @@ class Agent(Generic[Context]):
 		)
 		self.state.paused = True
 		self._external_pause_event.clear()
+		# the user may interact with the browser while we are paused
+		self._discard_prefetched_state()
 
 		# Task paused
 
@@ -1770,6 +2043,7 @@ class Agent(Generic[Context]):
 		"""Stop the agent"""
 		self.logger.info('⏹️ Agent stopping')
 		self.state.stopped = True
+		self._discard_prefetched_state()
 
 		# Task stopped
 
@@ -1885,6 +2159,10 @@ class Agent(Generic[Context]):
 	async def close(self):
 		"""Close all resources"""
 		try:
+			self._discard_prefetched_state()
+			if self._conversation_journal:
+				await self._conversation_journal.close()
+
 			# First close browser resources
 			await self.browser_session.stop()
 
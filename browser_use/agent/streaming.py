@@ -0,0 +1,142 @@
+"""
+Incremental parsing of the LLM's response while it is still being generated (Agent(stream_actions=True)), so the first
+action can run as soon as the model has finished writing it instead of after the whole response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from browser_use.agent.views import AgentOutput
+	from browser_use.controller.registry.views import ActionModel
+
+logger = logging.getLogger(__name__)
+
+
+class ActionArrayParser:
+	"""
+	Finds the elements of the top level "action" array of a JSON object that arrives in arbitrary chunks, and returns
+	the text of each element as soon as its closing brace arrived. Text before the first '{' (e.g. a ```json fence) is skipped.
+	"""
+
+	def __init__(self):
+		self.text = ''
+		self._pos = 0
+		self._started = False
+		self._depth = 0
+		self._in_string = False
+		self._escape = False
+		self._string_start = 0
+		self._last_key: str | None = None  # last string seen directly inside the top level object
+		self._in_actions = False
+		self._element_start: int | None = None
+
+	def feed(self, chunk: str) -> list[str]:
+		self.text += chunk
+		text = self.text
+		elements = []
+		for i in range(self._pos, len(text)):
+			char = text[i]
+			if self._in_string:
+				if self._escape:
+					self._escape = False
+				elif char == '\\':
+					self._escape = True
+				elif char == '"':
+					self._in_string = False
+					if self._depth == 1:
+						self._last_key = text[self._string_start + 1 : i]
+				continue
+
+			if not self._started:
+				if char != '{':
+					continue
+				self._started = True
+
+			if char == '"':
+				self._in_string = True
+				self._string_start = i
+			elif char in '{[':
+				self._depth += 1
+				if char == '[' and self._depth == 2 and self._last_key == 'action':
+					self._in_actions = True
+				elif char == '{' and self._in_actions and self._depth == 3:
+					self._element_start = i
+			elif char in '}]':
+				if char == '}' and self._depth == 3 and self._element_start is not None:
+					elements.append(text[self._element_start : i + 1])
+					self._element_start = None
+				elif char == ']' and self._depth == 2:
+					self._in_actions = False
+				self._depth -= 1
+		self._pos = len(text)
+		return elements
+
+
+class ActionStream:
+	"""
+	Async iterator over the validated actions of an LLM response that is still being generated. The response is read by a
+	background task, so generation continues while the actions run. output() returns the complete AgentOutput.
+	"""
+
+	def __init__(
+		self,
+		chunks: AsyncIterator[str],
+		parse_output: Callable[[str], AgentOutput],
+		action_model: type[ActionModel],
+		max_actions: int,
+	):
+		self.parse_output = parse_output
+		self.action_model = action_model
+		self.max_actions = max_actions
+		self.actions: list[ActionModel] = []  # emitted so far
+		self._queue: asyncio.Queue[ActionModel | None] = asyncio.Queue()
+		self._reader = asyncio.create_task(self._read(chunks))
+
+	def __aiter__(self) -> ActionStream:
+		return self
+
+	async def __anext__(self) -> ActionModel:
+		action = await self._queue.get()
+		if action is None:
+			self._queue.put_nowait(None)  # stay exhausted
+			raise StopAsyncIteration
+		return action
+
+	@property
+	def n_actions(self) -> int:
+		return len(self.actions)
+
+	async def output(self) -> AgentOutput:
+		"""The complete response, once the LLM finished generating it"""
+		return await self._reader
+
+	def cancel(self) -> None:
+		self._reader.cancel()
+
+	async def _read(self, chunks: AsyncIterator[str]) -> AgentOutput:
+		parser = ActionArrayParser()
+		streaming = True
+		try:
+			async for chunk in chunks:
+				for element in parser.feed(chunk):
+					if not streaming:
+						continue
+					try:
+						action = self.action_model.model_validate(json.loads(element))
+					except ValueError as e:
+						# leave it to the complete response to report what is wrong
+						logger.debug(f'Could not parse streamed action {element}: {type(e).__name__}: {e}')
+						streaming = False
+						continue
+					self._queue.put_nowait(action)
+					self.actions.append(action)
+					streaming = self.n_actions < self.max_actions
+		finally:
+			self._queue.put_nowait(None)
+		return self.parse_output(parser.text)
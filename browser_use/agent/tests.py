@@ -1,5 +1,15 @@
+import asyncio
+import gc
+import json
+import logging
+import weakref
+from functools import partial
+from types import SimpleNamespace
+
 import pytest
 
+from browser_use.agent.service import Agent
+from browser_use.agent.streaming import ActionArrayParser, ActionStream
 from browser_use.agent.views import (
 	ActionResult,
 	AgentBrain,
@@ -193,5 +203,96 @@ def test_action_creation(action_registry):
 	assert click_action.model_dump(exclude_none=True) == {'click_element': {'index': 1}}
 
 
+def test_agent_output_type_is_memoized_per_action_model():
+	registry = Registry()
+	action_model = registry.create_action_model()
+	agent_output = AgentOutput.type_with_custom_actions(action_model)
+	assert AgentOutput.type_with_custom_actions(action_model) is agent_output
+
+	# the memo must not keep the models of a discarded registry alive
+	agent_output_ref = weakref.ref(agent_output)
+	del registry, action_model, agent_output
+	gc.collect()
+	assert agent_output_ref() is None
+
+
+def test_action_array_parser_emits_closed_elements():
+	parser = ActionArrayParser()
+	assert parser.feed('```json\n{"current_state": {"memory": "a [\\"quoted\\"] {x}"}, "act') == []
+	assert parser.feed('ion": [{"click_element": {"ind') == []
+	assert parser.feed('ex": 1}}, {"done"') == ['{"click_element": {"index": 1}}']
+	assert parser.feed(': {"text": "}]"}}]}\n```') == ['{"done": {"text": "}]"}}']
+	assert json.loads(parser.text.strip('`json\n'))['action'][1] == {'done': {'text': '}]'}}
+
+
+def test_action_stream_yields_actions_before_the_response_is_complete(action_registry):
+	response = '{"current_state": {}, "action": [{"click_element": {"index": 1}}, {"click_element": {"index": 2}}]}'
+
+	async def run():
+		finished = asyncio.Event()
+
+		async def chunks():
+			for i in range(0, len(response), 10):
+				yield response[i : i + 10]
+			await finished.wait()
+
+		stream = ActionStream(chunks(), json.loads, action_registry, max_actions=1)
+		first = await anext(stream)
+		# the LLM is still generating, the rest of the response is only parsed at the end
+		finished.set()
+		rest = [action async for action in stream]
+		return first, rest, await stream.output()
+
+	first, rest, output = asyncio.run(run())
+	assert first.model_dump(exclude_none=True) == {'click_element': {'index': 1}}
+	assert rest == []  # max_actions
+	assert len(output['action']) == 2
+
+
+def test_actions_that_ran_are_kept_when_the_streamed_response_fails(action_registry):
+	executed = []
+
+	async def act(action, **kwargs):
+		executed.append(action)
+		return ActionResult(extracted_content=f'extracted {len(executed)}', include_in_memory=True)
+
+	async def noop(*args, **kwargs):
+		return {}
+
+	agent = SimpleNamespace(
+		browser_session=SimpleNamespace(get_selector_map=noop, remove_highlights=noop),
+		controller=SimpleNamespace(act=act),
+		settings=SimpleNamespace(page_extraction_llm=None, available_file_paths=None),
+		browser_profile=SimpleNamespace(wait_between_actions=0),
+		state=SimpleNamespace(n_steps=1),
+		sensitive_data=None,
+		context=None,
+		logger=logging.getLogger('test'),
+		AgentOutput=AgentOutput.type_with_custom_actions(action_registry),
+		_raise_if_stopped_or_paused=noop,
+		_publish_event=lambda event: None,
+	)
+	agent.multi_act = partial(Agent.multi_act, agent)
+
+	async def chunks():
+		yield '{"current_state": {}, "action": [{"extract_page_content": {"value": "a"}}, '
+		yield '{"extract_page_content": {"value": "b"}}, {"cli'
+		raise ConnectionError('connection reset')
+
+	async def run():
+		stream = ActionStream(chunks(), json.loads, action_registry, max_actions=10)
+		return await Agent._act_on_stream(agent, stream)  # type: ignore
+
+	model_output, results = asyncio.run(run())
+
+	assert len(executed) == 2
+	assert [action.model_dump(exclude_unset=True) for action in model_output.action] == [
+		{'extract_page_content': {'value': 'a'}},
+		{'extract_page_content': {'value': 'b'}},
+	]
+	assert [result.extracted_content for result in results[:2]] == ['extracted 1', 'extracted 2']
+	assert 'ConnectionError' in results[-1].error
+
+
 # run this with:
 # pytest browser_use/agent/tests.py
@@ -44,6 +44,11 @@ class AgentSettings(BaseModel):
 	max_failures: int = 3
 	retry_delay: int = 10
 	max_input_tokens: int = 128000
+	# tiktoken encoding used to count tokens (downloaded on first use unless tokenizer_vocab_file is given),
+	# None to estimate from characters, or o200k_base if only tokenizer_vocab_file is set
+	tokenizer_encoding: str | None = None
+	tokenizer_vocab_file: str | None = None  # local .tiktoken file, so the encoding does not have to be downloaded
+	stable_prompt_prefix: bool = False  # only ever append to the prompt, for provider-side prompt caching
 	validate_output: bool = False
 	message_context: str | None = None
 	generate_gif: bool | str = False
@@ -63,6 +68,8 @@ class AgentSettings(BaseModel):
 		'aria-expanded',
 	]
 	max_actions_per_step: int = 10
+	prefetch_browser_state: bool = True  # capture the next step's browser state as soon as the actions ran
+	stream_actions: bool = False  # run each action as soon as the LLM generated it, with the raw and tool calling methods
 
 	tool_calling_method: ToolCallingMethod | None = 'auto'
 	page_extraction_llm: BaseChatModel | None = None
@@ -160,7 +167,12 @@ class AgentOutput(BaseModel):
 
 	@staticmethod
 	def type_with_custom_actions(custom_actions: type[ActionModel]) -> type[AgentOutput]:
-		"""Extend actions with custom actions"""
+		"""Extend actions with custom actions, memoized so every ActionModel gets exactly one AgentOutput type"""
+		# kept on the ActionModel class itself (not inherited, hence __dict__), so it goes away with its Registry
+		cached = custom_actions.__dict__.get('_agent_output_type')
+		if cached is not None:
+			return cached
+
 		model_ = create_model(
 			'AgentOutput',
 			__base__=AgentOutput,
@@ -171,6 +183,7 @@ class AgentOutput(BaseModel):
 			__module__=AgentOutput.__module__,
 		)
 		model_.__doc__ = 'AgentOutput model with custom actions'
+		custom_actions._agent_output_type = model_  # type: ignore[attr-defined]
 		return model_
 
 
@@ -1,6 +1,7 @@
 from .browser import Browser, BrowserConfig
 from .context import BrowserContext, BrowserContextConfig
+from .pool import BrowserPool
 from .profile import BrowserProfile
 from .session import BrowserSession
 
-__all__ = ['Browser', 'BrowserConfig', 'BrowserContext', 'BrowserContextConfig', 'BrowserSession', 'BrowserProfile']
+__all__ = ['Browser', 'BrowserConfig', 'BrowserContext', 'BrowserContextConfig', 'BrowserSession', 'BrowserProfile', 'BrowserPool']
@@ -0,0 +1,294 @@
+"""
+Shared on-disk HTTP cache for static assets, so every new (incognito) browser context does not download the same
+JS bundles, stylesheets, fonts and images again.
+
+Responses are stored content-addressed (identical bodies served under different URLs are stored once), evicted in
+least-recently-used order once the cache grows past its size limit, and only stored / served while they are fresh
+according to their Cache-Control / Expires headers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import ClassVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# only these requests are routed through the cache at all, matched inside the browser so nothing else reaches python
+STATIC_ASSET_URL_RE = re.compile(r'\.(m?js|css|woff2?|ttf|otf|eot|png|jpe?g|gif|webp|avif|svg|ico)([?#]|$)', re.IGNORECASE)
+CACHEABLE_RESOURCE_TYPES = {'script', 'stylesheet', 'font', 'image'}
+# the body we store is already decoded, so these no longer describe it
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive', 'age', 'date'}
+_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class HttpCacheStats(BaseModel):
+	"""Counters for an HttpCache since it was opened"""
+
+	requests: int
+	hits: int
+	misses: int
+	stored: int
+	evicted: int
+	entries: int
+	size_mb: float
+	hit_rate: float
+	bytes_served: int  # bytes that did not have to be downloaded again
+	estimated_time_saved_ms: float  # sum of how long each served response originally took to download
+
+
+@dataclass
+class _Entry:
+	url: str
+	status: int
+	headers: dict[str, str]
+	body_hash: str
+	size: int
+	expires_at: float
+	fetch_ms: float
+
+
+def freshness_lifetime(headers: dict[str, str]) -> float | None:
+	"""Seconds a response may be served from a shared cache, None if it must not be stored"""
+	directives = {}
+	for directive in headers.get('cache-control', '').lower().split(','):
+		name, _, value = directive.strip().partition('=')
+		if name:
+			directives[name] = value.strip('"')
+
+	if {'no-store', 'no-cache', 'private'} & directives.keys():
+		return None
+	for name in ('s-maxage', 'max-age'):
+		if name in directives:
+			try:
+				lifetime = float(directives[name])
+			except ValueError:
+				return None
+			break
+	else:
+		if 'immutable' in directives:
+			lifetime = _IMMUTABLE_MAX_AGE
+		elif 'expires' in headers:
+			try:
+				lifetime = parsedate_to_datetime(headers['expires']).timestamp() - time.time()
+			except (TypeError, ValueError):
+				return None
+		else:
+			return None  # no explicit freshness, don't guess
+
+	try:
+		lifetime -= float(headers.get('age', 0))
+	except ValueError:
+		pass
+	return lifetime if lifetime > 0 else None
+
+
+class HttpCache:
+	"""
+	Content-addressed, size-bounded LRU cache of static asset responses, served via Playwright routes.
+
+	Use HttpCache.shared(directory) to get the one instance per directory, so every BrowserSession in the process
+	(e.g. all sessions of a BrowserPool) shares its entries and statistics.
+	"""
+
+	_shared: ClassVar[dict[Path, HttpCache]] = {}
+
+	def __init__(self, directory: str | Path, max_size_bytes: int):
+		self.directory = Path(directory).expanduser().resolve()
+		self.max_size_bytes = max_size_bytes
+		self._entries_dir = self.directory / 'entries'
+		self._blobs_dir = self.directory / 'blobs'
+		self._entries: OrderedDict[str, _Entry] = OrderedDict()  # least recently used first
+		self._blob_refs: dict[str, int] = {}
+		self._size = 0
+		self._loaded = False
+		self._load_lock = asyncio.Lock()
+
+		self._requests = 0
+		self._hits = 0
+		self._stored = 0
+		self._evicted = 0
+		self._bytes_served = 0
+		self._time_saved_ms = 0.0
+
+	@classmethod
+	def shared(cls, directory: str | Path, max_size_bytes: int) -> HttpCache:
+		directory = Path(directory).expanduser().resolve()
+		cache = cls._shared.get(directory)
+		if cache is None:
+			cache = cls._shared[directory] = cls(directory, max_size_bytes)
+		return cache
+
+	def stats(self) -> HttpCacheStats:
+		return HttpCacheStats(
+			requests=self._requests,
+			hits=self._hits,
+			misses=self._requests - self._hits,
+			stored=self._stored,
+			evicted=self._evicted,
+			entries=len(self._entries),
+			size_mb=self._size / 1024 / 1024,
+			hit_rate=self._hits / self._requests if self._requests else 0.0,
+			bytes_served=self._bytes_served,
+			estimated_time_saved_ms=self._time_saved_ms,
+		)
+
+	async def install(self, browser_context) -> None:
+		"""Serve the static assets requested by every page in the context from the cache"""
+		async with self._load_lock:
+			if not self._loaded:
+				await asyncio.to_thread(self._load)
+				self._loaded = True
+		await browser_context.route(STATIC_ASSET_URL_RE, self._handle_route)
+
+	# --- route handling ---
+
+	async def _handle_route(self, route) -> None:
+		request = route.request
+		if request.method != 'GET' or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+			await route.fallback()
+			return
+
+		self._requests += 1
+		key = hashlib.sha256(request.url.encode()).hexdigest()
+		entry = self._entries.get(key)
+		if entry is not None and entry.expires_at > time.time():
+			body = await asyncio.to_thread(self._read_blob, key, entry.body_hash)
+			if body is not None:
+				if self._entries.get(key) is entry:  # not evicted or replaced while the body was read
+					self._entries.move_to_end(key)
+				self._hits += 1
+				self._bytes_served += entry.size
+				self._time_saved_ms += entry.fetch_ms
+				await route.fulfill(status=entry.status, headers=entry.headers, body=body)
+				return
+		if entry is not None and self._entries.get(key) is entry:
+			# stale or its body went missing, unless a concurrent _store() already evicted or replaced it
+			await asyncio.to_thread(_unlink_all, self._remove(key))
+
+		started_at = time.monotonic()
+		try:
+			response = await route.fetch()
+			body = await response.body()
+		except Exception as e:
+			logger.debug(f'HTTP cache could not fetch {request.url}: {type(e).__name__}: {e}')
+			await route.fallback()
+			return
+		fetch_ms = (time.monotonic() - started_at) * 1000
+		await route.fulfill(response=response)
+
+		headers = {name.lower(): value for name, value in response.headers.items()}
+		lifetime = freshness_lifetime(headers)
+		vary = headers.get('vary', '').lower().replace(' ', '')
+		if response.status != 200 or lifetime is None or 'set-cookie' in headers or vary not in ('', 'accept-encoding'):
+			return
+		entry = _Entry(
+			url=request.url,
+			status=response.status,
+			headers={name: value for name, value in headers.items() if name not in _DROPPED_HEADERS},
+			body_hash=hashlib.sha256(body).hexdigest(),
+			size=len(body),
+			expires_at=time.time() + lifetime,
+			fetch_ms=fetch_ms,
+		)
+		await self._store(key, entry, body)
+
+	# --- storage ---
+
+	async def _store(self, key: str, entry: _Entry, body: bytes) -> None:
+		if entry.size > self.max_size_bytes:
+			return
+		is_new_blob = entry.body_hash not in self._blob_refs
+		try:
+			await asyncio.to_thread(self._write, key, entry, body if is_new_blob else None)
+		except OSError as e:
+			logger.debug(f'HTTP cache could not store {entry.url}: {type(e).__name__}: {e}')
+			return
+
+		stale_files: list[Path] = []
+		if key in self._entries:
+			# replaced (possibly by a concurrent download of the same URL), keep the files we just wrote
+			written = {f'{key}.json', entry.body_hash}
+			stale_files.extend(path for path in self._remove(key) if path.name not in written)
+		self._add(key, entry)
+		self._stored += 1
+
+		while self._size > self.max_size_bytes and self._entries:
+			oldest_key = next(iter(self._entries))
+			stale_files.extend(self._remove(oldest_key))
+			self._evicted += 1
+		if stale_files:
+			await asyncio.to_thread(_unlink_all, stale_files)
+
+	def _add(self, key: str, entry: _Entry) -> None:
+		self._entries[key] = entry
+		if self._blob_refs.get(entry.body_hash, 0) == 0:
+			self._size += entry.size
+		self._blob_refs[entry.body_hash] = self._blob_refs.get(entry.body_hash, 0) + 1
+
+	def _remove(self, key: str) -> list[Path]:
+		"""Drop an entry (and its body once nothing references it anymore), returns the files the caller has to delete"""
+		entry = self._entries.pop(key)
+		files = [self._entries_dir / f'{key}.json']
+		self._blob_refs[entry.body_hash] -= 1
+		if self._blob_refs[entry.body_hash] == 0:
+			del self._blob_refs[entry.body_hash]
+			self._size -= entry.size
+			files.append(self._blobs_dir / entry.body_hash)
+		return files
+
+	def _load(self) -> None:
+		"""Index the entries left on disk by earlier runs, most recently used last"""
+		self._entries_dir.mkdir(parents=True, exist_ok=True)
+		self._blobs_dir.mkdir(parents=True, exist_ok=True)
+		found: list[tuple[float, str, _Entry]] = []
+		for path in self._entries_dir.glob('*.json'):
+			try:
+				entry = _Entry(**json.loads(path.read_text()))
+				if (self._blobs_dir / entry.body_hash).exists():
+					found.append((path.stat().st_mtime, path.stem, entry))
+					continue
+			except (OSError, ValueError, TypeError):
+				pass
+			path.unlink(missing_ok=True)
+		for _, key, entry in sorted(found, key=lambda item: item[0]):
+			self._add(key, entry)
+		logger.debug(f'📦 HTTP cache {self.directory} opened with {len(self._entries)} entries ({self._size / 1024 / 1024:.1f} MB)')
+
+	def _write(self, key: str, entry: _Entry, body: bytes | None) -> None:
+		if body is not None:
+			_atomic_write(self._blobs_dir / entry.body_hash, body)
+		_atomic_write(self._entries_dir / f'{key}.json', json.dumps(asdict(entry)).encode())
+
+	def _read_blob(self, key: str, body_hash: str) -> bytes | None:
+		try:
+			body = (self._blobs_dir / body_hash).read_bytes()
+			os.utime(self._entries_dir / f'{key}.json')  # keeps the LRU order across restarts
+			return body
+		except OSError:
+			return None  # e.g. evicted by another process sharing the directory
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+	# other processes may share the directory, they must never see a half-written file
+	tmp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+	tmp_path.write_bytes(data)
+	os.replace(tmp_path, path)
+
+
+def _unlink_all(paths: list[Path]) -> None:
+	for path in paths:
+		path.unlink(missing_ok=True)
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+import psutil
+from pydantic import BaseModel
+
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolStats(BaseModel):
+	"""Point-in-time counters for a BrowserPool"""
+
+	idle: int
+	leased: int
+	launching: int
+	browsers: int
+	min_size: int
+	max_size: int
+	total_launched: int
+	total_evicted: int
+	total_leases: int
+	avg_lease_wait_ms: float
+
+
+class BrowserPool:
+	"""
+	Keeps a set of pre-launched BrowserSessions warm so callers can lease one instead of cold-starting a browser.
+
+	With contexts_per_browser > 1, pooled sessions are isolated BrowserContexts opened inside a few shared
+	browser processes (see BrowserSession.new_isolated_session()), which uses far less memory per session.
+
+	Leased sessions are reset to a single about:blank tab with empty cookies/storage when they are released.
+	Sessions that crashed, failed to reset, grew past max_rss_mb, or served max_uses leases are evicted and
+	replaced in the background so the pool never drops below min_size.
+
+	Usage:
+		pool = BrowserPool(browser_profile=BrowserProfile(headless=True), min_size=2, max_size=8)
+		await pool.start()
+		async with pool.lease() as browser_session:
+			agent = Agent(task=..., llm=..., browser_session=browser_session)
+			await agent.run()
+		await pool.close()
+	"""
+
+	def __init__(
+		self,
+		browser_profile: BrowserProfile | None = None,
+		min_size: int = 1,
+		max_size: int = 4,
+		max_rss_mb: float | None = None,
+		max_uses: int | None = None,
+		health_check_interval: float = 30.0,
+		profile_factory: Callable[[], BrowserProfile] | None = None,
+		contexts_per_browser: int = 1,
+		max_launch_attempts: int = 3,
+	):
+		assert 0 <= min_size <= max_size and max_size > 0, f'Invalid pool size min_size={min_size} max_size={max_size}'
+		assert contexts_per_browser >= 1, f'Invalid contexts_per_browser={contexts_per_browser}'
+		assert browser_profile is None or profile_factory is None, 'Pass either browser_profile or profile_factory, not both'
+
+		self.browser_profile = browser_profile or BrowserProfile()
+		self.profile_factory = profile_factory
+		self.min_size = min_size
+		self.max_size = max_size
+		self.max_rss_mb = max_rss_mb
+		self.max_uses = max_uses
+		self.health_check_interval = health_check_interval
+		self.contexts_per_browser = contexts_per_browser
+		self.max_launch_attempts = max_launch_attempts  # consecutive failed launches before acquire() gives up
+
+		self._idle: deque[BrowserSession] = deque()
+		self._leased: dict[str, BrowserSession] = {}  # keyed by id, BrowserSession is not hashable
+		self._uses: dict[str, int] = {}
+		self._launching = 0
+		self._last_launch_error: Exception | None = None
+		self._closed = False
+		self._condition = asyncio.Condition()
+		# launches are serialized so BrowserSession can attribute the new chrome child process (browser_pid) correctly
+		self._launch_lock = asyncio.Lock()
+		self._health_task: asyncio.Task | None = None
+		self._background_tasks: set[asyncio.Task] = set()
+		self._launches: set[asyncio.Task] = set()  # launches for acquire(), not cancelled by close() but awaited
+		# shared browser processes that pooled sessions live in when contexts_per_browser > 1
+		self._hosts: dict[str, BrowserSession] = {}
+		self._host_of: dict[str, str] = {}  # pooled session id -> host session id
+
+		self._total_launched = 0
+		self._total_evicted = 0
+		self._total_leases = 0
+		self._total_lease_wait = 0.0
+
+	@property
+	def size(self) -> int:
+		return len(self._idle) + len(self._leased) + self._launching
+
+	def stats(self) -> BrowserPoolStats:
+		return BrowserPoolStats(
+			idle=len(self._idle),
+			leased=len(self._leased),
+			launching=self._launching,
+			browsers=len(self._hosts) if self.contexts_per_browser > 1 else self.size,
+			min_size=self.min_size,
+			max_size=self.max_size,
+			total_launched=self._total_launched,
+			total_evicted=self._total_evicted,
+			total_leases=self._total_leases,
+			avg_lease_wait_ms=(self._total_lease_wait / self._total_leases * 1000) if self._total_leases else 0.0,
+		)
+
+	async def start(self) -> BrowserPool:
+		"""Launch min_size browsers up front and start the background health checker"""
+		await self._fill_to_min_size()
+		if self._health_task is None and self.health_check_interval > 0:
+			self._health_task = asyncio.create_task(self._health_check_loop())
+		return self
+
+	async def acquire(self, timeout: float | None = None) -> BrowserSession:
+		"""Lease a healthy, clean BrowserSession, launching a new one if the pool has room, otherwise waiting for a release"""
+		started_at = time.monotonic()
+		failed_launches = 0
+		async with asyncio.timeout(timeout):
+			while True:
+				launch = False
+				async with self._condition:
+					if self._closed:
+						raise RuntimeError('BrowserPool is closed')
+					while self._idle:
+						browser_session = self._idle.popleft()
+						if self._is_healthy(browser_session):
+							self._leased[browser_session.id] = browser_session
+							self._record_lease(started_at)
+							return browser_session
+						self._spawn(self._evict(browser_session, reason='failed health check while idle'))
+					if self.size < self.max_size:
+						self._launching += 1
+						launch = True
+					else:
+						await self._condition.wait()
+						continue
+
+				if launch:
+					# shielded: a timeout or cancellation must not interrupt the launch halfway and leak the browser
+					launch_task = asyncio.create_task(self._launch_leased())
+					self._launches.add(launch_task)
+					launch_task.add_done_callback(self._launches.discard)
+					try:
+						browser_session = await asyncio.shield(launch_task)
+					except asyncio.CancelledError:
+						launch_task.add_done_callback(self._release_unclaimed)
+						raise
+					if browser_session is None:
+						# e.g. a broken browser install, fail instead of retrying forever when there is no timeout
+						failed_launches += 1
+						if failed_launches >= self.max_launch_attempts and self._last_launch_error is not None:
+							raise self._last_launch_error
+						continue
+					self._record_lease(started_at)
+					return browser_session
+
+	async def release(self, browser_session: BrowserSession) -> None:
+		"""Return a leased BrowserSession to the pool, resetting it or evicting it if it is no longer usable"""
+		async with self._condition:
+			if browser_session.id not in self._leased:
+				logger.warning(f'⚠️ BrowserPool.release() called with a session that was not leased from this pool: {browser_session}')
+				return
+			del self._leased[browser_session.id]
+
+		self._uses[browser_session.id] = self._uses.get(browser_session.id, 0) + 1
+		reason = self._eviction_reason(browser_session)
+		if reason is None:
+			try:
+				await browser_session.reset()
+			except Exception as e:
+				reason = f'failed to reset: {type(e).__name__}: {e}'
+
+		async with self._condition:
+			if reason is None and not self._closed:
+				self._idle.append(browser_session)
+				self._condition.notify()
+				return
+
+		await self._evict(browser_session, reason=reason or 'pool is closed')
+		if not self._closed:
+			self._spawn(self._fill_to_min_size())
+
+	@asynccontextmanager
+	async def lease(self, timeout: float | None = None) -> AsyncIterator[BrowserSession]:
+		browser_session = await self.acquire(timeout=timeout)
+		try:
+			yield browser_session
+		finally:
+			await self.release(browser_session)
+
+	async def close(self) -> None:
+		"""Shut down every browser in the pool, including ones that are still leased"""
+		async with self._condition:
+			self._closed = True
+			sessions = [*self._idle, *self._leased.values()]
+			self._idle.clear()
+			self._leased.clear()
+			self._condition.notify_all()
+
+		if self._health_task:
+			self._health_task.cancel()
+			self._health_task = None
+		for task in list(self._background_tasks):
+			task.cancel()
+		# a browser launched for acquire() is evicted by _launch_leased() once it is up
+		await asyncio.gather(*self._launches, return_exceptions=True)
+
+		await asyncio.gather(*(self._evict(s, reason='pool closed') for s in sessions), return_exceptions=True)
+		await asyncio.gather(*(self._stop_host(h) for h in list(self._hosts.values())), return_exceptions=True)
+
+	def _record_lease(self, started_at: float) -> None:
+		self._total_leases += 1
+		self._total_lease_wait += time.monotonic() - started_at
+
+	def _new_profile(self) -> BrowserProfile:
+		profile = self.profile_factory() if self.profile_factory else self.browser_profile.model_copy(deep=True)
+		# pooled browsers must outlive the Agent that leases them, and they must not share a user_data_dir
+		# (persistent profiles cannot be opened by two browsers at once, and storage has to be wiped between leases)
+		return profile.model_copy(update={'keep_alive': True, 'user_data_dir': None})
+
+	async def _launch(self) -> BrowserSession | None:
+		"""Launch a new browser, caller must have already incremented self._launching"""
+		browser_session = None
+		try:
+			async with self._launch_lock:
+				if self.contexts_per_browser > 1:
+					host = await self._get_host()
+					browser_session = await host.new_isolated_session(keep_alive=True)
+					self._host_of[browser_session.id] = host.id
+				else:
+					browser_session = BrowserSession(browser_profile=self._new_profile())
+					await browser_session.start()
+			self._total_launched += 1
+			logger.debug(f'🏊 BrowserPool launched {browser_session._connection_str} ({self.size}/{self.max_size})')
+			return browser_session
+		except Exception as e:
+			logger.error(f'❌ BrowserPool failed to launch a new browser: {type(e).__name__}: {e}')
+			self._last_launch_error = e
+			if browser_session is not None:
+				await self._evict(browser_session, reason='failed to launch')
+			if self._closed:
+				raise
+			await asyncio.sleep(1)  # avoid spinning on a launch that keeps failing
+			return None
+		finally:
+			async with self._condition:
+				self._launching -= 1
+				self._condition.notify()
+
+	async def _launch_leased(self) -> BrowserSession | None:
+		"""Launch a new browser and register it as leased, caller must have already incremented self._launching"""
+		browser_session = await self._launch()
+		if browser_session is None:
+			return None
+		async with self._condition:
+			if not self._closed:
+				self._leased[browser_session.id] = browser_session
+				return browser_session
+		await self._evict(browser_session, reason='pool closed')
+		raise RuntimeError('BrowserPool is closed')
+
+	def _release_unclaimed(self, launch_task: asyncio.Task) -> None:
+		"""Done callback of a launch whose acquire() timed out or was cancelled, its browser goes back to the pool"""
+		if launch_task.cancelled() or launch_task.exception() is not None or launch_task.result() is None:
+			return
+		self._spawn(self.release(launch_task.result()))
+
+	async def _get_host(self) -> BrowserSession:
+		"""Find a shared browser with a free context slot, launching a new one if they are all full"""
+		tenants = {host_id: 0 for host_id in self._hosts}
+		for host_id in self._host_of.values():
+			tenants[host_id] = tenants.get(host_id, 0) + 1
+		for host_id, host in list(self._hosts.items()):
+			if self._host_eviction_reason(host) is not None:
+				if not tenants[host_id]:
+					await self._stop_host(host)
+				continue
+			if tenants[host_id] < self.contexts_per_browser:
+				return host
+
+		host = BrowserSession(browser_profile=self._new_profile())
+		await host.start()
+		# every tenant opens its own context, close the host's default one so its page, init script and request routes
+		# don't sit unused in every shared browser
+		if host.browser_context is not None:
+			await host.browser_context.close()
+			host.browser_context = None
+		self._hosts[host.id] = host
+		logger.debug(f'🏊 BrowserPool launched shared browser {host._connection_str} ({len(self._hosts)} total)')
+		return host
+
+	async def _stop_host(self, host: BrowserSession) -> None:
+		self._hosts.pop(host.id, None)
+		host.browser_profile.keep_alive = False
+		try:
+			await host.stop()
+		except Exception as e:
+			logger.debug(f'❌ Error stopping shared browser: {type(e).__name__}: {e}')
+
+	async def _fill_to_min_size(self) -> None:
+		while not self._closed:
+			async with self._condition:
+				if self.size >= self.min_size:
+					return
+				self._launching += 1
+			browser_session = await self._launch()
+			if browser_session is None:
+				return
+			async with self._condition:
+				if not self._closed:
+					self._idle.append(browser_session)
+					self._condition.notify()
+					continue
+			await self._evict(browser_session, reason='pool closed')
+
+	def _is_healthy(self, browser_session: BrowserSession) -> bool:
+		return browser_session.initialized and browser_session.is_connected()
+
+	def _rss_mb(self, browser_session: BrowserSession) -> float | None:
+		"""Resident memory of the browser process and all of its children (renderers, gpu, etc.)"""
+		if not browser_session.browser_pid:
+			return None
+		try:
+			proc = psutil.Process(browser_session.browser_pid)
+			procs = [proc, *proc.children(recursive=True)]
+			return sum(p.memory_info().rss for p in procs) / 1024 / 1024
+		except psutil.Error:
+			return None
+
+	def _host_eviction_reason(self, host: BrowserSession) -> str | None:
+		# hosts have no context of their own, so only the browser connection tells whether they are alive
+		if not (host.browser and host.browser.is_connected()):
+			return 'shared browser disconnected or crashed'
+		if self.max_rss_mb is not None:
+			rss_mb = self._rss_mb(host)
+			if rss_mb is not None and rss_mb > self.max_rss_mb:
+				return f'shared browser using {rss_mb:.0f}MB > max_rss_mb={self.max_rss_mb:.0f}MB'
+		return None
+
+	def _eviction_reason(self, browser_session: BrowserSession) -> str | None:
+		if not self._is_healthy(browser_session):
+			return 'browser disconnected or crashed'
+		if self.max_uses is not None and self._uses.get(browser_session.id, 0) >= self.max_uses:
+			return f'served max_uses={self.max_uses} leases'
+		host_id = self._host_of.get(browser_session.id)
+		if host_id is not None:
+			# memory is only measurable per browser process, drain every context of a host that grew too large
+			host = self._hosts.get(host_id)
+			return self._host_eviction_reason(host) if host else 'shared browser is gone'
+		if self.max_rss_mb is not None:
+			rss_mb = self._rss_mb(browser_session)
+			if rss_mb is not None and rss_mb > self.max_rss_mb:
+				return f'using {rss_mb:.0f}MB > max_rss_mb={self.max_rss_mb:.0f}MB'
+		return None
+
+	async def _evict(self, browser_session: BrowserSession, reason: str) -> None:
+		self._total_evicted += 1
+		self._uses.pop(browser_session.id, None)
+		logger.info(f'🗑️ BrowserPool evicting {browser_session._connection_str}: {reason}')
+		browser_session.browser_profile.keep_alive = False
+		try:
+			# stop() rather than kill(): kill() also shuts down the playwright driver that every pooled session shares
+			await browser_session.stop()
+		except Exception as e:
+			logger.debug(f'❌ Error stopping evicted browser: {type(e).__name__}: {e}')
+
+		# shut down a shared browser once its last context is gone, keeping one healthy empty browser around to refill from
+		host_id = self._host_of.pop(browser_session.id, None)
+		host = self._hosts.get(host_id) if host_id else None
+		if (
+			host
+			and host_id not in self._host_of.values()
+			and (self._closed or len(self._hosts) > 1 or self._host_eviction_reason(host))
+		):
+			await self._stop_host(host)
+
+	async def _health_check_loop(self) -> None:
+		while not self._closed:
+			await asyncio.sleep(self.health_check_interval)
+			async with self._condition:
+				idle = list(self._idle)
+				self._idle.clear()
+				for browser_session in idle:
+					reason = self._eviction_reason(browser_session)
+					if reason is None:
+						self._idle.append(browser_session)
+					else:
+						self._spawn(self._evict(browser_session, reason=reason))
+			try:
+				await self._fill_to_min_size()
+			except Exception as e:
+				logger.warning(f'⚠️ BrowserPool failed to refill to min_size={self.min_size}: {type(e).__name__}: {e}')
+
+	def _spawn(self, coro) -> None:
+		task = asyncio.create_task(coro)
+		self._background_tasks.add(task)
+		task.add_done_callback(self._background_tasks.discard)
@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 from collections.abc import Iterable
 from enum import Enum
@@ -491,6 +492,52 @@ class BrowserLaunchArgs(BaseModel):
 		return [f'--{key.lstrip("-")}={value}' if value else f'--{key.lstrip("-")}' for key, value in args.items()]
 
 
+class ResourceBlockingPreset(BaseModel):
+	"""A named set of request blocking rules, enabled with BrowserProfile(block_presets=[...])"""
+
+	resource_types: set[str] = Field(default_factory=set)  # playwright request.resource_type values, e.g. image, media, font
+	domains: list[str] = Field(default_factory=list)  # blocks the domain and all of its subdomains
+	url_patterns: list[str] = Field(default_factory=list)  # case-insensitive substrings of the full URL
+
+
+_TRACKER_DOMAINS = [
+	'google-analytics.com',
+	'googletagmanager.com',
+	'googlesyndication.com',
+	'googleadservices.com',
+	'doubleclick.net',
+	'adservice.google.com',
+	'connect.facebook.net',
+	'hotjar.com',
+	'clarity.ms',
+	'segment.io',
+	'mixpanel.com',
+	'amplitude.com',
+	'fullstory.com',
+	'scorecardresearch.com',
+	'quantserve.com',
+	'taboola.com',
+	'outbrain.com',
+	'criteo.com',
+	'adnxs.com',
+	'onesignal.com',
+	'pushwoosh.com',
+]
+
+# add your own presets here to make them available to every BrowserProfile by name
+RESOURCE_BLOCKING_PRESETS: dict[str, ResourceBlockingPreset] = {
+	# analytics, ads and push-notification services, never needed to use a site
+	'trackers': ResourceBlockingPreset(domains=_TRACKER_DOMAINS, url_patterns=['/adserver', '/adsystem']),
+	# video/audio and images, the page layout stays intact but screenshots show empty image boxes
+	'no-media': ResourceBlockingPreset(resource_types={'media', 'image'}),
+	# only documents, scripts, stylesheets and API calls, for agents that work purely from the DOM text
+	'text-only': ResourceBlockingPreset(
+		resource_types={'media', 'image', 'font', 'texttrack', 'manifest', 'other'},
+		domains=_TRACKER_DOMAINS,
+	),
+}
+
+
 # ===== API-specific Models =====
 
 
@@ -579,6 +626,10 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 		description='List of allowed domains for navigation e.g. ["*.google.com", "https://example.com", "chrome-extension://*"]',
 	)
 	keep_alive: bool | None = Field(default=None, description='Keep browser alive after agent run.')
+	isolated_context: bool = Field(
+		default=False,
+		description='When attaching to a shared browser, always open a new isolated BrowserContext instead of reusing its first one, and only close that context on stop().',
+	)
 	window_size: ViewportSize | None = Field(
 		default=None,
 		description='Browser window size to use when headless=False.',
@@ -602,6 +653,57 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 	include_dynamic_attributes: bool = Field(default=True, description='Include dynamic attributes in selectors.')
 	highlight_elements: bool = Field(default=True, description='Highlight interactive elements on the page.')
 	viewport_expansion: int = Field(default=500, description='Viewport expansion in pixels for LLM context.')
+	incremental_dom: bool = Field(
+		default=False,
+		description='Only re-extract the parts of the DOM that changed since the previous step (tracked in-page with a MutationObserver), reusing the rest of the last snapshot. Experimental: layout changes without a mutation inside a reused subtree (e.g. an image above it finished loading) are not detected, so elements they move into the viewport can be missed.',
+	)
+
+	# --- Request blocking ---
+	# NOTE: blocking installs a playwright route on the context, and routing disables the browser's own HTTP cache
+	# for that context, so every page load re-downloads everything that is not blocked
+	block_presets: list[str] = Field(
+		default_factory=list,
+		description='Names of request blocking presets from RESOURCE_BLOCKING_PRESETS to combine, e.g. ["trackers", "no-media"].',
+	)
+	block_resource_types: list[str] = Field(
+		default_factory=list,
+		description='Abort requests of these playwright resource types, e.g. ["image", "media", "font"]. Every request is intercepted when set.',
+	)
+	block_domains: list[str] = Field(default_factory=list, description='Abort requests to these domains and their subdomains.')
+	block_url_patterns: list[str] = Field(
+		default_factory=list, description='Abort requests whose URL contains any of these case-insensitive substrings.'
+	)
+
+	# --- HTTP cache ---
+	http_cache_dir: Path | None = Field(
+		default=None,
+		description='Directory of an on-disk cache for static assets (JS, CSS, fonts, images) shared by every session using it, even across incognito contexts. '
+		'It is implemented with a playwright route, which disables the browser\'s own HTTP cache for the context: documents, XHR and assets that '
+		'are not stored (e.g. no-cache + ETag) are re-downloaded on every load and cache misses are proxied through python. Only worth it when '
+		'many short-lived sessions load the same heavy assets, measure before enabling it.',
+	)
+	http_cache_max_size_mb: float = Field(default=1024, gt=0, description='Least recently used assets are evicted above this size.')
+
+	# --- Screenshots ---
+	screenshot_format: Literal['png', 'jpeg', 'webp'] = Field(
+		default='png',
+		description='Image format of the screenshots sent to the LLM, jpeg and webp are much smaller than png.',
+	)
+	screenshot_quality: int = Field(default=75, ge=1, le=100, description='Quality of jpeg/webp screenshots.')
+	screenshot_max_size: ViewportSize | None = Field(
+		default=None,
+		description='Downscale screenshots to fit into this size (keeping the aspect ratio), e.g. {"width": 1280, "height": 1100}.',
+	)
+	screenshot_change_threshold: int | None = Field(
+		default=None,
+		ge=0,
+		le=64,
+		description='Treat a screenshot as unchanged when its 64-bit perceptual hash differs from the previous one in at most this many bits, None disables the check.',
+	)
+	screenshot_when_unchanged: Literal['reuse', 'skip'] = Field(
+		default='reuse',
+		description='For unchanged screenshots, either reuse the previous frame (shared in memory) or send no image at all.',
+	)
 
 	profile_directory: str = 'Default'  # e.g. 'Profile 1', 'Profile 2', 'Custom Profile', etc.
 
@@ -630,6 +732,29 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 	def __str__(self) -> str:
 		return f'BrowserProfile#{self.id[-4:]}'
 
+	@model_validator(mode='after')
+	def validate_block_presets(self) -> Self:
+		"""Fail early on typos in preset names instead of silently blocking nothing"""
+		unknown = [name for name in self.block_presets if name not in RESOURCE_BLOCKING_PRESETS]
+		if unknown:
+			raise ValueError(f'Unknown block_presets {unknown}, available presets: {list(RESOURCE_BLOCKING_PRESETS)}')
+		return self
+
+	def get_resource_blocking_rules(self) -> tuple[set[str], Pattern[str] | None]:
+		"""Merge the presets and block_* options into (blocked resource types, one regex matching every blocked URL)"""
+		presets = [RESOURCE_BLOCKING_PRESETS[name] for name in self.block_presets]
+		resource_types = set(self.block_resource_types).union(*(preset.resource_types for preset in presets))
+		domains = [*self.block_domains, *(domain for preset in presets for domain in preset.domains)]
+		url_patterns = [*self.block_url_patterns, *(pattern for preset in presets for pattern in preset.url_patterns)]
+
+		alternatives = [re.escape(pattern) for pattern in dict.fromkeys(url_patterns)]
+		if domains:
+			# scheme://[anything.]domain[:port] followed by the end of the host
+			hosts = '|'.join(re.escape(domain.lower().strip('.')) for domain in dict.fromkeys(domains))
+			alternatives.append(rf'^[a-z][a-z0-9+.-]*://([^/?#@]*@)?([^/?#@]*\.)?({hosts})(:[0-9]+)?([/?#]|$)')
+		url_regex = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+		return resource_types, url_regex
+
 	@model_validator(mode='after')
 	def copy_old_config_names_to_new(self) -> Self:
 		"""Copy old config window_width & window_height to window_size."""
@@ -0,0 +1,87 @@
+"""
+Post-processing of the screenshots captured for every step: downscaling, lossy re-encoding,
+base64 encoding and perceptual change detection. Everything in here is CPU-bound and is meant
+to be run in a worker thread (see BrowserSession.take_screenshot).
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from PIL import Image
+
+	from browser_use.browser.profile import BrowserProfile
+
+# leading base64 characters of the file signature of each format we can produce
+_MIME_TYPES_BY_B64_PREFIX = {
+	'iVBOR': 'image/png',
+	'/9j/': 'image/jpeg',
+	'UklGR': 'image/webp',
+}
+
+
+def screenshot_mime_type(screenshot_b64: str) -> str:
+	"""Detect the image type of a base64 encoded screenshot from its file signature"""
+	for prefix, mime_type in _MIME_TYPES_BY_B64_PREFIX.items():
+		if screenshot_b64.startswith(prefix):
+			return mime_type
+	return 'image/png'
+
+
+def perceptual_hash(image: Image.Image) -> int:
+	"""64-bit difference hash (dHash), near-identical frames differ in only a few bits"""
+	from PIL import Image
+
+	pixels = image.convert('L').resize((9, 8), Image.Resampling.BILINEAR).tobytes()
+	bits = 0
+	for row in range(8):
+		for col in range(8):
+			bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+	return bits
+
+
+def hamming_distance(a: int, b: int) -> int:
+	return (a ^ b).bit_count()
+
+
+@dataclass
+class ProcessedScreenshot:
+	screenshot_b64: str
+	phash: int | None = None
+
+
+def process_screenshot(screenshot: bytes, profile: BrowserProfile) -> ProcessedScreenshot:
+	"""
+	Turn the raw bytes returned by the browser into the base64 string handed to the LLM.
+	Pillow is only needed (and only imported) when downscaling, WebP output or change detection is enabled.
+	"""
+	max_size = profile.screenshot_max_size
+	needs_reencode = profile.screenshot_format == 'webp'
+	needs_image = needs_reencode or max_size is not None or profile.screenshot_change_threshold is not None
+	if not needs_image:
+		return ProcessedScreenshot(base64.b64encode(screenshot).decode('utf-8'))
+
+	from PIL import Image
+
+	image = Image.open(io.BytesIO(screenshot))
+	if max_size is not None and (image.width > max_size['width'] or image.height > max_size['height']):
+		image.thumbnail((max_size['width'], max_size['height']), Image.Resampling.LANCZOS)
+		needs_reencode = True
+
+	phash = perceptual_hash(image) if profile.screenshot_change_threshold is not None else None
+
+	if needs_reencode:
+		buffer = io.BytesIO()
+		if profile.screenshot_format == 'png':
+			image.save(buffer, format='PNG', optimize=False)
+		else:
+			if image.mode not in ('RGB', 'L'):
+				image = image.convert('RGB')
+			image.save(buffer, format=profile.screenshot_format.upper(), quality=profile.screenshot_quality)
+		screenshot = buffer.getvalue()
+
+	return ProcessedScreenshot(base64.b64encode(screenshot).decode('utf-8'), phash=phash)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-import base64
+import hashlib
 import json
 import logging
 import os
 import re
 import time
+import weakref
 from dataclasses import dataclass
 from functools import wraps
 from pathlib import Path
@@ -35,10 +36,13 @@ from playwright.async_api import Playwright, async_playwright
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field, InstanceOf, PrivateAttr, model_validator
 from uuid_extensions import uuid7str
 
+from browser_use.browser.http_cache import HttpCache
 from browser_use.browser.profile import BROWSERUSE_DEFAULT_CHANNEL, BrowserChannel, BrowserProfile
+from browser_use.browser.screenshot import ProcessedScreenshot, hamming_distance, process_screenshot
 from browser_use.browser.views import (
 	BrowserError,
 	BrowserStateSummary,
+	ResourceBlockingStats,
 	TabInfo,
 	URLNotAllowedError,
 )
@@ -70,6 +74,153 @@ GLOBAL_PATCHRIGHT_API_OBJECT = None  # never instantiate the patchright API obje
 GLOBAL_PLAYWRIGHT_EVENT_LOOP = None  # track which event loop the global objects belong to
 GLOBAL_PATCHRIGHT_EVENT_LOOP = None  # track which event loop the global objects belong to
 
+# Requests that never matter for whether a page finished loading
+IGNORED_URL_PATTERNS = (
+	# Analytics and tracking
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'metrics',
+	# Ad-related
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	# Social media widgets
+	'facebook.com/plugins',
+	'platform.twitter',
+	'linkedin.com/embed',
+	# Live chat and support
+	'livechat',
+	'zendesk',
+	'intercom',
+	'crisp.chat',
+	'hotjar',
+	# Push notifications
+	'push-notifications',
+	'onesignal',
+	'pushwoosh',
+	# Background sync/heartbeat
+	'heartbeat',
+	'ping',
+	'alive',
+	# WebRTC and streaming
+	'webrtc',
+	'rtmp://',
+	'wss://',
+	# Common CDNs for dynamic content
+	'cloudfront.net',
+	'fastly.net',
+)
+# one case-insensitive alternation, so each URL is matched in a single pass instead of once per pattern
+# (re.escape output is also a valid JS RegExp source as long as the u flag is not used)
+IGNORED_URL_PATTERN = '|'.join(re.escape(pattern) for pattern in IGNORED_URL_PATTERNS)
+
+# Resolves once no relevant request has been in flight for idleTime ms, or after timeout ms.
+# Runs entirely inside the page: a PerformanceObserver reports finished requests and the DOM is checked for
+# documents, stylesheets, images, fonts, scripts and iframes that are still loading, so no per-request events cross
+# over to python. Like before, only those types count, fetch/XHR/media/websockets don't.
+WAIT_FOR_NETWORK_IDLE_JS = """
+async ({ idleTime, timeout, ignoredUrlPattern }) => {
+	const ignoredUrl = new RegExp(ignoredUrlPattern, 'i');
+	const RELEVANT_INITIATORS = new Set(['navigation', 'link', 'css', 'img', 'image', 'input', 'script', 'iframe', 'frame']);
+	const MAX_RESOURCE_SIZE = 5 * 1024 * 1024;
+
+	const isRelevantUrl = (url) => !!url && !url.startsWith('data:') && !url.startsWith('blob:') && !ignoredUrl.test(url);
+
+	const startedAt = performance.now();
+	let lastActivity = startedAt;
+
+	// scripts and iframes have no "loaded" property. The ones already in the document when the wait started count
+	// as loading until the document's load event (which waits for them), not by element: some never fetch (inserted
+	// via innerHTML) or never get a resource timing entry (cleared, blocked, failed). Only the ones added or pointed
+	// at a new src during the wait are tracked until their load/error event or resource timing entry.
+	const finishedUrls = new Set();
+	const trackedElements = new Set();
+	const isScriptOrIframe = (node) => node instanceof HTMLScriptElement || node instanceof HTMLIFrameElement;
+	const track = (element) => {
+		if (isScriptOrIframe(element) && element.src) trackedElements.add(element);
+	};
+	const mutationObserver = new MutationObserver((records) => {
+		for (const record of records) {
+			if (record.type === 'attributes') {
+				track(record.target);
+				continue;
+			}
+			for (const node of record.addedNodes) {
+				if (node.nodeType !== Node.ELEMENT_NODE) continue;
+				track(node);
+				for (const element of node.querySelectorAll('script[src], iframe[src]')) track(element);
+			}
+		}
+	});
+	mutationObserver.observe(document, { subtree: true, childList: true, attributes: true, attributeFilter: ['src'] });
+	const onLoaded = (event) => {
+		if (isScriptOrIframe(event.target)) {
+			finishedUrls.add(event.target.src);
+			trackedElements.delete(event.target);
+		}
+	};
+	// load and error do not bubble, but they can be captured
+	document.addEventListener('load', onLoaded, true);
+	document.addEventListener('error', onLoaded, true);
+
+	const observer = new PerformanceObserver((list) => {
+		for (const entry of list.getEntries()) {
+			finishedUrls.add(entry.name);
+			if (!RELEVANT_INITIATORS.has(entry.initiatorType) || !isRelevantUrl(entry.name)) continue;
+			if (entry.encodedBodySize > MAX_RESOURCE_SIZE) continue;
+			lastActivity = Math.max(lastActivity, entry.responseEnd || performance.now());
+		}
+	});
+	observer.observe({ type: 'resource', buffered: false });
+
+	const pendingUrls = () => {
+		const pending = [];
+		if (document.readyState === 'loading') pending.push(location.href);
+		for (const img of document.images) {
+			if (!img.complete && img.loading !== 'lazy' && isRelevantUrl(img.currentSrc || img.src)) pending.push(img.currentSrc || img.src);
+		}
+		for (const link of document.querySelectorAll('link[rel~="stylesheet"][href]')) {
+			if (!link.sheet && !link.disabled && isRelevantUrl(link.href)) pending.push(link.href);
+		}
+		if (document.readyState === 'interactive' && document.querySelector('script[src], iframe[src]')) {
+			pending.push('(scripts and iframes of the document)');
+		}
+		for (const element of trackedElements) {
+			if (!element.isConnected || finishedUrls.has(element.src) || !isRelevantUrl(element.src)) continue;
+			if (element instanceof HTMLScriptElement) {
+				const type = element.type.trim().toLowerCase();
+				// other types (e.g. application/ld+json, text/template) and nomodule scripts are never fetched
+				if (element.noModule || !(type === '' || type === 'module' || type.includes('javascript'))) continue;
+			} else if (element.loading === 'lazy') {
+				continue;
+			}
+			pending.push(element.src);
+		}
+		if (document.fonts && document.fonts.status === 'loading') pending.push('(web fonts)');
+		return pending;
+	};
+
+	try {
+		while (true) {
+			await new Promise((resolve) => setTimeout(resolve, 100));
+			const now = performance.now();
+			const pending = pendingUrls();
+			if (pending.length) lastActivity = Math.max(lastActivity, now);
+			else if (now - lastActivity >= idleTime) return { idle: true, pending };
+			if (now - startedAt >= timeout) return { idle: false, pending };
+		}
+	} finally {
+		observer.disconnect();
+		mutationObserver.disconnect();
+		document.removeEventListener('load', onLoaded, true);
+		document.removeEventListener('error', onLoaded, true);
+	}
+}
+"""
+
 
 def _log_glob_warning(domain: str, glob: str, logger: logging.Logger):
 	global _GLOB_WARNING_SHOWN
@@ -225,6 +376,10 @@ class BrowserSession(BaseModel):
 	_cached_clickable_element_hashes: CachedClickableElementHashes | None = PrivateAttr(default=None)
 	_start_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
 	_tab_visibility_callback: Any = PrivateAttr(default=None)
+	_dom_services: weakref.WeakKeyDictionary = PrivateAttr(default_factory=weakref.WeakKeyDictionary)  # page -> DomService
+	_last_screenshot: tuple[bytes, ProcessedScreenshot] | None = PrivateAttr(default=None)  # (digest of raw bytes, result)
+	_resource_blocking_stats: ResourceBlockingStats = PrivateAttr(default_factory=ResourceBlockingStats)
+	_average_transfer_size: float = PrivateAttr(default=0.0)  # bytes per loaded request, used to estimate what blocking saved
 	_logger: logging.Logger | None = PrivateAttr(default=None)
 
 	@model_validator(mode='after')
@@ -424,8 +579,8 @@ class BrowserSession(BaseModel):
 								if self.browser_context:
 									await self.browser_context.close()
 									self.browser_context = None  # Prevent duplicate close attempts
-								# Then close browser if we have one
-								if self.browser and self.browser.is_connected():
+								# Then close browser if we have one, unless other isolated sessions are sharing it
+								if self.browser and self.browser.is_connected() and not self.browser_profile.isolated_context:
 									await self.browser.close()
 						except TimeoutError:
 							self.logger.warning('⏱️ Timeout while closing browser/context, has it become unresponsive?')
@@ -439,7 +594,7 @@ class BrowserSession(BaseModel):
 						self.browser = None
 
 				# kill the chrome subprocess if we were the ones that started it
-				if self.browser_pid:
+				if self.browser_pid and not self.browser_profile.isolated_context:
 					try:
 						proc = psutil.Process(pid=self.browser_pid)
 						executable_path = proc.cmdline()[0]
@@ -503,6 +658,68 @@ class BrowserSession(BaseModel):
 
 				self.playwright = None
 
+	async def reset(self) -> None:
+		"""Return a running session to a single about:blank tab with empty cookies/storage, without relaunching the browser"""
+		if not self.initialized or not self.is_connected():
+			raise RuntimeError(f'Cannot reset {self._connection_str}, BrowserSession is not connected')
+
+		async with asyncio.timeout(30):
+			async with self._start_lock:
+				self.agent_current_page = None
+				self.human_current_page = None
+				self._cached_clickable_element_hashes = None
+				self._cached_browser_state_summary = None
+				self._dom_services.clear()
+				self._last_screenshot = None
+
+				if self.browser and self.browser_context:
+					# we own a real Browser object: throwing away the context is the only way to guarantee
+					# that cookies, localStorage, IndexedDB, service workers, etc. from the last run are all gone
+					old_context, self.browser_context = self.browser_context, None
+					try:
+						await old_context.close()
+					except Exception as e:
+						self.logger.debug(f'❌ Error closing browser_context during reset: {type(e).__name__}: {e}')
+					await self.setup_new_browser_context()
+					await self._setup_viewports()
+					await self._setup_current_page_change_listeners()
+				else:
+					# persistent context (launch_persistent_context gives us no Browser object), wipe it in place
+					assert self.browser_context
+					await self.browser_context.clear_cookies()
+					await self.browser_context.clear_permissions()
+					for page in self.browser_context.pages:
+						try:
+							await page.evaluate('() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }')
+						except Exception:
+							pass
+					for page in self.browser_context.pages[1:]:
+						await page.close()
+					page = self.browser_context.pages[0] if self.browser_context.pages else await self.browser_context.new_page()
+					await page.goto('about:blank')
+					self.agent_current_page = self.human_current_page = page
+
+		self.logger.debug(f'♻️ Reset {self._connection_str} to a clean about:blank context')
+
+	async def new_isolated_session(self, **profile_overrides) -> BrowserSession:
+		"""
+		Create a BrowserSession that shares this session's browser process but gets its own isolated BrowserContext.
+
+		Each isolated session has separate cookies/localStorage/cache, and stopping it only closes its own context,
+		so many concurrent agents can run inside one browser instead of one browser (and user_data_dir) per agent.
+		"""
+		if not self.initialized or not self.browser:
+			raise RuntimeError(
+				'BrowserSession.new_isolated_session() needs a started session with a Browser object, '
+				'persistent contexts (user_data_dir=...) cannot be shared, use user_data_dir=None for the shared browser'
+			)
+
+		browser_profile = self.browser_profile.model_copy(
+			update={'id': uuid7str(), 'isolated_context': True, 'keep_alive': False, 'user_data_dir': None, **profile_overrides}
+		)
+		browser_session = BrowserSession(browser_profile=browser_profile, browser=self.browser, playwright=self.playwright)
+		return await browser_session.start()
+
 	async def new_context(self, **kwargs):
 		"""Deprecated: Provides backwards-compatibility with old class method Browser().new_context()."""
 		# TODO: remove this after >=0.3.0
@@ -754,7 +971,7 @@ class BrowserSession(BaseModel):
 
 		# if we have a browser object but no browser_context, use the first context discovered or make a new one
 		if self.browser and not self.browser_context:
-			if self.browser.contexts:
+			if self.browser.contexts and not self.browser_profile.isolated_context:
 				self.browser_context = self.browser.contexts[0]
 				self.logger.info(f'🌎 Using first browser_context available in existing browser: {self.browser_context}')
 			else:
@@ -896,7 +1113,8 @@ class BrowserSession(BaseModel):
 			)
 			new_chrome_procs = []
 
-		if new_chrome_procs and not self.browser_pid:
+		# isolated contexts never launch a browser, any new processes belong to other sessions sharing this one
+		if new_chrome_procs and not self.browser_pid and not self.browser_profile.isolated_context:
 			self.browser_pid = new_chrome_procs[0].pid
 			self.logger.info(f' ↳ Spawned browser_pid={self.browser_pid} {_log_pretty_path(new_chrome_procs[0].cmdline()[0])}')
 			self.logger.debug(' '.join(new_chrome_procs[0].cmdline()))  # print the entire launch command for debugging
@@ -975,9 +1193,78 @@ class BrowserSession(BaseModel):
 			else:
 				raise
 
+		# Install the DOM extractor once per context, every later page/step just calls it by name
+		if self.browser_context:
+			try:
+				await DomService.install(self.browser_context)
+			except Exception as e:
+				# not fatal, DomService falls back to injecting the script on demand
+				self.logger.warning(f'⚠️ Failed to register DOM extractor init script: {type(e).__name__}: {e}')
+
+		if self.browser_context and self.http_cache:
+			try:
+				await self.http_cache.install(self.browser_context)
+			except Exception as e:
+				self.logger.warning(f'⚠️ Failed to set up the HTTP cache in {self.http_cache.directory}: {type(e).__name__}: {e}')
+
+		# routes added later run first, so blocked requests never even reach the cache
+		if self.browser_context:
+			await self._setup_resource_blocking()
+
 		if self.browser_profile.stealth and not isinstance(self.playwright, Patchright):
 			self.logger.warning('⚠️ Failed to set up stealth mode. (...) got normal playwright objects as input.')
 
+	async def _setup_resource_blocking(self) -> None:
+		"""Abort requests matching the profile's block_* options for every page in the context"""
+		assert self.browser_context is not None
+		blocked_resource_types, blocked_url_regex = self.browser_profile.get_resource_blocking_rules()
+		if not blocked_resource_types and blocked_url_regex is None:
+			return
+
+		async def abort(route) -> None:
+			request = route.request
+			stats = self._resource_blocking_stats
+			stats.blocked_requests += 1
+			stats.blocked_by_type[request.resource_type] = stats.blocked_by_type.get(request.resource_type, 0) + 1
+			stats.estimated_bytes_saved += int(self._average_transfer_size)
+			try:
+				await route.abort('blockedbyclient')
+			except Exception as e:
+				self.logger.debug(f'Failed to block request {_log_pretty_url(request.url)}: {type(e).__name__}: {e}')
+
+		if blocked_resource_types:
+			# playwright can only filter by resource type on our side, so every request has to come through here
+			async def abort_by_type_or_url(route) -> None:
+				request = route.request
+				if request.resource_type in blocked_resource_types or (
+					blocked_url_regex is not None and blocked_url_regex.search(request.url)
+				):
+					await abort(route)
+				else:
+					await route.fallback()
+
+			await self.browser_context.route('**/*', abort_by_type_or_url)
+		else:
+			# the regex is matched inside the browser, only requests that are going to be blocked reach python
+			await self.browser_context.route(blocked_url_regex, abort)
+
+		self.logger.debug(
+			f'🚫 Blocking requests: presets={self.browser_profile.block_presets} types={sorted(blocked_resource_types)} '
+			f'url_rules={"yes" if blocked_url_regex else "no"}'
+		)
+
+	@property
+	def http_cache(self) -> HttpCache | None:
+		"""The static asset cache shared by all sessions with the same http_cache_dir, if enabled"""
+		if self.browser_profile.http_cache_dir is None:
+			return None
+		return HttpCache.shared(self.browser_profile.http_cache_dir, int(self.browser_profile.http_cache_max_size_mb * 1024 * 1024))
+
+	@property
+	def resource_blocking_stats(self) -> ResourceBlockingStats:
+		"""Requests aborted by the block_* profile options so far"""
+		return self._resource_blocking_stats
+
 	# async def _fork_locked_user_data_dir(self) -> None:
 	# 	"""Fork an in-use user_data_dir by cloning it to a new location to allow a second browser to use it"""
 	# 	# TODO: implement copy-on-write using overlayfs or zfs or something
@@ -1581,18 +1868,17 @@ class BrowserSession(BaseModel):
 	async def get_tabs_info(self) -> list[TabInfo]:
 		"""Get information about all tabs"""
 
-		tabs_info = []
-		for page_id, page in enumerate(self.browser_context.pages):
+		async def get_tab_info(page_id: int, page: Page) -> TabInfo:
 			try:
-				tab_info = TabInfo(page_id=page_id, url=page.url, title=await asyncio.wait_for(page.title(), timeout=1))
+				return TabInfo(page_id=page_id, url=page.url, title=await asyncio.wait_for(page.title(), timeout=1))
 			except TimeoutError:
 				# page.title() can hang forever on tabs that are crashed/disappeared/about:blank
 				# we dont want to try automating those tabs because they will hang the whole script
 				self.logger.debug(f'⚠️ Failed to get tab info for tab #{page_id}: {_log_pretty_url(page.url)} (ignoring)')
-				tab_info = TabInfo(page_id=page_id, url='about:blank', title='ignore this tab and do not use it')
-			tabs_info.append(tab_info)
+				return TabInfo(page_id=page_id, url='about:blank', title='ignore this tab and do not use it')
 
-		return tabs_info
+		# titles are fetched concurrently, one hung tab costs its 1s timeout once instead of delaying every tab after it
+		return list(await asyncio.gather(*(get_tab_info(page_id, page) for page_id, page in enumerate(self.browser_context.pages))))
 
 	@require_initialization
 	async def close_tab(self, tab_index: int | None = None) -> None:
@@ -1845,179 +2131,50 @@ class BrowserSession(BaseModel):
 	# 	return list(Path(self.browser_profile.downloads_path).glob('*'))
 
 	async def _wait_for_stable_network(self):
-		pending_requests = set()
-		last_activity = asyncio.get_event_loop().time()
-
+		"""
+		Wait until the page's network traffic calmed down.
+		The requests are tracked inside the page by WAIT_FOR_NETWORK_IDLE_JS, a single evaluate() resolves once it is idle.
+		"""
 		page = await self.get_current_page()
 
-		# Define relevant resource types and content types
-		RELEVANT_RESOURCE_TYPES = {
-			'document',
-			'stylesheet',
-			'image',
-			'font',
-			'script',
-			'iframe',
-		}
-
-		RELEVANT_CONTENT_TYPES = {
-			'text/html',
-			'text/css',
-			'application/javascript',
-			'image/',
-			'font/',
-			'application/json',
-		}
-
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
-		async def on_request(request):
-			# Filter by resource type
-			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
-				return
-
-			# Filter out streaming, websocket, and other real-time requests
-			if request.resource_type in {
-				'websocket',
-				'media',
-				'eventsource',
-				'manifest',
-				'other',
-			}:
-				return
-
-			# Filter out by URL patterns
-			url = request.url.lower()
-			if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
-				return
-
-			# Filter out data URLs and blob URLs
-			if url.startswith(('data:', 'blob:')):
-				return
-
-			# Filter out requests with certain headers
-			headers = request.headers
-			if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in [
-				'video',
-				'audio',
-			]:
-				return
-
-			nonlocal last_activity
-			pending_requests.add(request)
-			last_activity = asyncio.get_event_loop().time()
-			# self.logger.debug(f'Request started: {request.url} ({request.resource_type})')
-
-		async def on_response(response):
-			request = response.request
-			if request not in pending_requests:
-				return
-
-			# Filter by content type if available
-			content_type = response.headers.get('content-type', '').lower()
-
-			# Skip if content type indicates streaming or real-time data
-			if any(
-				t in content_type
-				for t in [
-					'streaming',
-					'video',
-					'audio',
-					'webm',
-					'mp4',
-					'event-stream',
-					'websocket',
-					'protobuf',
-				]
-			):
-				pending_requests.remove(request)
-				return
-
-			# Only process relevant content types
-			if not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES):
-				pending_requests.remove(request)
-				return
-
-			# Skip if response is too large (likely not essential for page load)
-			content_length = response.headers.get('content-length')
-			if content_length and int(content_length) > 5 * 1024 * 1024:  # 5MB
-				pending_requests.remove(request)
-				return
-
-			nonlocal last_activity
-			pending_requests.remove(request)
-			last_activity = asyncio.get_event_loop().time()
-			# self.logger.debug(f'Request resolved: {request.url} ({content_type})')
-
-		# Attach event listeners
-		page.on('request', on_request)
-		page.on('response', on_response)
-
-		now = asyncio.get_event_loop().time()
-		try:
-			# Wait for idle time
-			start_time = asyncio.get_event_loop().time()
-			while True:
-				await asyncio.sleep(0.1)
+		start_time = asyncio.get_event_loop().time()
+		deadline = start_time + self.browser_profile.maximum_wait_page_load_time
+		now = start_time
+		while True:
+			remaining = deadline - now
+			try:
+				status = await page.evaluate(
+					WAIT_FOR_NETWORK_IDLE_JS,
+					{
+						'idleTime': self.browser_profile.wait_for_network_idle_page_load_time * 1000,
+						'timeout': remaining * 1000,
+						'ignoredUrlPattern': IGNORED_URL_PATTERN,
+					},
+				)
 				now = asyncio.get_event_loop().time()
-				if (
-					len(pending_requests) == 0
-					and (now - last_activity) >= self.browser_profile.wait_for_network_idle_page_load_time
-				):
-					break
-				if now - start_time > self.browser_profile.maximum_wait_page_load_time:
+				if not status['idle']:
 					self.logger.debug(
-						f'{self} Network timeout after {self.browser_profile.maximum_wait_page_load_time}s with {len(pending_requests)} '
-						f'pending requests: {[r.url for r in pending_requests]}'
+						f'{self} Network timeout after {self.browser_profile.maximum_wait_page_load_time}s with {len(status["pending"])} '
+						f'pending requests: {status["pending"]}'
 					)
+				break
+			except Exception as e:
+				# the page navigated away while we were waiting, the new document has to settle as well
+				now = asyncio.get_event_loop().time()
+				if page.is_closed() or now >= deadline:
+					break
+				self.logger.debug(f'Network idle check interrupted ({type(e).__name__}), waiting for the next document')
+				try:
+					await page.wait_for_load_state('domcontentloaded', timeout=(deadline - now) * 1000)
+				except Exception:
+					await asyncio.sleep(0.1)
+				now = asyncio.get_event_loop().time()
+				if now >= deadline:
 					break
-
-		finally:
-			# Clean up event listeners
-			page.remove_listener('request', on_request)
-			page.remove_listener('response', on_response)
 
 		elapsed = now - start_time
 		if elapsed > 1:
-			self.logger.debug(f'💤 Page network traffic calmed down after {now - start_time:.2f} seconds')
+			self.logger.debug(f'💤 Page network traffic calmed down after {elapsed:.2f} seconds')
 
 	async def _wait_for_page_and_frames_load(self, timeout_overwrite: float | None = None):
 		"""
@@ -2046,20 +2203,23 @@ class BrowserSession(BaseModel):
 		elapsed = time.time() - start_time
 		remaining = max((timeout_overwrite or self.browser_profile.minimum_wait_page_load_time) - elapsed, 0)
 
-		# just for logging, calculate how much data was downloaded
+		# calculate how much data was downloaded, for logging and to estimate what request blocking saves
 		try:
-			bytes_used = await page.evaluate("""
+			bytes_used, requests_loaded = await page.evaluate("""
 				() => {
 					let total = 0;
-					for (const entry of performance.getEntriesByType('resource')) {
-						total += entry.transferSize || 0;
-					}
-					for (const nav of performance.getEntriesByType('navigation')) {
-						total += nav.transferSize || 0;
+					let count = 0;
+					for (const entry of [...performance.getEntriesByType('resource'), ...performance.getEntriesByType('navigation')]) {
+						if (entry.transferSize) {
+							total += entry.transferSize;
+							count += 1;
+						}
 					}
-					return total;
+					return [total, count];
 				}
 			""")
+			if requests_loaded:
+				self._average_transfer_size = bytes_used / requests_loaded
 		except Exception:
 			bytes_used = None
 
@@ -2072,9 +2232,14 @@ class BrowserSession(BaseModel):
 		if remaining > 0:
 			extra_delay = f', waiting +{remaining:.2f}s for all frames to finish'
 
+		blocked = ''
+		if self._resource_blocking_stats.blocked_requests:
+			stats = self._resource_blocking_stats
+			blocked = f' (blocked {stats.blocked_requests} requests so far, ~{stats.estimated_bytes_saved / 1024:.1f} KB saved)'
+
 		if bytes_used is not None:
 			self.logger.info(
-				f'➡️ Page navigation [{tab_idx}]{_log_pretty_url(page.url, 40)} used {bytes_used / 1024:.1f} KB in {elapsed:.2f}s{extra_delay}'
+				f'➡️ Page navigation [{tab_idx}]{_log_pretty_url(page.url, 40)} used {bytes_used / 1024:.1f} KB in {elapsed:.2f}s{blocked}{extra_delay}'
 			)
 		else:
 			self.logger.info(f'➡️ Page navigation [{tab_idx}]{_log_pretty_url(page.url, 40)} took {elapsed:.2f}s{extra_delay}')
@@ -2299,30 +2464,49 @@ class BrowserSession(BaseModel):
 		await self._wait_for_page_and_frames_load()
 		updated_state = await self._get_updated_state()
 
-		# Find out which elements are new
-		# Do this only if url has not changed
 		if cache_clickable_elements_hashes:
-			# if we are on the same url as the last state, we can use the cached hashes
-			if self._cached_clickable_element_hashes and self._cached_clickable_element_hashes.url == updated_state.url:
-				# Pointers, feel free to edit in place
-				updated_state_clickable_elements = ClickableElementProcessor.get_clickable_elements(updated_state.element_tree)
-
-				for dom_element in updated_state_clickable_elements:
-					dom_element.is_new = (
-						ClickableElementProcessor.hash_dom_element(dom_element)
-						not in self._cached_clickable_element_hashes.hashes  # see which elements are new from the last state where we cached the hashes
-					)
-			# in any case, we need to cache the new hashes
-			self._cached_clickable_element_hashes = CachedClickableElementHashes(
-				url=updated_state.url,
-				hashes=ClickableElementProcessor.get_clickable_elements_hashes(updated_state.element_tree),
-			)
+			self.update_clickable_elements_hashes(updated_state)
 
 		assert updated_state
 		self._cached_browser_state_summary = updated_state
 
 		return self._cached_browser_state_summary
 
+	def update_clickable_elements_hashes(self, updated_state: BrowserStateSummary) -> None:
+		"""
+		Mark the clickable elements of updated_state that are new since the last state passed here (on the same url),
+		and remember its elements for the next one. Only call this for states that are actually shown to the LLM.
+		"""
+		# Pointers, feel free to edit in place
+		updated_state_clickable_elements = ClickableElementProcessor.get_clickable_elements(updated_state.element_tree)
+		# hash every element once, the hashes are used both for is_new and for the next step's cache
+		updated_state_hashes = [
+			ClickableElementProcessor.hash_dom_element(dom_element) for dom_element in updated_state_clickable_elements
+		]
+
+		# if we are on the same url as the last state, we can use the cached hashes
+		if self._cached_clickable_element_hashes and self._cached_clickable_element_hashes.url == updated_state.url:
+			for dom_element, element_hash in zip(updated_state_clickable_elements, updated_state_hashes):
+				dom_element.is_new = (
+					element_hash
+					not in self._cached_clickable_element_hashes.hashes  # see which elements are new from the last state where we cached the hashes
+				)
+		# in any case, we need to cache the new hashes
+		self._cached_clickable_element_hashes = CachedClickableElementHashes(
+			url=updated_state.url,
+			hashes=set(updated_state_hashes),
+		)
+
+	def _get_dom_service(self, page: Page) -> DomService:
+		"""With incremental_dom the DomService is kept per page, it holds the previous snapshot that deltas are merged into"""
+		if not self.browser_profile.incremental_dom:
+			return DomService(page, logger=self.logger)
+
+		dom_service = self._dom_services.get(page)
+		if dom_service is None:
+			dom_service = self._dom_services[page] = DomService(page, logger=self.logger, incremental=True)
+		return dom_service
+
 	async def _get_updated_state(self, focus_element: int = -1) -> BrowserStateSummary:
 		"""Update and return state."""
 
@@ -2336,16 +2520,29 @@ class BrowserSession(BaseModel):
 			self.logger.debug(f'👋 Current page is no longer accessible: {type(e).__name__}: {e}')
 			raise BrowserError('Browser closed: no valid pages available')
 
+		timings: dict[str, float] = {}
+
+		async def timed(stage: str, awaitable):
+			start = time.perf_counter()
+			try:
+				return await awaitable
+			finally:
+				timings[stage] = time.perf_counter() - start
+
 		try:
-			await self.remove_highlights()
-			dom_service = DomService(page, logger=self.logger)
-			content = await dom_service.get_clickable_elements(
-				focus_element=focus_element,
-				viewport_expansion=self.browser_profile.viewport_expansion,
-				highlight_elements=self.browser_profile.highlight_elements,
-			)
+			dom_service = self._get_dom_service(page)
+
+			async def capture_dom():
+				await self.remove_highlights()  # old highlights must be gone before the extractor draws the new ones
+				return await dom_service.get_clickable_elements(
+					focus_element=focus_element,
+					viewport_expansion=self.browser_profile.viewport_expansion,
+					highlight_elements=self.browser_profile.highlight_elements,
+				)
 
-			tabs_info = await self.get_tabs_info()
+			async def capture_screenshot(dom_task: asyncio.Future):
+				await dom_task  # the screenshot has to show the highlights drawn by the DOM extraction
+				return await timed('screenshot', self.take_screenshot())
 
 			# Get all cross-origin iframes within the page and open them in new tabs
 			# mark the titles of the new tabs so the LLM knows to check them for additional content
@@ -2368,18 +2565,43 @@ class BrowserSession(BaseModel):
 			# 		)
 			# 	)
 
-			screenshot_b64 = await self.take_screenshot()
-			pixels_above, pixels_below = await self.get_scroll_info(page)
+			# Independent stages run concurrently, total latency is roughly DOM extraction + screenshot
+			# instead of the sum of every round-trip
+			started_at = time.perf_counter()
+			dom_task = asyncio.ensure_future(timed('dom', capture_dom()))
+			stages = [
+				dom_task,
+				asyncio.ensure_future(timed('tabs', self.get_tabs_info())),
+				asyncio.ensure_future(timed('scroll_info', self.get_scroll_info(page))),
+				asyncio.ensure_future(timed('title', page.title())),
+				asyncio.ensure_future(capture_screenshot(dom_task)),
+			]
+			try:
+				content, tabs_info, (pixels_above, pixels_below), title, screenshot_b64 = await asyncio.gather(*stages)
+			except BaseException:
+				# gather leaves the other stages running when one fails (e.g. page.title() during a navigation), they
+				# must not keep extracting/highlighting or update the screenshot cache behind the next capture's back
+				for stage in stages:
+					stage.cancel()
+				await asyncio.gather(*stages, return_exceptions=True)
+				raise
+			timings['total'] = time.perf_counter() - started_at
+			self.logger.debug(
+				'📸 Captured browser state in %.2fs (%s)',
+				timings['total'],
+				', '.join(f'{stage}={duration:.2f}s' for stage, duration in timings.items() if stage != 'total'),
+			)
 
 			self.browser_state_summary = BrowserStateSummary(
 				element_tree=content.element_tree,
 				selector_map=content.selector_map,
 				url=page.url,
-				title=await page.title(),
+				title=title,
 				tabs=tabs_info,
 				screenshot=screenshot_b64,
 				pixels_above=pixels_above,
 				pixels_below=pixels_below,
+				timings=timings,
 			)
 
 			return self.browser_state_summary
@@ -2393,9 +2615,10 @@ class BrowserSession(BaseModel):
 	# region - Browser Actions
 	@require_initialization
 	@time_execution_async('--take_screenshot')
-	async def take_screenshot(self, full_page: bool = False) -> str:
+	async def take_screenshot(self, full_page: bool = False) -> str | None:
 		"""
-		Returns a base64 encoded screenshot of the current page.
+		Returns a base64 encoded screenshot of the current page, encoded as configured by the screenshot_* profile options.
+		Returns None when the page did not change since the last screenshot and screenshot_when_unchanged='skip'.
 		"""
 		assert self.agent_current_page is not None, 'Agent current page is not set'
 
@@ -2415,14 +2638,14 @@ class BrowserSession(BaseModel):
 				timeout=15000,
 				animations='allow',
 				caret='initial',
+				**self._screenshot_type_kwargs(),
 			)
-
-			screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
-			return screenshot_b64
 		except Exception as e:
 			self.logger.error(
 				f'❌ Failed to take full-page screenshot: {type(e).__name__}: {e} falling back to viewport-only screenshot'
 			)
+		else:
+			return await self._process_screenshot(screenshot)
 
 		# Fallback method: manually expand the viewport and take a screenshot of the entire viewport
 
@@ -2456,11 +2679,11 @@ class BrowserSession(BaseModel):
 				animations='allow',
 				caret='initial',
 				# animations='disabled',   # these can cause CSP errors on some pages, leading to a red herring "waiting for fonts to load" error
+				**self._screenshot_type_kwargs(),
 			)
 			# TODO: manually take multiple clipped screenshots to capture the full height and stitch them together?
 
-			screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
-			return screenshot_b64
+			return await self._process_screenshot(screenshot)
 
 		finally:
 			# 5. Restore original viewport state if we expanded it
@@ -2472,6 +2695,42 @@ class BrowserSession(BaseModel):
 				# await page.set_viewport_size(None)  # unfortunately this is not supported by playwright
 				pass
 
+	def _screenshot_type_kwargs(self) -> dict[str, Any]:
+		# jpeg is encoded by the browser itself, webp is not supported there so it's re-encoded from a png
+		if self.browser_profile.screenshot_format == 'jpeg':
+			return {'type': 'jpeg', 'quality': self.browser_profile.screenshot_quality}
+		return {'type': 'png'}
+
+	async def _process_screenshot(self, screenshot: bytes) -> str | None:
+		"""Encode a raw screenshot off the event loop, reusing the previous frame if the page looks the same"""
+		digest = hashlib.blake2b(screenshot, digest_size=16).digest()
+		change_threshold = self.browser_profile.screenshot_change_threshold
+		previous = self._last_screenshot
+
+		if previous is not None and previous[0] == digest:
+			processed, unchanged = previous[1], True
+		else:
+			processed = await asyncio.to_thread(process_screenshot, screenshot, self.browser_profile)
+			unchanged = (
+				change_threshold is not None
+				and previous is not None
+				and previous[1].phash is not None
+				and processed.phash is not None
+				and hamming_distance(previous[1].phash, processed.phash) <= change_threshold
+			)
+
+		if not unchanged:
+			self._last_screenshot = (digest, processed)
+			return processed.screenshot_b64
+
+		if change_threshold is None:
+			return processed.screenshot_b64  # byte-identical frame, only the encoding work is saved
+		self.logger.debug('📸 Page looks unchanged since the last screenshot, %s it', self.browser_profile.screenshot_when_unchanged)
+		if self.browser_profile.screenshot_when_unchanged == 'skip':
+			return None
+		# compare the next frames against the one the LLM actually saw, so slow drift is still noticed
+		return previous[1].screenshot_b64  # type: ignore[index]
+
 	# region - User Actions
 
 	@staticmethod
@@ -3123,9 +3382,9 @@ class BrowserSession(BaseModel):
 	@require_initialization
 	async def get_scroll_info(self, page: Page) -> tuple[int, int]:
 		"""Get scroll position information for the current page."""
-		scroll_y = await page.evaluate('window.scrollY')
-		viewport_height = await page.evaluate('window.innerHeight')
-		total_height = await page.evaluate('document.documentElement.scrollHeight')
+		scroll_y, viewport_height, total_height = await page.evaluate(
+			'() => [window.scrollY, window.innerHeight, document.documentElement.scrollHeight]'
+		)
 		pixels_above = scroll_y
 		pixels_below = total_height - (scroll_y + viewport_height)
 		return pixels_above, pixels_below
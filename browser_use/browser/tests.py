@@ -0,0 +1,405 @@
+import asyncio
+import base64
+import io
+import time
+import uuid
+
+import pytest
+
+from PIL import Image, ImageDraw
+
+from browser_use.browser import pool as pool_module
+from browser_use.browser.http_cache import HttpCache, freshness_lifetime
+from browser_use.browser.pool import BrowserPool
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.screenshot import process_screenshot, screenshot_mime_type
+from browser_use.browser.session import IGNORED_URL_PATTERN, WAIT_FOR_NETWORK_IDLE_JS, BrowserSession
+
+
+def _png(width: int = 400, height: int = 300, text: str = '') -> bytes:
+	image = Image.new('RGB', (width, height), 'white')
+	draw = ImageDraw.Draw(image)
+	draw.rectangle((20, 20, width // 2, height // 2), fill='navy')
+	if text:
+		draw.rectangle((width // 2, height // 2, width - 10, height - 10), fill='darkred')
+	buffer = io.BytesIO()
+	image.save(buffer, format='PNG')
+	return buffer.getvalue()
+
+
+def test_screenshot_is_downscaled_and_reencoded():
+	profile = BrowserProfile(screenshot_format='webp', screenshot_max_size={'width': 200, 'height': 200})
+	processed = process_screenshot(_png(), profile)
+
+	assert screenshot_mime_type(processed.screenshot_b64) == 'image/webp'
+	image = Image.open(io.BytesIO(base64.b64decode(processed.screenshot_b64)))
+	assert image.size == (200, 150)
+	assert processed.phash is None
+
+	# without any processing configured the browser's bytes are passed through untouched
+	raw = _png()
+	assert base64.b64decode(process_screenshot(raw, BrowserProfile()).screenshot_b64) == raw
+	assert screenshot_mime_type(process_screenshot(raw, BrowserProfile()).screenshot_b64) == 'image/png'
+
+
+def test_unchanged_screenshots_are_reused_or_skipped():
+	async def run(when_unchanged: str):
+		session = BrowserSession(
+			browser_profile=BrowserProfile(screenshot_change_threshold=4, screenshot_when_unchanged=when_unchanged)
+		)
+		first = await session._process_screenshot(_png())
+		same = await session._process_screenshot(_png())
+		changed = await session._process_screenshot(_png(text='new content'))
+		return first, same, changed
+
+	first, same, changed = asyncio.run(run('reuse'))
+	assert same is first
+	assert changed is not None and changed != first
+
+	first, same, changed = asyncio.run(run('skip'))
+	assert first is not None and same is None and changed is not None
+
+
+def test_failed_state_capture_cancels_the_other_stages(monkeypatch):
+	dom_extraction_cancelled = asyncio.Event()
+
+	class _Page:
+		url = 'https://example.com/'
+
+		async def evaluate(self, script):
+			return 1
+
+		async def title(self):
+			raise RuntimeError('Execution context was destroyed, most likely because of a navigation')
+
+	class _DomService:
+		async def get_clickable_elements(self, **kwargs):
+			try:
+				await asyncio.sleep(10)
+			except asyncio.CancelledError:
+				dom_extraction_cancelled.set()
+				raise
+
+	async def noop(*args, **kwargs):
+		return (0, 0)
+
+	async def get_current_page(self):
+		return _Page()
+
+	for name, replacement in {
+		'get_current_page': get_current_page,
+		'remove_highlights': noop,
+		'get_tabs_info': noop,
+		'get_scroll_info': noop,
+		'_get_dom_service': lambda self, page: _DomService(),
+	}.items():
+		monkeypatch.setattr(BrowserSession, name, replacement)
+
+	async def run():
+		with pytest.raises(RuntimeError):
+			await BrowserSession()._get_updated_state()
+		return dom_extraction_cancelled.is_set()
+
+	assert asyncio.run(run())
+
+
+def test_resource_blocking_rules_merge_presets():
+	profile = BrowserProfile(block_presets=['trackers', 'no-media'], block_resource_types=['font'], block_url_patterns=['/ads.js'])
+	resource_types, url_regex = profile.get_resource_blocking_rules()
+
+	assert resource_types == {'font', 'media', 'image'}
+	assert url_regex is not None
+	assert url_regex.search('https://www.Google-Analytics.com/g/collect?v=2')
+	assert url_regex.search('https://example.com/static/ads.js?v=3')
+	assert not url_regex.search('https://not-google-analytics.com/')
+	assert not url_regex.search('https://example.com/?next=https://doubleclick.net/')
+
+	assert BrowserProfile().get_resource_blocking_rules() == (set(), None)
+
+
+class _FakeResponse:
+	def __init__(self, body: bytes, headers: dict[str, str]):
+		self.status = 200
+		self.headers = headers
+		self._body = body
+
+	async def body(self) -> bytes:
+		return self._body
+
+
+class _FakeRoute:
+	def __init__(self, url: str, body: bytes, headers: dict[str, str]):
+		self.request = type('Request', (), {'url': url, 'method': 'GET', 'resource_type': 'script'})()
+		self._response = _FakeResponse(body, headers)
+		self.fetched = False
+		self.fulfilled: dict = {}
+
+	async def fetch(self):
+		self.fetched = True
+		return self._response
+
+	async def fulfill(self, **kwargs):
+		self.fulfilled = kwargs
+
+
+def test_http_cache_serves_fresh_assets_and_evicts_lru(tmp_path):
+	cacheable = {'cache-control': 'public, max-age=600', 'content-type': 'text/javascript', 'content-encoding': 'gzip'}
+
+	async def run():
+		cache = HttpCache(tmp_path, max_size_bytes=10)
+		await cache.install(type('Context', (), {'route': lambda self, url, handler: asyncio.sleep(0)})())
+
+		first = _FakeRoute('https://example.com/app.js', b'123456', cacheable)
+		await cache._handle_route(first)
+		again = _FakeRoute('https://example.com/app.js', b'', cacheable)
+		await cache._handle_route(again)
+		uncacheable = _FakeRoute('https://example.com/live.js', b'1', {'cache-control': 'no-store'})
+		await cache._handle_route(uncacheable)
+		# does not fit next to app.js, so app.js is evicted
+		other = _FakeRoute('https://example.com/vendor.js', b'abcdef', cacheable)
+		await cache._handle_route(other)
+		return cache, first, again
+
+	cache, first, again = asyncio.run(run())
+	assert first.fetched and not again.fetched
+	assert again.fulfilled['body'] == b'123456'
+	assert 'content-encoding' not in again.fulfilled['headers']
+
+	stats = cache.stats()
+	assert (stats.requests, stats.hits, stats.stored, stats.evicted, stats.entries) == (4, 1, 2, 1, 1)
+	assert stats.bytes_served == 6
+
+	# a new process sees what the previous one left on disk
+	reopened = HttpCache(tmp_path, max_size_bytes=10)
+	reopened._load()
+	assert [entry.url for entry in reopened._entries.values()] == ['https://example.com/vendor.js']
+
+
+def test_http_cache_entry_evicted_while_its_body_is_read(tmp_path):
+	cacheable = {'cache-control': 'public, max-age=600', 'content-type': 'text/javascript'}
+
+	async def run():
+		cache = HttpCache(tmp_path, max_size_bytes=100)
+		await cache.install(type('Context', (), {'route': lambda self, url, handler: asyncio.sleep(0)})())
+		await cache._handle_route(_FakeRoute('https://example.com/app.js', b'123456', cacheable))
+
+		read_blob = cache._read_blob
+
+		def read_blob_evicted_meanwhile(key: str, body_hash: str) -> bytes | None:
+			# what a concurrent _store() evicting this entry does between the lookup and the read
+			for path in cache._remove(key):
+				path.unlink()
+			return read_blob(key, body_hash)
+
+		cache._read_blob = read_blob_evicted_meanwhile  # type: ignore[method-assign]
+		again = _FakeRoute('https://example.com/app.js', b'123456', cacheable)
+		await cache._handle_route(again)
+		return cache, again
+
+	cache, again = asyncio.run(run())
+	# fetched from the network instead of failing, and stored again
+	assert again.fetched and again.fulfilled
+	assert [entry.url for entry in cache._entries.values()] == ['https://example.com/app.js']
+
+
+def test_freshness_lifetime():
+	assert freshness_lifetime({'cache-control': 'max-age=60, s-maxage=3600'}) == 3600
+	assert freshness_lifetime({'cache-control': 'max-age=60', 'age': '20'}) == 40
+	assert freshness_lifetime({'cache-control': 'public, immutable'}) is not None
+	assert freshness_lifetime({'cache-control': 'private, max-age=60'}) is None
+	assert freshness_lifetime({'content-type': 'text/css'}) is None
+
+
+def test_network_idle_wait_only_tracks_scripts_and_iframes_it_saw_being_added():
+	playwright_api = pytest.importorskip('playwright.async_api')
+	page_html = """
+		<script src="https://example.test/loaded.js"></script>
+		<script src="https://example.test/blocked.js"></script>
+		<div id="inert"></div>
+		<script>
+			// a script inserted through innerHTML is never fetched, and the resource timing entries are gone
+			document.getElementById('inert').innerHTML = '<script src="https://example.test/never-fetched.js"></scr' + 'ipt>';
+			performance.clearResourceTimings();
+		</script>
+	"""
+
+	async def handle(route):
+		url = route.request.url
+		if url.endswith('/blocked.js'):
+			await route.abort()
+		elif url.endswith('/slow.js'):
+			await asyncio.sleep(1)
+			await route.fulfill(body='window.slowLoaded = true', content_type='text/javascript')
+		elif url.endswith('.js'):
+			await route.fulfill(body='', content_type='text/javascript')
+		else:
+			await route.fulfill(body=page_html, content_type='text/html')
+
+	async def wait_for_idle(page) -> tuple[dict, float]:
+		started_at = time.monotonic()
+		status = await page.evaluate(
+			WAIT_FOR_NETWORK_IDLE_JS, {'idleTime': 300, 'timeout': 5000, 'ignoredUrlPattern': IGNORED_URL_PATTERN}
+		)
+		return status, time.monotonic() - started_at
+
+	async def run():
+		async with playwright_api.async_playwright() as playwright:
+			try:
+				browser = await playwright.chromium.launch(headless=True)
+			except Exception as e:
+				pytest.skip(f'chromium is not available: {e}')
+			page = await browser.new_page()
+			await page.route('https://example.test/**', handle)
+			await page.goto('https://example.test/', wait_until='load')
+			settled = await wait_for_idle(page)
+
+			# added during the wait, so it is waited for
+			await page.evaluate("""() => setTimeout(() => {
+				const script = document.createElement('script');
+				script.src = 'https://example.test/slow.js';
+				document.head.appendChild(script);
+			}, 50)""")
+			loading = await wait_for_idle(page)
+			slow_loaded = await page.evaluate('window.slowLoaded === true')
+			await browser.close()
+			return settled, loading, slow_loaded
+
+	(settled_status, settled_time), (loading_status, loading_time), slow_loaded = asyncio.run(run())
+	assert settled_status['idle'] and settled_time < 2
+	assert loading_status['idle'] and loading_time >= 1 and slow_loaded
+
+
+class _FakeBrowserSession:
+	"""Stands in for BrowserSession in BrowserPool, launching takes launch_delay seconds"""
+
+	launch_delay = 0.0
+
+	def __init__(self, browser_profile: BrowserProfile | None = None):
+		self.id = str(uuid.uuid4())
+		self.browser_profile = browser_profile or BrowserProfile()
+		self.browser_pid = None
+		self.initialized = False
+		self.stopped = False
+		self._connection_str = f'fake browser {self.id[-4:]}'
+
+	async def start(self):
+		await asyncio.sleep(self.launch_delay)
+		self.initialized = True
+
+	async def stop(self):
+		self.initialized = False
+		self.stopped = True
+
+	async def reset(self):
+		pass
+
+	def is_connected(self) -> bool:
+		return self.initialized
+
+
+def test_browser_pool_reuses_released_sessions_and_evicts_worn_out_ones(monkeypatch):
+	monkeypatch.setattr(pool_module, 'BrowserSession', _FakeBrowserSession)
+
+	async def run():
+		pool = await BrowserPool(min_size=1, max_size=2, max_uses=2, health_check_interval=0).start()
+		first = await pool.acquire()
+		second = await pool.acquire()
+		with pytest.raises(TimeoutError):
+			await pool.acquire(timeout=0.05)  # full
+
+		await pool.release(first)
+		reused = await pool.acquire(timeout=1)
+		await pool.release(first)  # its second lease, evicted
+		stats = pool.stats()
+		await pool.close()
+		return first, second, reused, stats
+
+	first, second, reused, stats = asyncio.run(run())
+	assert reused is first
+	assert first.stopped and second.stopped
+	assert (stats.idle, stats.leased, stats.launching) == (0, 1, 0)
+	assert (stats.total_launched, stats.total_leases, stats.total_evicted) == (2, 3, 1)
+
+
+def test_browser_pool_keeps_the_browser_of_a_timed_out_acquire(monkeypatch):
+	monkeypatch.setattr(pool_module, 'BrowserSession', _FakeBrowserSession)
+	monkeypatch.setattr(_FakeBrowserSession, 'launch_delay', 0.1)
+
+	async def run():
+		pool = BrowserPool(min_size=0, max_size=1, health_check_interval=0)
+		with pytest.raises(TimeoutError):
+			await pool.acquire(timeout=0.01)
+		await asyncio.sleep(0.3)  # the launch carries on and its browser is handed back to the pool
+		stats = pool.stats()
+		browser_session = await pool.acquire(timeout=0.01)
+		await pool.close()
+		return stats, browser_session
+
+	stats, browser_session = asyncio.run(run())
+	assert (stats.idle, stats.leased, stats.launching, stats.total_launched) == (1, 0, 0, 1)
+	assert browser_session.stopped
+
+
+def test_browser_pool_acquire_fails_when_browsers_keep_failing_to_launch(monkeypatch):
+	class _BrokenBrowserSession(_FakeBrowserSession):
+		async def start(self):
+			raise FileNotFoundError('chromium executable not found')
+
+	monkeypatch.setattr(pool_module, 'BrowserSession', _BrokenBrowserSession)
+
+	async def run():
+		pool = BrowserPool(min_size=0, max_size=1, health_check_interval=0, max_launch_attempts=2)
+		try:
+			with pytest.raises(FileNotFoundError):
+				await pool.acquire()  # no timeout, must not retry forever
+			return pool.stats()
+		finally:
+			await pool.close()
+
+	stats = asyncio.run(run())
+	assert (stats.leased, stats.launching, stats.total_launched) == (0, 0, 0)
+
+
+def test_browser_pool_shared_browsers_keep_no_context_of_their_own(monkeypatch):
+	class _FakeContext:
+		closed = False
+
+		async def close(self):
+			self.closed = True
+
+	class _FakeBrowser:
+		def is_connected(self) -> bool:
+			return True
+
+	class _SharedBrowserSession(_FakeBrowserSession):
+		def __init__(self, browser_profile: BrowserProfile | None = None, browser=None):
+			super().__init__(browser_profile)
+			self.browser = browser
+			self.browser_context = None
+
+		async def start(self):
+			await super().start()
+			self.browser = self.browser or _FakeBrowser()
+			self.browser_context = _FakeContext()
+			return self
+
+		async def new_isolated_session(self, **profile_overrides):
+			return await _SharedBrowserSession(self.browser_profile.model_copy(update=profile_overrides), self.browser).start()
+
+	monkeypatch.setattr(pool_module, 'BrowserSession', _SharedBrowserSession)
+
+	async def run():
+		pool = BrowserPool(min_size=0, max_size=2, health_check_interval=0, contexts_per_browser=2)
+		first = await pool.acquire()
+		second = await pool.acquire()
+		hosts = list(pool._hosts.values())
+		await pool.release(first)
+		reused = await pool.acquire(timeout=1)
+		await pool.close()
+		return first, second, reused, hosts
+
+	first, second, reused, hosts = asyncio.run(run())
+	assert len(hosts) == 1 and hosts[0].browser_context is None and hosts[0].stopped
+	assert first.browser is second.browser is hosts[0].browser
+	assert first.browser_context is not second.browser_context
+	assert reused is first
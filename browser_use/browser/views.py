@@ -32,6 +32,17 @@ class BrowserStateSummary(DOMState):
 	pixels_above: int = 0
 	pixels_below: int = 0
 	browser_errors: list[str] = field(default_factory=list)
+	timings: dict[str, float] = field(default_factory=dict, repr=False)  # seconds spent per state capture stage
+
+
+@dataclass
+class ResourceBlockingStats:
+	"""Requests aborted by the BrowserProfile block_* options over the lifetime of a BrowserSession"""
+
+	blocked_requests: int = 0
+	blocked_by_type: dict[str, int] = field(default_factory=dict)
+	# each blocked request counts with the average transfer size of the requests that did load on the page
+	estimated_bytes_saved: int = 0
 
 
 @dataclass
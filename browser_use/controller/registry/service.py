@@ -18,12 +18,13 @@ from browser_use.controller.registry.views import (
 	RegisteredAction,
 	SpecialActionParameters,
 )
+from browser_use.sensitive_data import SECRET_PLACEHOLDER_RE, SensitiveDataRedactor, get_redactor
 from browser_use.telemetry.service import ProductTelemetry
 from browser_use.telemetry.views import (
 	ControllerRegisteredFunctionsTelemetryEvent,
 	RegisteredFunction,
 )
-from browser_use.utils import match_url_with_domain_pattern, time_execution_async
+from browser_use.utils import time_execution_async
 
 Context = TypeVar('Context')
 
@@ -37,6 +38,10 @@ class Registry(Generic[Context]):
 		self.registry = ActionRegistry()
 		self.telemetry = ProductTelemetry()
 		self.exclude_actions = exclude_actions if exclude_actions is not None else []
+		# compiled sensitive_data of the last action, only recompiled when the agent passes different secrets
+		self._redactor: SensitiveDataRedactor | None = None
+		# (name, id(action)) of every included action -> (the actions, kept alive so their ids stay unique; the model)
+		self._action_models: dict[tuple[tuple[str, int], ...], tuple[tuple[RegisteredAction, ...], type[ActionModel]]] = {}
 
 	def _get_special_param_types(self) -> dict[str, type]:
 		"""Get the expected types for special parameters from SpecialActionParameters"""
@@ -379,45 +384,27 @@ class Registry(Generic[Context]):
 		Returns:
 			BaseModel: The parameter object with placeholders replaced by actual values
 		"""
-		secret_pattern = re.compile(r'<secret>(.*?)</secret>')
-
 		# Set to track all missing placeholders across the full object
 		all_missing_placeholders = set()
 		# Set to track successfully replaced placeholders
 		replaced_placeholders = set()
 
-		# Process sensitive data based on format and current URL
-		applicable_secrets = {}
-
-		for domain_or_key, content in sensitive_data.items():
-			if isinstance(content, dict):
-				# New format: {domain_pattern: {key: value}}
-				# Only include secrets for domains that match the current URL
-				if current_url and current_url != 'about:blank':
-					# it's a real url, check it using our custom allowed_domains scheme://*.example.com glob matching
-					if match_url_with_domain_pattern(current_url, domain_or_key):
-						applicable_secrets.update(content)
-			else:
-				# Old format: {key: value}, expose to all domains (only allowed for legacy reasons)
-				applicable_secrets[domain_or_key] = content
+		# Secrets for domains that match the current URL, plus the old format ones that are exposed to all domains
+		self._redactor = get_redactor(sensitive_data, self._redactor)
+		applicable_secrets = self._redactor.secrets_for_url(current_url)
 
-		# Filter out empty values
-		applicable_secrets = {k: v for k, v in applicable_secrets.items() if v}
+		def replace_placeholder(match: re.Match) -> str:
+			placeholder = match.group(1)
+			if placeholder in applicable_secrets:
+				replaced_placeholders.add(placeholder)
+				return applicable_secrets[placeholder]
+			# Keep track of missing placeholders, don't replace the tag, keep it as is
+			all_missing_placeholders.add(placeholder)
+			return match.group(0)
 
 		def recursively_replace_secrets(value: str | dict | list) -> str | dict | list:
 			if isinstance(value, str):
-				matches = secret_pattern.findall(value)
-
-				for placeholder in matches:
-					if placeholder in applicable_secrets:
-						value = value.replace(f'<secret>{placeholder}</secret>', applicable_secrets[placeholder])
-						replaced_placeholders.add(placeholder)
-					else:
-						# Keep track of missing placeholders
-						all_missing_placeholders.add(placeholder)
-						# Don't replace the tag, keep it as is
-
-				return value
+				return SECRET_PLACEHOLDER_RE.sub(replace_placeholder, value)
 			elif isinstance(value, dict):
 				return {k: recursively_replace_secrets(v) for k, v in value.items()}
 			elif isinstance(value, list):
@@ -463,6 +450,11 @@ class Registry(Generic[Context]):
 			if domain_is_allowed and page_is_allowed:
 				available_actions[name] = action
 
+		# the filters only pick from a handful of distinct action sets, build each model (and its schema) just once
+		cache_key = tuple((name, id(action)) for name, action in available_actions.items())
+		if cache_key in self._action_models:
+			return self._action_models[cache_key][1]
+
 		fields = {
 			name: (
 				Optional[action.param_model],
@@ -480,7 +472,9 @@ class Registry(Generic[Context]):
 			)
 		)
 
-		return create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+		action_model = create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+		self._action_models[cache_key] = (tuple(available_actions.values()), action_model)
+		return action_model
 
 	def get_prompt_description(self, page=None) -> str:
 		"""Get a description of all actions for the prompt
@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from playwright.async_api import Page
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from browser_use.browser import BrowserSession
 
@@ -25,8 +25,15 @@ class RegisteredAction(BaseModel):
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
+	_prompt_description: str | None = PrivateAttr(default=None)
+
 	def prompt_description(self) -> str:
-		"""Get a description of the action for the prompt"""
+		"""Get a description of the action for the prompt, rendered from the param model's JSON schema only once"""
+		if self._prompt_description is None:
+			self._prompt_description = self._render_prompt_description()
+		return self._prompt_description
+
+	def _render_prompt_description(self) -> str:
 		skip_keys = ['title']
 		s = f'{self.description}: \n'
 		s += '{' + str(self.name) + ': '
@@ -77,6 +84,9 @@ class ActionRegistry(BaseModel):
 
 	actions: dict[str, RegisteredAction] = {}
 
+	# (name, id(action)) of every described action -> (the actions, kept alive so their ids stay unique; the description)
+	_descriptions: dict[tuple[tuple[str, int], ...], tuple[tuple[RegisteredAction, ...], str]] = PrivateAttr(default_factory=dict)
+
 	@staticmethod
 	def _match_domains(domains: list[str] | None, url: str) -> bool:
 		"""
@@ -121,11 +131,7 @@ class ActionRegistry(BaseModel):
 		"""
 		if page is None:
 			# For system prompt (no page provided), include only actions with no filters
-			return '\n'.join(
-				action.prompt_description()
-				for action in self.actions.values()
-				if action.page_filter is None and action.domains is None
-			)
+			return self._describe([action for action in self.actions.values() if action.page_filter is None and action.domains is None])
 
 		# only include filtered actions for the current page
 		filtered_actions = []
@@ -140,7 +146,14 @@ class ActionRegistry(BaseModel):
 			if domain_is_allowed and page_is_allowed:
 				filtered_actions.append(action)
 
-		return '\n'.join(action.prompt_description() for action in filtered_actions)
+		return self._describe(filtered_actions)
+
+	def _describe(self, actions: list[RegisteredAction]) -> str:
+		"""Join the prompt descriptions of a set of actions, cached per distinct set"""
+		key = tuple((action.name, id(action)) for action in actions)
+		if key not in self._descriptions:
+			self._descriptions[key] = (tuple(actions), '\n'.join(action.prompt_description() for action in actions))
+		return self._descriptions[key][1]
 
 
 class SpecialActionParameters(BaseModel):
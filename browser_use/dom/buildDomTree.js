@@ -4,9 +4,11 @@
     focusHighlightIndex: -1,
     viewportExpansion: 0,
     debugMode: false,
+    incremental: false,
+    baseSnapshot: null,
   }
 ) => {
-  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode } = args;
+  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode, incremental = false, baseSnapshot = null } = args;
   let highlightIndex = 0; // Reset highlight index
 
   // Add timing stack to handle recursion
@@ -217,6 +219,80 @@
   // Add a WeakMap cache for XPath strings
   const xpathCache = new WeakMap();
 
+  // --- Incremental snapshots ---
+  // In incremental mode a MutationObserver installed on the document remembers which nodes changed since the
+  // last snapshot. Subtrees that did not change are not walked again: their node ids from the previous snapshot
+  // are returned in `reused` and the caller merges them with the nodes that were re-evaluated.
+  const INCREMENTAL_STATE_KEY = "__browserUseDomSnapshotState";
+  const HIGHLIGHT_ATTRIBUTE = "browser-user-highlight-id";
+
+  function createIncrementalState() {
+    const state = {
+      documentId: Math.random().toString(36).slice(2),
+      snapshot: 0,
+      nextId: 0,
+      nextHighlightIndex: 0,
+      viewportKey: null,
+      cache: new WeakMap(), // node -> entry describing the subtree it produced in an earlier snapshot
+      highlightIndices: new WeakMap(), // element -> highlight index, kept for as long as the element lives
+      dirty: new Set(), // nodes changed since the last snapshot, plus all of their ancestors
+      dirtySubtrees: new Set(), // nodes whose whole subtree has to be re-evaluated (e.g. scrolled containers)
+    };
+
+    const markDirty = (node) => {
+      for (let current = node; current && !state.dirty.has(current); current = current.parentNode) {
+        state.dirty.add(current);
+      }
+    };
+
+    const isOwnMutation = (record) => {
+      // highlight overlays are added/removed around every snapshot, they must not invalidate anything
+      if (record.type === "attributes" && record.attributeName === HIGHLIGHT_ATTRIBUTE) return true;
+      const target = record.target.nodeType === Node.ELEMENT_NODE ? record.target : record.target.parentElement;
+      if (target && (target.id === HIGHLIGHT_CONTAINER_ID || target.closest(`#${HIGHLIGHT_CONTAINER_ID}`))) return true;
+      if (record.type === "childList") {
+        const changed = [...record.addedNodes, ...record.removedNodes];
+        return changed.length > 0 && changed.every((node) => node.id === HIGHLIGHT_CONTAINER_ID);
+      }
+      return false;
+    };
+
+    state.handleMutations = (records) => {
+      for (const record of records) {
+        if (!isOwnMutation(record)) markDirty(record.target);
+      }
+    };
+    state.observer = new MutationObserver(state.handleMutations);
+    state.observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+
+    // scrolling an inner container moves its content without any mutation
+    document.addEventListener("scroll", (event) => {
+      if (event.target && event.target.nodeType === Node.ELEMENT_NODE) {
+        state.dirtySubtrees.add(event.target);
+        markDirty(event.target);
+      }
+    }, { capture: true, passive: true });
+
+    Object.defineProperty(window, INCREMENTAL_STATE_KEY, { value: state, configurable: true });
+    return state;
+  }
+
+  const INCREMENTAL = incremental ? (window[INCREMENTAL_STATE_KEY] || createIncrementalState()) : null;
+  // window scroll / resize moves everything, only reuse the previous snapshot if the viewport is unchanged
+  const VIEWPORT_KEY = `${window.scrollX},${window.scrollY},${window.innerWidth},${window.innerHeight},${viewportExpansion}`;
+  const CAN_REUSE = !!(
+    INCREMENTAL &&
+    baseSnapshot &&
+    baseSnapshot.documentId === INCREMENTAL.documentId &&
+    baseSnapshot.snapshot === INCREMENTAL.snapshot &&
+    INCREMENTAL.viewportKey === VIEWPORT_KEY
+  );
+  const REUSED_ROOTS = [];
+  const ENTRY_STACK = [[]]; // child entries collected for each node currently being built
+  if (INCREMENTAL) {
+    INCREMENTAL.handleMutations(INCREMENTAL.observer.takeRecords());
+  }
+
   // Initialize once and reuse
   const viewportObserver = new IntersectionObserver(
     (entries) => {
@@ -1189,7 +1265,7 @@
       // When viewportExpansion is -1, all interactive elements should get a highlight index
       // regardless of viewport status
       if (nodeData.isInViewport || viewportExpansion === -1) {
-        nodeData.highlightIndex = highlightIndex++;
+        nodeData.highlightIndex = nextHighlightIndex(node);
 
         if (doHighlightElements) {
           if (focusHighlightIndex >= 0) {
@@ -1209,10 +1285,192 @@
     return false; // Did not highlight
   }
 
+  // Bits of the `flags` column, keep in sync with DomService
+  const FLAG_VISIBLE = 1;
+  const FLAG_INTERACTIVE = 2;
+  const FLAG_TOP_ELEMENT = 4;
+  const FLAG_IN_VIEWPORT = 8;
+  const FLAG_SHADOW_ROOT = 16;
+
   /**
-   * Creates a node data object for a given node and its descendants.
+   * Packs the node map into parallel arrays instead of one JSON object per node (decoded by DomService).
+   *
+   * Row i describes node id firstId + i; ids are handed out consecutively, children before their parent.
+   * - strings: table of every tag name, xpath, text and attribute name/value, each sent once
+   * - tags[i]: string index of the tag name, -1 for text nodes
+   * - values[i]: string index of the xpath (elements) or of the text (text nodes)
+   * - flags[i]: FLAG_* bits, highlights[i]: highlight index or -1
+   * - attributes[attributeOffsets[i]..attributeOffsets[i+1]]: (name, value) string index pairs
+   * - children[childOffsets[i]..childOffsets[i+1]]: child node ids
+   */
+  function encodeColumnar(nodeMap, firstId, endId) {
+    const strings = [];
+    const stringIndices = new Map();
+    const intern = (value) => {
+      let index = stringIndices.get(value);
+      if (index === undefined) {
+        index = strings.length;
+        strings.push(value);
+        stringIndices.set(value, index);
+      }
+      return index;
+    };
+
+    const count = endId - firstId;
+    const tags = new Array(count);
+    const values = new Array(count);
+    const flags = new Array(count);
+    const highlights = new Array(count);
+    const attributeOffsets = [0];
+    const attributes = [];
+    const childOffsets = [0];
+    const children = [];
+
+    for (let row = 0; row < count; row++) {
+      const nodeData = nodeMap[firstId + row];
+      if (nodeData.type === "TEXT_NODE") {
+        tags[row] = -1;
+        values[row] = intern(nodeData.text);
+        flags[row] = nodeData.isVisible ? FLAG_VISIBLE : 0;
+        highlights[row] = -1;
+      } else {
+        tags[row] = intern(nodeData.tagName);
+        values[row] = intern(nodeData.xpath);
+        flags[row] =
+          (nodeData.isVisible ? FLAG_VISIBLE : 0) |
+          (nodeData.isInteractive ? FLAG_INTERACTIVE : 0) |
+          (nodeData.isTopElement ? FLAG_TOP_ELEMENT : 0) |
+          (nodeData.isInViewport ? FLAG_IN_VIEWPORT : 0) |
+          (nodeData.shadowRoot ? FLAG_SHADOW_ROOT : 0);
+        highlights[row] = nodeData.highlightIndex ?? -1;
+        for (const name in nodeData.attributes) {
+          attributes.push(intern(name), intern(nodeData.attributes[name]));
+        }
+        for (const childId of nodeData.children) {
+          children.push(Number(childId));
+        }
+      }
+      attributeOffsets.push(attributes.length);
+      childOffsets.push(children.length);
+    }
+
+    return { firstId, strings, tags, values, flags, highlights, attributeOffsets, attributes, childOffsets, children };
+  }
+
+  /**
+   * Returns the highlight index for an element, stable across snapshots in incremental mode.
+   */
+  function nextHighlightIndex(element) {
+    if (!INCREMENTAL) return highlightIndex++;
+
+    let index = INCREMENTAL.highlightIndices.get(element);
+    if (index === undefined) {
+      index = INCREMENTAL.nextHighlightIndex++;
+      INCREMENTAL.highlightIndices.set(element, index);
+    }
+    return index;
+  }
+
+  /**
+   * Re-checks the layout dependent facts a cached subtree was built on, they can change without any mutation
+   * (an overlay covering it, a :hover/:focus rule showing a menu, ...).
+   */
+  function isCachedSubtreeValid(entry) {
+    const element = entry.node;
+    if (entry.check === "highlighted") {
+      if (!element.isConnected || !isElementVisible(element) || !isTopElement(element) || !isInExpandedViewport(element, viewportExpansion)) {
+        return false;
+      }
+    } else if (entry.check === "occluded") {
+      if (!isElementVisible(element) || isTopElement(element)) return false;
+    } else if (entry.check === "hidden") {
+      // descendants of a still hidden element are still hidden too
+      return !isElementVisible(element);
+    }
+    return entry.children.every(isCachedSubtreeValid);
+  }
+
+  function redrawCachedHighlights(entry) {
+    if (entry.highlightIndex !== null && (focusHighlightIndex < 0 || focusHighlightIndex === entry.highlightIndex)) {
+      highlightElement(entry.node, entry.highlightIndex, entry.parentIframe);
+    }
+    entry.children.forEach(redrawCachedHighlights);
+  }
+
+  /**
+   * Returns the id of the node's subtree from the previous snapshot if none of it changed, otherwise null.
+   */
+  function reuseCachedSubtree(node, parentIframe, isParentHighlighted) {
+    const entry = INCREMENTAL.cache.get(node);
+    if (!entry || !entry.reusable || INCREMENTAL.dirty.has(node)) return null;
+    if (entry.parentIframe !== parentIframe || entry.isParentHighlighted !== isParentHighlighted) return null;
+    if (INCREMENTAL.dirtySubtrees.size) {
+      for (let current = node; current; current = current.parentNode) {
+        if (INCREMENTAL.dirtySubtrees.has(current)) return null;
+      }
+    }
+    // a sibling inserted before this node changes its xpath (and the xpath of everything below it)
+    if (node.nodeType === Node.ELEMENT_NODE && node !== document.body && getXPathTree(node, true) !== entry.xpath) return null;
+    if (!isCachedSubtreeValid(entry)) return null;
+
+    if (doHighlightElements) redrawCachedHighlights(entry);
+    REUSED_ROOTS.push(entry.id);
+    ENTRY_STACK[ENTRY_STACK.length - 1].push(entry);
+    return entry.id;
+  }
+
+  /**
+   * Builds the node, reusing the previous snapshot's subtree when possible and caching the result for the next one.
    */
   function buildDomTree(node, parentIframe = null, isParentHighlighted = false) {
+    if (!INCREMENTAL) return buildDomTreeNode(node, parentIframe, isParentHighlighted);
+
+    if (CAN_REUSE && node) {
+      const reusedId = reuseCachedSubtree(node, parentIframe, isParentHighlighted);
+      if (reusedId !== null) return reusedId;
+    }
+
+    ENTRY_STACK.push([]);
+    const id = buildDomTreeNode(node, parentIframe, isParentHighlighted);
+    const children = ENTRY_STACK.pop();
+    if (id === null) {
+      INCREMENTAL.cache.delete(node);
+      return null;
+    }
+
+    const nodeData = DOM_HASH_MAP[id];
+    let check = null;
+    if (nodeData.highlightIndex !== undefined) check = "highlighted";
+    else if (nodeData.isVisible === false && node.nodeType === Node.ELEMENT_NODE) check = "hidden";
+    else if (nodeData.isVisible && nodeData.isTopElement === false) check = "occluded";
+
+    const entry = {
+      id,
+      node,
+      parentIframe,
+      isParentHighlighted,
+      xpath: nodeData.xpath,
+      check,
+      highlightIndex: nodeData.highlightIndex ?? null,
+      children,
+      // the MutationObserver and scroll listener only see the top document: iframe documents and shadow roots
+      // (and everything inside them) are always walked again
+      reusable:
+        parentIframe === null &&
+        node.getRootNode() === document &&
+        !nodeData.shadowRoot &&
+        nodeData.tagName !== "iframe" &&
+        children.every((child) => child.reusable),
+    };
+    INCREMENTAL.cache.set(node, entry);
+    ENTRY_STACK[ENTRY_STACK.length - 1].push(entry);
+    return id;
+  }
+
+  /**
+   * Creates a node data object for a given node and its descendants.
+   */
+  function buildDomTreeNode(node, parentIframe = null, isParentHighlighted = false) {
     // Fast rejection checks first
     if (!node || node.id === HIGHLIGHT_CONTAINER_ID || 
         (node.nodeType !== Node.ELEMENT_NODE && node.nodeType !== Node.TEXT_NODE)) {
@@ -1419,11 +1677,25 @@
   isTextNodeVisible = measureTime(isTextNodeVisible);
   getEffectiveScroll = measureTime(getEffectiveScroll);
 
+  if (INCREMENTAL) ID.current = INCREMENTAL.nextId;
+  const firstId = ID.current;
+
   const rootId = buildDomTree(document.body);
 
   // Clear the cache before starting
   DOM_CACHE.clearCache();
 
+  let snapshotInfo = null;
+  if (INCREMENTAL) {
+    INCREMENTAL.nextId = ID.current;
+    INCREMENTAL.snapshot++;
+    INCREMENTAL.viewportKey = VIEWPORT_KEY;
+    INCREMENTAL.dirty.clear();
+    INCREMENTAL.dirtySubtrees.clear();
+    INCREMENTAL.observer.takeRecords(); // only our own highlight overlays changed the DOM since the snapshot started
+    snapshotInfo = { documentId: INCREMENTAL.documentId, snapshot: INCREMENTAL.snapshot };
+  }
+
   // Only process metrics in debug mode
   if (debugMode && PERF_METRICS) {
     // Convert timings to seconds and add useful derived metrics
@@ -1474,7 +1746,12 @@
     }
   }
 
-  return debugMode ?
-    { rootId, map: DOM_HASH_MAP, perfMetrics: PERF_METRICS } :
-    { rootId, map: DOM_HASH_MAP };
+  const result = encodeColumnar(DOM_HASH_MAP, firstId, ID.current);
+  result.rootId = rootId === null ? null : Number(rootId);
+  if (INCREMENTAL) {
+    result.reused = REUSED_ROOTS.map(Number);
+    result.snapshot = snapshotInfo;
+  }
+  if (debugMode) result.perfMetrics = PERF_METRICS;
+  return result;
 };
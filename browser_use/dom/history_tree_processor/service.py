@@ -4,6 +4,20 @@ from browser_use.dom.history_tree_processor.view import DOMHistoryElement, Hashe
 from browser_use.dom.views import DOMElementNode
 
 
+def _hash_string(string: str) -> str:
+	# 128-bit blake2b: for strings this short the cost is per call, so the wins come from hashing less often
+	return hashlib.blake2b(string.encode(), digest_size=16).hexdigest()
+
+
+# hash of an empty branch path (the tree root itself is not part of any branch path)
+_ROOT_BRANCH_PATH_HASH = _hash_string('')
+
+
+def _extend_branch_path_hash(parent_branch_path_hash: str, tag_name: str) -> str:
+	"""Branch path hashes are chained (hash of the parent's path hash + own tag) so they can be built top-down"""
+	return _hash_string(f'{parent_branch_path_hash}/{tag_name}')
+
+
 class HistoryTreeProcessor:
 	""" "
 	Operations on the DOM elements
@@ -36,8 +50,7 @@ class HistoryTreeProcessor:
 
 		def process_node(node: DOMElementNode):
 			if node.highlight_index is not None:
-				hashed_node = HistoryTreeProcessor._hash_dom_element(node)
-				if hashed_node == hashed_dom_history_element:
+				if node.hash == hashed_dom_history_element:
 					return node
 			for child in node.children:
 				if isinstance(child, DOMElementNode):
@@ -51,9 +64,7 @@ class HistoryTreeProcessor:
 	@staticmethod
 	def compare_history_element_and_dom_element(dom_history_element: DOMHistoryElement, dom_element: DOMElementNode) -> bool:
 		hashed_dom_history_element = HistoryTreeProcessor._hash_dom_history_element(dom_history_element)
-		hashed_dom_element = HistoryTreeProcessor._hash_dom_element(dom_element)
-
-		return hashed_dom_history_element == hashed_dom_element
+		return hashed_dom_history_element == dom_element.hash
 
 	@staticmethod
 	def _hash_dom_history_element(dom_history_element: DOMHistoryElement) -> HashedDomElement:
@@ -65,8 +76,8 @@ class HistoryTreeProcessor:
 
 	@staticmethod
 	def _hash_dom_element(dom_element: DOMElementNode) -> HashedDomElement:
-		parent_branch_path = HistoryTreeProcessor._get_parent_branch_path(dom_element)
-		branch_path_hash = HistoryTreeProcessor._parent_branch_path_hash(parent_branch_path)
+		"""Hash an element, use DOMElementNode.hash instead to get the memoized result"""
+		branch_path_hash = HistoryTreeProcessor._branch_path_hash(dom_element)
 		attributes_hash = HistoryTreeProcessor._attributes_hash(dom_element.attributes)
 		xpath_hash = HistoryTreeProcessor._xpath_hash(dom_element.xpath)
 		# text_hash = DomTreeProcessor._text_hash(dom_element)
@@ -85,22 +96,42 @@ class HistoryTreeProcessor:
 
 		return [parent.tag_name for parent in parents]
 
+	@staticmethod
+	def _branch_path_hash(dom_element: DOMElementNode) -> str:
+		"""
+		Same value as _parent_branch_path_hash(_get_parent_branch_path(dom_element)), but memoized on every node:
+		we only walk up to the first ancestor whose hash is known and fill in the hashes top-down from there.
+		"""
+		pending: list[DOMElementNode] = []
+		current = dom_element
+		while current._branch_path_hash is None and current.parent is not None:
+			pending.append(current)
+			current = current.parent
+
+		branch_path_hash = current._branch_path_hash or _ROOT_BRANCH_PATH_HASH
+		for element in reversed(pending):
+			branch_path_hash = _extend_branch_path_hash(branch_path_hash, element.tag_name)
+			element._branch_path_hash = branch_path_hash
+		return branch_path_hash
+
 	@staticmethod
 	def _parent_branch_path_hash(parent_branch_path: list[str]) -> str:
-		parent_branch_path_string = '/'.join(parent_branch_path)
-		return hashlib.sha256(parent_branch_path_string.encode()).hexdigest()
+		branch_path_hash = _ROOT_BRANCH_PATH_HASH
+		for tag_name in parent_branch_path:
+			branch_path_hash = _extend_branch_path_hash(branch_path_hash, tag_name)
+		return branch_path_hash
 
 	@staticmethod
 	def _attributes_hash(attributes: dict[str, str]) -> str:
 		attributes_string = ''.join(f'{key}={value}' for key, value in attributes.items())
-		return hashlib.sha256(attributes_string.encode()).hexdigest()
+		return _hash_string(attributes_string)
 
 	@staticmethod
 	def _xpath_hash(xpath: str) -> str:
-		return hashlib.sha256(xpath.encode()).hexdigest()
+		return _hash_string(xpath)
 
 	@staticmethod
 	def _text_hash(dom_element: DOMElementNode) -> str:
 		""" """
 		text_string = dom_element.get_all_text_till_next_clickable_element()
-		return hashlib.sha256(text_string.encode()).hexdigest()
+		return _hash_string(text_string)
@@ -1,5 +1,7 @@
+import copy
 import logging
 from dataclasses import dataclass
+from functools import cache
 from importlib import resources
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
@@ -16,6 +18,44 @@ from browser_use.dom.views import (
 )
 from browser_use.utils import time_execution_async
 
+# buildDomTree.js is installed into every document under this (non-enumerable) window property,
+# so each step only has to send a short call expression instead of re-sending and re-parsing ~50KB of JS
+BUILD_DOM_TREE_FN = '__browserUseBuildDomTree'
+
+
+@cache
+def _get_build_dom_tree_js() -> str:
+	"""Read buildDomTree.js once per process"""
+	return resources.files('browser_use.dom').joinpath('buildDomTree.js').read_text()
+
+
+@cache
+def get_build_dom_tree_init_script() -> str:
+	"""Script that defines window.__browserUseBuildDomTree, meant for BrowserContext.add_init_script()"""
+	js_function = _get_build_dom_tree_js().strip().rstrip(';')
+	return (
+		f'if (!Object.prototype.hasOwnProperty.call(window, {BUILD_DOM_TREE_FN!r})) {{\n'
+		f'\tObject.defineProperty(window, {BUILD_DOM_TREE_FN!r}, {{ value: {js_function}, configurable: true }});\n'
+		'}\n'
+	)
+
+
+@cache
+def _get_build_dom_tree_call_js() -> str:
+	"""Call the installed extractor, or install it first when the document predates the init script"""
+	return f'args => {{ if (!window.{BUILD_DOM_TREE_FN}) {{ {get_build_dom_tree_init_script()} }} return window.{BUILD_DOM_TREE_FN}(args); }}'
+
+
+# fast path, returns null instead of the DOM map if the extractor is not installed in this document
+_CALL_INSTALLED_BUILD_DOM_TREE_JS = f'args => window.{BUILD_DOM_TREE_FN} ? window.{BUILD_DOM_TREE_FN}(args) : null'
+
+# bits of the `flags` column in the buildDomTree.js payload, keep in sync with FLAG_* there
+_FLAG_VISIBLE = 1
+_FLAG_INTERACTIVE = 2
+_FLAG_TOP_ELEMENT = 4
+_FLAG_IN_VIEWPORT = 8
+_FLAG_SHADOW_ROOT = 16
+
 
 @dataclass
 class ViewportInfo:
@@ -26,12 +66,24 @@ class ViewportInfo:
 class DomService:
 	logger: logging.Logger
 
-	def __init__(self, page: 'Page', logger: logging.Logger | None = None):
+	def __init__(self, page: 'Page', logger: logging.Logger | None = None, incremental: bool = False):
 		self.page = page
 		self.xpath_cache = {}
 		self.logger = logger or logging.getLogger(__name__)
 
-		self.js_code = resources.files('browser_use.dom').joinpath('buildDomTree.js').read_text()
+		self.js_code = _get_build_dom_tree_js()
+
+		# incremental mode: the previous snapshot's nodes by their buildDomTree.js id, so unchanged subtrees
+		# reported by the extractor can be merged into the new tree instead of being sent and parsed again
+		self.incremental = incremental
+		self._snapshot: dict | None = None
+		self._node_map: dict[int, DOMBaseNode] = {}
+		self._node_ids: dict[int, int] = {}  # id(node) -> buildDomTree.js id
+
+	@staticmethod
+	async def install(browser_context) -> None:
+		"""Register the DOM extractor on a BrowserContext so it is parsed once per document instead of once per step"""
+		await browser_context.add_init_script(get_build_dom_tree_init_script())
 
 	# region - Clickable elements
 	@time_execution_async('--get_clickable_elements')
@@ -95,13 +147,15 @@ class DomService:
 			'focusHighlightIndex': focus_element,
 			'viewportExpansion': viewport_expansion,
 			'debugMode': debug_mode,
+			'incremental': self.incremental,
+			'baseSnapshot': self._snapshot,
 		}
 
-		try:
-			eval_page: dict = await self.page.evaluate(self.js_code, args)
-		except Exception as e:
-			self.logger.error('Error evaluating JavaScript: %s', e)
-			raise
+		eval_page = await self._evaluate_build_dom_tree(args)
+		if any(node_id not in self._node_map for node_id in eval_page.get('reused', ())):
+			# the extractor reused a subtree we no longer hold, fall back to a full snapshot
+			self.logger.debug('🔎 Incremental DOM snapshot referenced unknown nodes, requesting a full snapshot')
+			eval_page = await self._evaluate_build_dom_tree({**args, 'baseSnapshot': None})
 
 		# Only log performance metrics in debug mode
 		if debug_mode and 'perfMetrics' in eval_page:
@@ -112,11 +166,7 @@ class DomService:
 			# processed_nodes = perf.get('nodeMetrics', {}).get('processedNodes', 0)
 
 			# Count interactive elements from the DOM map
-			interactive_count = 0
-			if 'map' in eval_page:
-				for node_data in eval_page['map'].values():
-					if isinstance(node_data, dict) and node_data.get('isInteractive'):
-						interactive_count += 1
+			interactive_count = sum(1 for node_flags in eval_page['flags'] if node_flags & _FLAG_INTERACTIVE)
 
 			# Create concise summary
 			url_short = self.page.url[:50] + '...' if len(self.page.url) > 50 else self.page.url
@@ -130,91 +180,114 @@ class DomService:
 
 		return await self._construct_dom_tree(eval_page)
 
+	async def _evaluate_build_dom_tree(self, args: dict) -> dict:
+		try:
+			eval_page: dict | None = await self.page.evaluate(_CALL_INSTALLED_BUILD_DOM_TREE_JS, args)
+			if eval_page is None:
+				# document was loaded before DomService.install() ran, or evaluate runs in an isolated world
+				# that can't see the init script: ship the full script once, later steps reuse it
+				eval_page = await self.page.evaluate(_get_build_dom_tree_call_js(), args)
+		except Exception as e:
+			self.logger.error('Error evaluating JavaScript: %s', e)
+			raise
+		return eval_page
+
 	@time_execution_async('--construct_dom_tree')
 	async def _construct_dom_tree(
 		self,
 		eval_page: dict,
 	) -> tuple[DOMElementNode, SelectorMap]:
-		js_node_map = eval_page['map']
+		"""Decode the columnar payload of buildDomTree.js (see encodeColumnar() there for the layout)"""
+		strings = eval_page['strings']
+		tags = eval_page['tags']
+		values = eval_page['values']
+		flags = eval_page['flags']
+		highlights = eval_page['highlights']
+		attribute_offsets = eval_page['attributeOffsets']
+		attributes = eval_page['attributes']
+		child_offsets = eval_page['childOffsets']
+		children = eval_page['children']
+		first_id = eval_page['firstId']
 		js_root_id = eval_page['rootId']
 
 		selector_map = {}
 		node_map = {}
+		node_ids = {}
+
+		# subtrees the extractor found unchanged since the previous snapshot are merged in as copies: the previous
+		# BrowserStateSummary still references the old nodes, their parents and children must not change under it
+		for reused_id in eval_page.get('reused', ()):
+			stack: list[tuple[DOMBaseNode, DOMElementNode | None]] = [(self._node_map[reused_id], None)]
+			while stack:
+				original, parent = stack.pop()
+				node = copy.copy(original)
+				node.parent = parent
+				if parent is not None:
+					parent.children.append(node)
+				node_id = self._node_ids[id(original)]
+				node_map[node_id] = node
+				node_ids[id(node)] = node_id
+				if isinstance(node, DOMElementNode):
+					node.is_new = None  # marked again for the new state
+					node.children = []
+					if node.highlight_index is not None:
+						selector_map[node.highlight_index] = node
+					stack.extend((child, node) for child in reversed(original.children))
+
+		# NOTE: rows are ordered bottom up, all children are processed before their parent
+		for row, tag in enumerate(tags):
+			node_id = first_id + row
+			node_flags = flags[row]
+
+			if tag < 0:
+				node = DOMTextNode(
+					text=strings[values[row]],
+					is_visible=bool(node_flags & _FLAG_VISIBLE),
+					parent=None,
+				)
+			else:
+				highlight_index = highlights[row]
+				node = DOMElementNode(
+					tag_name=strings[tag],
+					xpath=strings[values[row]],
+					attributes={
+						strings[attributes[i]]: strings[attributes[i + 1]]
+						for i in range(attribute_offsets[row], attribute_offsets[row + 1], 2)
+					},
+					children=[],
+					is_visible=bool(node_flags & _FLAG_VISIBLE),
+					is_interactive=bool(node_flags & _FLAG_INTERACTIVE),
+					is_top_element=bool(node_flags & _FLAG_TOP_ELEMENT),
+					is_in_viewport=bool(node_flags & _FLAG_IN_VIEWPORT),
+					highlight_index=highlight_index if highlight_index >= 0 else None,
+					shadow_root=bool(node_flags & _FLAG_SHADOW_ROOT),
+					parent=None,
+				)
 
-		for id, node_data in js_node_map.items():
-			node, children_ids = self._parse_node(node_data)
-			if node is None:
-				continue
-
-			node_map[id] = node
-
-			if isinstance(node, DOMElementNode) and node.highlight_index is not None:
-				selector_map[node.highlight_index] = node
+				if node.highlight_index is not None:
+					selector_map[node.highlight_index] = node
 
-			# NOTE: We know that we are building the tree bottom up
-			#       and all children are already processed.
-			if isinstance(node, DOMElementNode):
-				for child_id in children_ids:
-					if child_id not in node_map:
+				for child_id in children[child_offsets[row] : child_offsets[row + 1]]:
+					child_node = node_map.get(child_id)
+					if child_node is None:
 						continue
 
-					child_node = node_map[child_id]
-
 					child_node.parent = node
 					node.children.append(child_node)
 
-		html_to_dict = node_map[str(js_root_id)]
+			node_map[node_id] = node
+			node_ids[id(node)] = node_id
+
+		html_to_dict = node_map.get(js_root_id)
+
+		if self.incremental:
+			self._snapshot = eval_page.get('snapshot')
+			self._node_map = node_map
+			self._node_ids = node_ids
 
 		del node_map
-		del js_node_map
-		del js_root_id
 
 		if html_to_dict is None or not isinstance(html_to_dict, DOMElementNode):
 			raise ValueError('Failed to parse HTML to dictionary')
 
 		return html_to_dict, selector_map
-
-	def _parse_node(
-		self,
-		node_data: dict,
-	) -> tuple[DOMBaseNode | None, list[int]]:
-		if not node_data:
-			return None, []
-
-		# Process text nodes immediately
-		if node_data.get('type') == 'TEXT_NODE':
-			text_node = DOMTextNode(
-				text=node_data['text'],
-				is_visible=node_data['isVisible'],
-				parent=None,
-			)
-			return text_node, []
-
-		# Process coordinates if they exist for element nodes
-
-		viewport_info = None
-
-		if 'viewport' in node_data:
-			viewport_info = ViewportInfo(
-				width=node_data['viewport']['width'],
-				height=node_data['viewport']['height'],
-			)
-
-		element_node = DOMElementNode(
-			tag_name=node_data['tagName'],
-			xpath=node_data['xpath'],
-			attributes=node_data.get('attributes', {}),
-			children=[],
-			is_visible=node_data.get('isVisible', False),
-			is_interactive=node_data.get('isInteractive', False),
-			is_top_element=node_data.get('isTopElement', False),
-			is_in_viewport=node_data.get('isInViewport', False),
-			highlight_index=node_data.get('highlightIndex'),
-			shadow_root=node_data.get('shadowRoot', False),
-			parent=None,
-			viewport_info=viewport_info,
-		)
-
-		children_ids = node_data.get('children', [])
-
-		return element_node, children_ids
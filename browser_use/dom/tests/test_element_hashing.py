@@ -0,0 +1,26 @@
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
+from browser_use.dom.views import DOMElementNode
+
+
+def _element(tag_name: str, parent: DOMElementNode | None, **kwargs) -> DOMElementNode:
+	element = DOMElementNode(tag_name=tag_name, xpath=tag_name, attributes={}, children=[], is_visible=True, parent=parent, **kwargs)
+	if parent is not None:
+		parent.children.append(element)
+	return element
+
+
+def test_memoized_branch_path_hash_matches_history_element():
+	root = _element('body', None)
+	section = _element('section', root)
+	link = _element('a', section, highlight_index=0)
+	button = _element('button', section, highlight_index=1)
+
+	# hashing the deeper elements fills in the shared ancestors' hashes top-down
+	assert link.hash.branch_path_hash == HistoryTreeProcessor._parent_branch_path_hash(['section', 'a'])
+	assert section._branch_path_hash == HistoryTreeProcessor._parent_branch_path_hash(['section'])
+	assert button.hash.branch_path_hash == HistoryTreeProcessor._parent_branch_path_hash(['section', 'button'])
+
+	history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(button)
+	assert HistoryTreeProcessor.compare_history_element_and_dom_element(history_element, button)
+	assert not HistoryTreeProcessor.compare_history_element_and_dom_element(history_element, link)
+	assert HistoryTreeProcessor.find_history_element_in_tree(history_element, root) is button
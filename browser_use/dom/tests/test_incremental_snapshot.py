@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from browser_use.dom.service import DomService
+
+
+def _payload(first_id: int, nodes: list[dict], root_id: int, reused: list[int], snapshot: int) -> dict:
+	"""Encode nodes the way encodeColumnar() in buildDomTree.js does"""
+	strings: list[str] = []
+
+	def intern(value: str) -> int:
+		if value not in strings:
+			strings.append(value)
+		return strings.index(value)
+
+	payload = {
+		'firstId': first_id,
+		'strings': strings,
+		'tags': [],
+		'values': [],
+		'flags': [],
+		'highlights': [],
+		'attributeOffsets': [0],
+		'attributes': [],
+		'childOffsets': [0],
+		'children': [],
+		'rootId': root_id,
+		'reused': reused,
+		'snapshot': {'documentId': 'doc', 'snapshot': snapshot},
+	}
+	for node in nodes:
+		if 'text' in node:
+			payload['tags'].append(-1)
+			payload['values'].append(intern(node['text']))
+			payload['flags'].append(1)
+			payload['highlights'].append(-1)
+		else:
+			payload['tags'].append(intern(node['tag']))
+			payload['values'].append(intern(node['xpath']))
+			payload['flags'].append(1 | 2 | 4 | 8 if 'highlight' in node else 0)
+			payload['highlights'].append(node.get('highlight', -1))
+			payload['children'].extend(node['children'])
+		payload['attributeOffsets'].append(len(payload['attributes']))
+		payload['childOffsets'].append(len(payload['children']))
+	return payload
+
+
+def test_columnar_payload_is_decoded():
+	dom_service = DomService(page=None)  # type: ignore
+	payload = _payload(
+		0,
+		[
+			{'text': 'Sign in'},
+			{'tag': 'button', 'xpath': 'html/body/button', 'highlight': 0, 'children': [0]},
+			{'tag': 'body', 'xpath': '/body', 'children': [1]},
+		],
+		root_id=2,
+		reused=[],
+		snapshot=1,
+	)
+	payload['attributes'] = [payload['strings'].index('button'), len(payload['strings'])]
+	payload['strings'].append('submit')
+	payload['attributeOffsets'] = [0, 0, 2, 2]
+
+	root, selector_map = asyncio.run(dom_service._construct_dom_tree(payload))
+
+	button = selector_map[0]
+	assert root.tag_name == 'body' and not root.is_visible
+	assert button.parent is root
+	assert button.attributes == {'button': 'submit'}
+	assert button.is_interactive and button.is_top_element and button.is_in_viewport and not button.shadow_root
+	assert button.get_all_text_till_next_clickable_element() == 'Sign in'
+
+
+def test_delta_is_merged_into_previous_tree():
+	dom_service = DomService(page=None, incremental=True)  # type: ignore
+
+	full = _payload(
+		0,
+		[
+			{'text': 'first'},
+			{'tag': 'button', 'xpath': 'html/body/button[1]', 'highlight': 0, 'children': [0]},
+			{'text': 'second'},
+			{'tag': 'button', 'xpath': 'html/body/button[2]', 'highlight': 1, 'children': [2]},
+			{'tag': 'body', 'xpath': '/body', 'children': [1, 3]},
+		],
+		root_id=4,
+		reused=[],
+		snapshot=1,
+	)
+	root, selector_map = asyncio.run(dom_service._construct_dom_tree(full))
+	first_button = selector_map[0]
+	assert dom_service._snapshot == {'documentId': 'doc', 'snapshot': 1}
+
+	# the second button's text changed, the first button's subtree is reported as reused
+	delta = _payload(
+		5,
+		[
+			{'text': 'changed'},
+			{'tag': 'button', 'xpath': 'html/body/button[2]', 'highlight': 1, 'children': [5]},
+			{'tag': 'body', 'xpath': '/body', 'children': [1, 6]},
+		],
+		root_id=7,
+		reused=[1],
+		snapshot=2,
+	)
+	new_root, new_selector_map = asyncio.run(dom_service._construct_dom_tree(delta))
+
+	assert new_root is not root
+	# reused nodes are copies, the previous tree is left as it was
+	reused_button = new_selector_map[0]
+	assert reused_button is not first_button and reused_button.xpath == first_button.xpath
+	assert reused_button.parent is new_root and first_button.parent is root
+	assert reused_button.children[0].parent is reused_button and first_button.children[0].parent is first_button
+	assert new_selector_map[1].get_all_text_till_next_clickable_element() == 'changed'
+	assert [child.highlight_index for child in new_root.children] == [0, 1]
+	# only the nodes of the current tree are kept for the next delta
+	assert set(dom_service._node_map) == {0, 1, 5, 6, 7}
+
+
+def test_changes_inside_shadow_roots_and_iframes_are_seen():
+	playwright_api = pytest.importorskip('playwright.async_api')
+	page_html = """
+		<button>top</button>
+		<div id="host"></div>
+		<iframe srcdoc="<button>frame before</button>"></iframe>
+		<script>
+			document.getElementById('host').attachShadow({mode: 'open'}).innerHTML = '<button>shadow before</button>';
+		</script>
+	"""
+
+	def button_texts(selector_map) -> set[str]:
+		return {node.get_all_text_till_next_clickable_element() for node in selector_map.values()}
+
+	async def run():
+		async with playwright_api.async_playwright() as playwright:
+			try:
+				browser = await playwright.chromium.launch(headless=True)
+			except Exception as e:
+				pytest.skip(f'chromium is not available: {e}')
+			page = await browser.new_page()
+			await page.goto(f'data:text/html,{page_html}')
+			await page.wait_for_function("document.querySelector('iframe').contentDocument.querySelector('button')")
+			dom_service = DomService(page, incremental=True)
+
+			before = await dom_service.get_clickable_elements(highlight_elements=False)
+			# neither change is reported by the MutationObserver on the top document
+			await page.evaluate("""() => {
+				document.getElementById('host').shadowRoot.querySelector('button').textContent = 'shadow after';
+				document.querySelector('iframe').contentDocument.querySelector('button').textContent = 'frame after';
+			}""")
+			after = await dom_service.get_clickable_elements(highlight_elements=False)
+			await browser.close()
+			return button_texts(before.selector_map), button_texts(after.selector_map)
+
+	before, after = asyncio.run(run())
+	assert before == {'top', 'shadow before', 'frame before'}
+	assert after == {'top', 'shadow after', 'frame after'}
@@ -1,5 +1,4 @@
-from dataclasses import dataclass
-from functools import cached_property
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Optional
 
 from browser_use.dom.history_tree_processor.view import CoordinateSet, HashedDomElement, ViewportInfo
@@ -10,7 +9,8 @@ if TYPE_CHECKING:
 	from .views import DOMElementNode
 
 
-@dataclass(frozen=False)
+# nodes are slotted (no per-instance __dict__): a page easily has tens of thousands of them per snapshot
+@dataclass(frozen=False, slots=True)
 class DOMBaseNode:
 	is_visible: bool
 	# Use None as default and set parent later to avoid circular reference issues
@@ -20,7 +20,7 @@ class DOMBaseNode:
 		raise NotImplementedError('DOMBaseNode is an abstract class')
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMTextNode(DOMBaseNode):
 	text: str
 	type: str = 'TEXT_NODE'
@@ -52,7 +52,7 @@ class DOMTextNode(DOMBaseNode):
 		}
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMElementNode(DOMBaseNode):
 	"""
 	xpath: the xpath of the element from the last root node (shadow root or iframe OR document if no shadow root or iframe).
@@ -79,6 +79,11 @@ class DOMElementNode(DOMBaseNode):
 	"""
 	is_new: bool | None = None
 
+	# cache for .hash, a slot instead of functools.cached_property which needs an instance __dict__
+	_hash: HashedDomElement | None = field(default=None, init=False, repr=False, compare=False)
+	# memoized by HistoryTreeProcessor._branch_path_hash(), children derive theirs from it
+	_branch_path_hash: str | None = field(default=None, init=False, repr=False, compare=False)
+
 	def __json__(self) -> dict:
 		return {
 			'tag_name': self.tag_name,
@@ -121,13 +126,15 @@ class DOMElementNode(DOMBaseNode):
 
 		return tag_str
 
-	@cached_property
+	@property
 	def hash(self) -> HashedDomElement:
-		from browser_use.dom.history_tree_processor.service import (
-			HistoryTreeProcessor,
-		)
+		if self._hash is None:
+			from browser_use.dom.history_tree_processor.service import (
+				HistoryTreeProcessor,
+			)
 
-		return HistoryTreeProcessor._hash_dom_element(self)
+			self._hash = HistoryTreeProcessor._hash_dom_element(self)
+		return self._hash
 
 	def get_all_text_till_next_clickable_element(self, max_depth: int = -1) -> str:
 		text_parts = []
@@ -153,21 +160,27 @@ class DOMElementNode(DOMBaseNode):
 	def clickable_elements_to_string(self, include_attributes: list[str] | None = None) -> str:
 		"""Convert the processed DOM content to HTML."""
 		formatted_text = []
+		include_attributes_set = set(include_attributes) if include_attributes else None
 
-		def process_node(node: DOMBaseNode, depth: int) -> None:
-			next_depth = int(depth)
+		# Single pre-order pass with an explicit stack: every node is visited exactly once (no recursion limit on deep pages)
+		stack: list[tuple[DOMBaseNode, int]] = [(self, 0)]
+		while stack:
+			node, depth = stack.pop()
 			depth_str = depth * '\t'
 
 			if isinstance(node, DOMElementNode):
+				next_depth = depth
+
 				# Add element with highlight_index
 				if node.highlight_index is not None:
 					next_depth += 1
 
-					text = node.get_all_text_till_next_clickable_element(max_depth=1)
+					# same as get_all_text_till_next_clickable_element(max_depth=1): the element's direct text children
+					text = '\n'.join(child.text for child in node.children if isinstance(child, DOMTextNode)).strip()
 					attributes_html_str = ''
-					if include_attributes:
+					if include_attributes_set:
 						attributes_to_include = {
-							key: str(value) for key, value in node.attributes.items() if key in include_attributes
+							key: str(value) for key, value in node.attributes.items() if key in include_attributes_set
 						}
 
 						# Easy LLM optimizations
@@ -216,18 +229,16 @@ class DOMElementNode(DOMBaseNode):
 					line += ' />'  # 1 token
 					formatted_text.append(line)
 
-				# Process children regardless
-				for child in node.children:
-					process_node(child, next_depth)
+				# Process children regardless, pushed in reverse so they are popped in document order
+				for child in reversed(node.children):
+					stack.append((child, next_depth))
 
 			elif isinstance(node, DOMTextNode):
 				# Add text only if it doesn't have a highlighted parent
-				if (
-					node.parent.highlight_index is None and node.parent and node.parent.is_visible and node.parent.is_top_element
-				):  # and node.is_parent_top_element()
+				parent = node.parent
+				if parent is not None and parent.highlight_index is None and parent.is_visible and parent.is_top_element:
 					formatted_text.append(f'{depth_str}{node.text}')
 
-		process_node(self, 0)
 		return '\n'.join(formatted_text)
 
 
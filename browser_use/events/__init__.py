@@ -0,0 +1,30 @@
+"""
+Structured, per-session event stream for agent runs.
+"""
+
+from browser_use.events.service import EventBus, EventSubscription
+from browser_use.events.views import (
+	ActionResultEvent,
+	AgentEvent,
+	AgentStatusEvent,
+	ModelOutputEvent,
+	SerializedEvent,
+	StepErrorEvent,
+	StepStartedEvent,
+	TaskCompletedEvent,
+	TaskStartedEvent,
+)
+
+__all__ = [
+	'ActionResultEvent',
+	'AgentEvent',
+	'AgentStatusEvent',
+	'EventBus',
+	'EventSubscription',
+	'ModelOutputEvent',
+	'SerializedEvent',
+	'StepErrorEvent',
+	'StepStartedEvent',
+	'TaskCompletedEvent',
+	'TaskStartedEvent',
+]
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+
+from browser_use.events.views import AgentEvent, SerializedEvent
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()  # sentinel pushed to subscribers when the bus is closed
+
+
+class EventSubscription:
+	"""
+	One consumer's view of an EventBus, iterate it with `async for` to receive events without polling.
+
+	Each subscription has its own bounded queue: if a consumer falls behind by more than max_queue_size
+	events, the oldest undelivered events are dropped so a slow client can never block the agent.
+	"""
+
+	def __init__(self, bus: 'EventBus', max_queue_size: int):
+		self._bus = bus
+		# bounded by hand rather than with maxsize= so the close sentinel never displaces a real event
+		self._queue: asyncio.Queue = asyncio.Queue()
+		self.max_queue_size = max_queue_size
+		self.dropped = 0
+
+	def _push(self, item) -> None:
+		if item is not _CLOSED and self._queue.qsize() >= self.max_queue_size:
+			self._queue.get_nowait()
+			self.dropped += 1
+		self._queue.put_nowait(item)
+
+	def __aiter__(self):
+		return self
+
+	async def __anext__(self) -> SerializedEvent:
+		item = await self._queue.get()
+		if item is _CLOSED:
+			self.close()
+			raise StopAsyncIteration
+		return item
+
+	def close(self) -> None:
+		self._bus._unsubscribe(self)
+
+	async def __aenter__(self) -> 'EventSubscription':
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+		self.close()
+
+
+class EventBus:
+	"""
+	Per-session broadcast channel for AgentEvents.
+
+	publish() is synchronous and never blocks: the event is serialized exactly once (pydantic's
+	compiled JSON encoder) and the resulting SerializedEvent is fanned out to every subscriber.
+	"""
+
+	def __init__(self, session_id: str | None = None, max_queue_size: int = 1000):
+		self.session_id = session_id
+		self.max_queue_size = max_queue_size
+		self._subscribers: list[EventSubscription] = []
+		self.closed = False
+		self.published = 0
+
+	def subscribe(self) -> EventSubscription:
+		subscription = EventSubscription(self, self.max_queue_size)
+		if self.closed:
+			subscription._push(_CLOSED)
+		else:
+			self._subscribers.append(subscription)
+		return subscription
+
+	def _unsubscribe(self, subscription: EventSubscription) -> None:
+		if subscription in self._subscribers:
+			self._subscribers.remove(subscription)
+
+	def publish(self, event: AgentEvent) -> None:
+		if self.closed:
+			return
+		if event.session_id is None:
+			event.session_id = self.session_id
+		self.published += 1
+		if not self._subscribers:
+			return
+		serialized = SerializedEvent(event=event, json=event.model_dump_json(exclude_none=True))
+		for subscription in self._subscribers:
+			subscription._push(serialized)
+
+	def close(self) -> None:
+		"""End every subscriber's iteration once it has drained the events published so far"""
+		if self.closed:
+			return
+		self.closed = True
+		for subscription in self._subscribers:
+			subscription._push(_CLOSED)
+		self._subscribers.clear()
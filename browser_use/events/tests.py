@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from browser_use.events import AgentEvent, EventBus, TaskStartedEvent
+
+
+def test_publish_serializes_once_and_fans_out():
+	async def run():
+		bus = EventBus(session_id='abc')
+		first, second = bus.subscribe(), bus.subscribe()
+		bus.publish(TaskStartedEvent(task='open example.com', message='Initiating Agents ...'))
+		bus.close()
+
+		received_first = [event async for event in first]
+		received_second = [event async for event in second]
+		return received_first, received_second
+
+	received_first, received_second = asyncio.run(run())
+	assert len(received_first) == len(received_second) == 1
+	# both subscribers share the exact same serialized payload
+	assert received_first[0] is received_second[0]
+	payload = json.loads(received_first[0].json)
+	assert payload['event'] == 'task_started'
+	assert payload['session_id'] == 'abc'
+	assert payload['task'] == 'open example.com'
+	assert payload['info'] == 'Starting Task'
+
+
+def test_slow_subscriber_drops_oldest():
+	async def run():
+		bus = EventBus(max_queue_size=2)
+		subscription = bus.subscribe()
+		for i in range(5):
+			bus.publish(AgentEvent(message=str(i)))
+		bus.close()
+		return subscription, [event.event.message async for event in subscription]
+
+	subscription, messages = asyncio.run(run())
+	assert messages == ['3', '4']
+	assert subscription.dropped == 3
+
+
+def test_subscribe_after_close_ends_immediately():
+	async def run():
+		bus = EventBus()
+		bus.close()
+		return [event async for event in bus.subscribe()]
+
+	assert asyncio.run(run()) == []
@@ -0,0 +1,91 @@
+import time
+from dataclasses import dataclass
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class AgentEvent(BaseModel):
+	"""
+	Base class for everything published on an EventBus.
+
+	`type`, `message` and `info` mirror the SSE payload shape the streaming API has always sent,
+	so existing clients keep working; subclasses add typed fields on top.
+	Extra keyword arguments are allowed so callers can attach ad-hoc fields (e.g. path=...).
+	"""
+
+	model_config = ConfigDict(extra='allow')
+
+	event: str = 'custom'
+	type: Literal['step', 'error', 'queue', 'status'] = 'step'
+	message: str = ''
+	info: str | None = None
+	session_id: str | None = None
+	timestamp: float = Field(default_factory=time.time)
+
+
+class TaskStartedEvent(AgentEvent):
+	event: str = 'task_started'
+	info: str | None = 'Starting Task'
+	task: str
+
+
+class StepStartedEvent(AgentEvent):
+	event: str = 'step_started'
+	step: int
+	url: str
+	interactive_elements: int
+
+
+class ModelOutputEvent(AgentEvent):
+	event: str = 'model_output'
+	info: str | None = 'Agent Next Task'
+	step: int
+	evaluation_previous_goal: str
+	memory: str
+	next_goal: str
+	actions: list[dict]
+
+
+class ActionResultEvent(AgentEvent):
+	event: str = 'action_result'
+	info: str | None = 'Action Result'
+	step: int
+	action_index: int
+	action_count: int
+	action_name: str
+	is_done: bool = False
+	success: bool | None = None
+	error: str | None = None
+	extracted_content: str | None = None
+
+
+class StepErrorEvent(AgentEvent):
+	event: str = 'step_error'
+	type: Literal['step', 'error', 'queue', 'status'] = 'error'
+	step: int
+	error: str
+	consecutive_failures: int
+
+
+class TaskCompletedEvent(AgentEvent):
+	event: str = 'task_completed'
+	info: str | None = 'Task Completed'
+	success: bool | None
+	final_result: str | None
+	steps: int
+	error: str | None = None
+
+
+class AgentStatusEvent(AgentEvent):
+	event: str = 'agent_status'
+	type: Literal['step', 'error', 'queue', 'status'] = 'status'
+	status: Literal['running', 'paused', 'resumed', 'stopped', 'task_updated']
+
+
+@dataclass(frozen=True, slots=True)
+class SerializedEvent:
+	"""An event together with its JSON encoding, produced once by the bus and shared by every subscriber"""
+
+	event: AgentEvent
+	json: str
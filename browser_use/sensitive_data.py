@@ -0,0 +1,90 @@
+"""
+Handling of Agent(sensitive_data=...) in both directions: redacting the secret values from everything sent to the LLM,
+and filling the <secret>key</secret> placeholders the LLM writes back into action parameters.
+
+Everything that only depends on the sensitive_data dict is compiled once: a single regex alternation over all secret
+values (so redacting a message is one linear scan no matter how many credentials there are), the placeholder for each
+value, and the secrets that apply to each origin. The compiled redactor is kept by the object that uses it (message
+manager, registry), never in a module level cache, so the plaintext secrets go away together with the agent.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from urllib.parse import urlparse
+
+from browser_use.utils import match_url_with_domain_pattern
+
+logger = logging.getLogger(__name__)
+
+SECRET_PLACEHOLDER_RE = re.compile(r'<secret>(.*?)</secret>')
+
+# old format {key: value} or new format {domain_pattern: {key: value}}, both may be mixed
+SensitiveData = dict[str, str | dict[str, str]]
+
+
+class SensitiveDataRedactor:
+	"""Compiled form of a sensitive_data dict, use get_redactor() to only recompile it when the dict changes"""
+
+	def __init__(self, sensitive_data: SensitiveData):
+		self._source = _freeze(sensitive_data)
+		# (domain pattern, or None for old format entries that apply everywhere; their secrets) in the dict's order
+		self._entries: list[tuple[str | None, dict[str, str]]] = []
+		self._placeholders_by_value: dict[str, str] = {}
+		for key_or_domain, content in sensitive_data.items():
+			if isinstance(content, dict):
+				self._entries.append((key_or_domain, content))
+			else:
+				# We treat this as if it was {'http*://*': {key_or_domain: content}}
+				self._entries.append((None, {key_or_domain: content}))
+
+		for _, secrets in self._entries:
+			for key, value in secrets.items():
+				if value:  # Skip empty values
+					self._placeholders_by_value.setdefault(value, f'<secret>{key}</secret>')
+
+		# longest values first, so a secret that contains another one is never left partially visible
+		values = sorted(self._placeholders_by_value, key=len, reverse=True)
+		if not values:
+			logger.warning('No valid entries found in sensitive_data dictionary')
+		self._redact_re = re.compile('|'.join(map(re.escape, values))) if values else None
+		self._secrets_by_origin: dict[tuple[str, str] | None, dict[str, str]] = {}
+
+	def redact(self, text: str) -> str:
+		"""Replace every secret value in text with its <secret>key</secret> placeholder"""
+		if self._redact_re is None:
+			return text
+		return self._redact_re.sub(lambda match: self._placeholders_by_value[match.group(0)], text)
+
+	def secrets_for_url(self, url: str | None) -> dict[str, str]:
+		"""Non-empty secrets usable on url: old format ones everywhere, domain-scoped ones only on matching URLs"""
+		origin = None
+		if url and url != 'about:blank':
+			# match_url_with_domain_pattern only looks at the scheme and hostname
+			parsed_url = urlparse(url)
+			origin = (parsed_url.scheme.lower(), (parsed_url.hostname or '').lower())
+
+		secrets = self._secrets_by_origin.get(origin)
+		if secrets is None:
+			applicable_secrets: dict[str, str] = {}
+			for domain_pattern, entry_secrets in self._entries:
+				if domain_pattern is None:
+					applicable_secrets.update(entry_secrets)
+				elif origin is not None and match_url_with_domain_pattern(url, domain_pattern, log_warnings=True):
+					applicable_secrets.update(entry_secrets)
+			secrets = self._secrets_by_origin[origin] = {k: v for k, v in applicable_secrets.items() if v}
+		return secrets
+
+
+def _freeze(sensitive_data: SensitiveData) -> tuple:
+	return tuple(
+		(key, tuple(content.items()) if isinstance(content, dict) else content) for key, content in sensitive_data.items()
+	)
+
+
+def get_redactor(sensitive_data: SensitiveData, current: SensitiveDataRedactor | None = None) -> SensitiveDataRedactor:
+	"""current if it was compiled from the same contents as sensitive_data, otherwise a newly compiled redactor"""
+	if current is not None and current._source == _freeze(sensitive_data):
+		return current
+	return SensitiveDataRedactor(sensitive_data)
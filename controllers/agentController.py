@@ -1,4 +1,5 @@
 from browser_use import Agent
+from browser_use.events import AgentStatusEvent
 import asyncio
 
 
@@ -11,10 +12,16 @@ class AgentController:
         self.running = False
         self.paused = False
         self._run_task = None
+
+    def _publish_status(self, status: str):
+        """Push a status change to the agent's event bus, if it has one"""
+        if self.agent.event_bus is not None:
+            self.agent.event_bus.publish(AgentStatusEvent(status=status, message=f"Agent {status}", info="Agent Status"))
         
     async def run_agent(self, max_steps=30):
         """Run the agent with control flow for pausing and stopping"""
         self.running = True
+        self._publish_status("running")
         try:
             result = await self.agent.run(max_steps=max_steps)
             return result
@@ -32,6 +39,7 @@ class AgentController:
         if self.running and not self.paused:
             self.agent.pause()
             self.paused = True
+            self._publish_status("paused")
             return True
         return False
     
@@ -40,6 +48,7 @@ class AgentController:
         if self.running and self.paused:
             self.agent.resume()
             self.paused = False
+            self._publish_status("resumed")
             return True
         return False
     
@@ -48,6 +57,7 @@ class AgentController:
         if self.running:
             self.agent.stop()
             self.running = False
+            self._publish_status("stopped")
             return True
         return False
     
@@ -65,5 +75,6 @@ class AgentController:
         """Update the agent's task with new instructions"""
         if self.running and self.paused:
             self.agent.add_new_task(new_task)
+            self._publish_status("task_updated")
             return True
         return False
\ No newline at end of file
@@ -1,5 +1,11 @@
 from fastapi import FastAPI
 from routes import router
+from views import close_browser_pools
 
 main = FastAPI()
-main.include_router(router)
\ No newline at end of file
+main.include_router(router)
+
+
+@main.on_event("shutdown")
+async def shutdown_browser_pools():
+    await close_browser_pools()
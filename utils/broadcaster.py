@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class ClientConnection:
+    """One WebSocket client with its own bounded send queue and sender task"""
+
+    def __init__(self, websocket: WebSocket, session_id: Optional[str] = None, max_queue_size: int = 500):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.max_queue_size = max_queue_size
+        self.pending: deque = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, text: str):
+        """Queue a pre-serialized message, dropping the oldest one if this client is too far behind"""
+        if self.closed:
+            return
+        if len(self.pending) >= self.max_queue_size:
+            self.pending.popleft()
+            self.dropped += 1
+        self.pending.append(text)
+        self._wakeup.set()
+
+    async def _send_loop(self):
+        try:
+            while True:
+                while not self.pending:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                text = self.pending.popleft()
+                await self.websocket.send_text(text)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Stopped sending to websocket client: {type(e).__name__}: {e}")
+        finally:
+            self.closed = True
+
+
+class LogBroadcaster:
+    """
+    Push-based fan-out of log/agent messages to WebSocket clients.
+
+    Each message is serialized once, then handed to every interested client's bounded queue.
+    Every client is drained by its own sender task, so one slow client only ever loses its own
+    oldest messages and never delays anybody else's stream.
+    """
+
+    def __init__(self, max_queue_size: int = 500):
+        self.max_queue_size = max_queue_size
+        self.connections: Set[ClientConnection] = set()
+        self.session_connections: Dict[str, Set[ClientConnection]] = {}
+        self.published = 0
+        # counters of clients that already disconnected, so metrics stay cumulative
+        self._closed_sent = 0
+        self._closed_dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self):
+        """Bind to the running event loop, must be called from inside it (e.g. on app startup)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+
+    def connect(self, websocket: WebSocket, session_id: Optional[str] = None) -> ClientConnection:
+        connection = ClientConnection(websocket, session_id=session_id, max_queue_size=self.max_queue_size)
+        if session_id:
+            self.session_connections.setdefault(session_id, set()).add(connection)
+        else:
+            self.connections.add(connection)
+        connection._task = asyncio.create_task(connection._send_loop())
+        return connection
+
+    def disconnect(self, connection: ClientConnection):
+        if connection not in self.connections and connection not in self.session_connections.get(connection.session_id, ()):
+            return
+        self._closed_sent += connection.sent
+        self._closed_dropped += connection.dropped
+        connection.closed = True
+        if connection._task:
+            connection._task.cancel()
+        if connection.session_id:
+            session_set = self.session_connections.get(connection.session_id)
+            if session_set is not None:
+                session_set.discard(connection)
+                if not session_set:
+                    del self.session_connections[connection.session_id]
+        else:
+            self.connections.discard(connection)
+
+    def publish(self, message_type: str, data: Any):
+        """Broadcast a message, safe to call from any thread (logging handlers, sync actions run in threads)"""
+        if self._loop is None or self._loop.is_closed():
+            return  # not started yet, nobody can be connected
+        if threading.get_ident() == self._loop_thread_id:
+            self._publish(message_type, data)
+        else:
+            self._loop.call_soon_threadsafe(self._publish, message_type, data)
+
+    def _publish(self, message_type: str, data: Any):
+        session_id = data.get("session_id") if isinstance(data, dict) else None
+        targets = list(self.connections)
+        if session_id and session_id in self.session_connections:
+            targets.extend(self.session_connections[session_id])
+        self.published += 1
+        if not targets:
+            return
+
+        text = json.dumps({"type": message_type, "data": data}, ensure_ascii=False, default=str)
+        for connection in targets:
+            if connection.closed:
+                self.disconnect(connection)
+            else:
+                connection.enqueue(text)
+
+    def metrics(self) -> dict:
+        all_connections = list(self.connections) + [c for s in self.session_connections.values() for c in s]
+        depths = [len(c.pending) for c in all_connections]
+        return {
+            "connections": len(self.connections),
+            "session_connections": sum(len(s) for s in self.session_connections.values()),
+            "published": self.published,
+            "sent": self._closed_sent + sum(c.sent for c in all_connections),
+            "dropped": self._closed_dropped + sum(c.dropped for c in all_connections),
+            "max_queue_depth": max(depths, default=0),
+            "total_queue_depth": sum(depths),
+        }
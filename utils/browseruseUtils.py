@@ -5,10 +5,11 @@ import os
 import re
 import uuid
 from datetime import datetime
-from io import StringIO
 from pathlib import Path
 from typing import AsyncGenerator
 
+from browser_use.events import AgentEvent, EventSubscription
+
 # Set up logger
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -142,140 +143,30 @@ def extract_interacted_elements(
 
 
 async def log_streamer(
-    agent_run_future: asyncio.Future, session_id: str
+    agent_run_future: asyncio.Future, session_id: str, scheduled_job=None, event_subscription: EventSubscription = None
 ) -> AsyncGenerator[str, None]:
-    """Session-aware log streamer with isolated loggers"""
-    log_capture = StringIO()
-    handler = logging.StreamHandler(log_capture)
-    formatter = logging.Formatter("%(message)s")
-    handler.setFormatter(formatter)
-
-    # Create session-specific loggers
-    agent_logger = logging.getLogger(f"browser_use.session.{session_id}.agent")
-    controller_logger = logging.getLogger(
-        f"browser_use.session.{session_id}.controller.service"
-    )
-
-    # Prevent propagation to root logger
-    agent_logger.propagate = False
-    controller_logger.propagate = False
-
-    # Add handlers to session loggers
-    agent_logger.addHandler(handler)
-    controller_logger.addHandler(handler)
-    agent_logger.setLevel(logging.INFO)
-    controller_logger.setLevel(logging.INFO)
+    """Stream a session's agent events as SSE, awaiting the event bus directly instead of scraping logs"""
+
+    def sse(event: AgentEvent) -> str:
+        return f"data: {event.model_dump_json(exclude_none=True)}\n\n"
 
     try:
-        yield (
-            f'data: {{"message": "Session Started", "type": "step",'
-            f' "session_id": "{session_id}"}}\n\n'
-        )
+        yield sse(AgentEvent(event="session_started", message="Session Started", session_id=session_id))
 
-        while not agent_run_future.done():
-            await asyncio.sleep(0.1)
-            logs = log_capture.getvalue()
-            if logs:
-                for line in logs.strip().split("\n"):
-                    # Filter out 'Task Status: Unknown' with blank page scenario
-                    if "Task Status: Unknown" in line:
-                        continue
-                    if not line.strip():
-                        continue
-
-                    # Handle 'Agent Memory:'
-                    if line.startswith("🤖 Agent Memory:"):
-                        # parts = line.split(":", 1)
-                        # if len(parts) > 1:
-                        #     info_content = parts[1].strip()
-                        #     if info_content:  # Only send if there's content
-                        #         yield (
-                        #             f'data: {{"message": "{info_content}",'
-                        #             f' "type": "step", "session_id":'
-                        #             f' "{session_id}", "info": "Agent Memory"}}\n\n'
-                        #         )
-                        continue
-
-                    # Handle 'Agent\'s Next Task:'
-                    if line.startswith("🎯 Agent Next Task:"):
-                        parts = line.split(":", 1)
-                        if len(parts) > 1:
-                            next_task = parts[1].strip()
-                            yield (
-                                f'data: {{"message": "{next_task}", "type":'
-                                f' "step", "session_id": "{session_id}", "info":'
-                                f' "Agent Next Task"}}\n\n'
-                            )
-                        continue
-
-                    # Handle 'Agent Task Status:'
-                    if line.startswith("✔️ Task Status:"):
-                        parts = line.split(":", 1)
-                        if len(parts) > 1:
-                            task_status = parts[1].strip()
-                            yield (
-                                f'data: {{"message": "{task_status}", "type":'
-                                f' "step", "session_id": "{session_id}", "info":'
-                                f' "Agent Task Status"}}\n\n'
-                            )
-                        continue
-
-                    # Handle '✨ Starting task:'
-                    if line.startswith("✨ Starting task:"):
-                        parts = line.split(":", 1)
-                        if len(parts) > 1:
-                            task_content = parts[1].strip()
-                            yield (
-                                f'data: {{"message": "Initiating Agents ...",'
-                                f' "type": "step", "session_id":'
-                                f' "{session_id}", "info": "Starting Task"}}\n\n'
-                            )
-                        continue
-
-                    if line.startswith("📄 Result:"):
-                        parts = line.split(":", 1)
-                        if len(parts) > 1:
-                            result_content = parts[1].strip()
-                            yield (
-                                f'data: {{"message": "{result_content}",'
-                                f' "type": "step", "session_id":'
-                                f' "{session_id}", "info": "Task Result"}}\n\n'
-                            )
-                        continue
-
-                    if line.startswith("✅ Task completed"):
-                        yield (
-                            f'data: {{"message": "Task completed", "type":'
-                            f' "step", "session_id": "{session_id}", "info":'
-                            f' "Task Completed"}}\n\n'
-                        )
-
-                    # Filter out 'filepath' lines
-                    if "filepath" in line:
-                        match = re.search(r"filepath\s*:\s*(.+)", line)
-                        if match:
-                            elements_file_path = match.group(1)
-                            yield (
-                                f'data: {{"message": "Test Case Received as'
-                                f' TASK", "type": "step", "path":'
-                                f' "{elements_file_path}", "session_id":'
-                                f' "{session_id}"}}\n\n'
-                            )
-                        continue
-
-
-                log_capture.seek(0)
-                log_capture.truncate()
+        # Report queue position until the scheduler admits the job
+        if scheduled_job is not None:
+            async for position in scheduled_job.positions():
+                yield sse(AgentEvent(event="queue_position", type="queue", message="Waiting in queue", position=position, session_id=session_id))
+
+        # Events are serialized once by the bus, just frame them; iteration ends when the bus is closed
+        if event_subscription is not None:
+            async with event_subscription:
+                async for serialized in event_subscription:
+                    yield f"data: {serialized.json}\n\n"
 
         result = await agent_run_future
-        yield (
-            f'data: {{"message": "Session Ended", "type": "step",'
-            f' "session_id": "{session_id}"}}\n\n'
-        )
+        yield sse(AgentEvent(event="session_ended", message="Session Ended", session_id=session_id))
 
     except Exception as e:
-        yield (
-            f'data: {{"message": "Error occurred: {str(e)}", "type":'
-            f' "error", "session_id": "{session_id}"}}\n\n'
-        )
+        yield sse(AgentEvent(event="session_error", type="error", message=f"Error occurred: {str(e)}", session_id=session_id))
         raise e
@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, List, Optional
+
+import psutil
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the scheduler queue is already at max_queue_size"""
+
+
+@dataclass
+class ScheduledJob:
+    """A unit of work waiting for (or holding) one agent slot"""
+    job_id: str
+    priority: int = 0
+    seq: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    admitted_at: Optional[float] = None
+    position: Optional[int] = None
+    # positions are pushed here while queued, None is pushed once the job is admitted
+    updates: asyncio.Queue = field(default_factory=asyncio.Queue)
+    admitted: asyncio.Event = field(default_factory=asyncio.Event)
+    released: bool = False
+
+    @property
+    def wait_time(self) -> float:
+        return (self.admitted_at or time.monotonic()) - self.enqueued_at
+
+    async def positions(self) -> AsyncGenerator[int, None]:
+        """Yield the job's queue position every time it changes, until the job is admitted"""
+        while True:
+            position = await self.updates.get()
+            if position is None:
+                return
+            yield position
+
+
+class AgentScheduler:
+    """
+    Admission control for agent runs.
+
+    Jobs are admitted in priority order (higher first, FIFO within a priority) while fewer than
+    max_concurrent are running and the host has memory/CPU headroom. Submitting while max_queue_size
+    jobs are already waiting raises QueueFullError so the API can answer 429 instead of launching
+    more browsers than the box can hold.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_queue_size: int = 100,
+        max_memory_percent: Optional[float] = None,
+        max_cpu_percent: Optional[float] = None,
+        resource_poll_interval: float = 1.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue_size = max_queue_size
+        self.max_memory_percent = max_memory_percent
+        self.max_cpu_percent = max_cpu_percent
+        self.resource_poll_interval = resource_poll_interval
+
+        self._queue: List[tuple] = []  # heap of (-priority, seq, job)
+        self._queued: Dict[str, ScheduledJob] = {}
+        self._running: Dict[str, ScheduledJob] = {}
+        self._seq = itertools.count()
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+
+        self.total_admitted = 0
+        self.total_rejected = 0
+        self.total_wait_time = 0.0
+
+    def submit(self, job_id: str, priority: int = 0) -> ScheduledJob:
+        """Queue a job, it is admitted right away if a slot is free"""
+        if job_id in self._queued or job_id in self._running:
+            raise ValueError(f"Job {job_id} is already scheduled")
+        if len(self._queued) >= self.max_queue_size:
+            self.total_rejected += 1
+            raise QueueFullError(f"Scheduler queue is full ({self.max_queue_size} jobs waiting)")
+
+        job = ScheduledJob(job_id=job_id, priority=priority, seq=next(self._seq))
+        heapq.heappush(self._queue, (-priority, job.seq, job))
+        self._queued[job_id] = job
+        self._dispatch()
+        return job
+
+    async def wait(self, job: ScheduledJob) -> None:
+        """Block until the job holds a slot, the job is removed from the queue if the caller is cancelled"""
+        try:
+            await job.admitted.wait()
+        except asyncio.CancelledError:
+            self.release(job)
+            raise
+
+    def release(self, job: ScheduledJob) -> None:
+        """Give back the job's slot, or drop it from the queue if it never got one"""
+        if job.released:
+            return
+        job.released = True
+        if self._running.pop(job.job_id, None) is None and self._queued.pop(job.job_id, None) is not None:
+            # lazily deleted from the heap, _dispatch skips released jobs
+            job.updates.put_nowait(None)
+            self._publish_positions()
+        self._dispatch()
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        job = self._queued.get(job_id)
+        return job.position if job else None
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self._running),
+            "queued": len(self._queued),
+            "max_concurrent": self.max_concurrent,
+            "max_queue_size": self.max_queue_size,
+            "total_admitted": self.total_admitted,
+            "total_rejected": self.total_rejected,
+            "avg_wait_seconds": (self.total_wait_time / self.total_admitted) if self.total_admitted else 0.0,
+        }
+
+    def _has_headroom(self) -> bool:
+        # always let one job through so a busy host can't starve the queue forever
+        if not self._running:
+            return True
+        if self.max_memory_percent is not None and psutil.virtual_memory().percent >= self.max_memory_percent:
+            return False
+        if self.max_cpu_percent is not None and psutil.cpu_percent(interval=None) >= self.max_cpu_percent:
+            return False
+        return True
+
+    def _dispatch(self):
+        admitted_any = False
+        while self._queue and len(self._running) < self.max_concurrent:
+            _, _, job = self._queue[0]
+            if job.released:
+                heapq.heappop(self._queue)
+                continue
+            if not self._has_headroom():
+                self._schedule_retry()
+                break
+            heapq.heappop(self._queue)
+            del self._queued[job.job_id]
+            self._running[job.job_id] = job
+            job.admitted_at = time.monotonic()
+            job.position = None
+            self.total_admitted += 1
+            self.total_wait_time += job.wait_time
+            job.updates.put_nowait(None)
+            job.admitted.set()
+            admitted_any = True
+            logger.info(f"Admitted job {job.job_id} after {job.wait_time:.2f}s ({len(self._running)}/{self.max_concurrent} running)")
+        if admitted_any or self._queued:
+            self._publish_positions()
+
+    def _schedule_retry(self):
+        """Re-check resource headroom later, nothing else would wake the queue up if no job finishes"""
+        if self._retry_handle is None:
+            def retry():
+                self._retry_handle = None
+                self._dispatch()
+            self._retry_handle = asyncio.get_running_loop().call_later(self.resource_poll_interval, retry)
+
+    def _publish_positions(self):
+        waiting = sorted(self._queued.values(), key=lambda job: (-job.priority, job.seq))
+        for position, job in enumerate(waiting, start=1):
+            if job.position != position:
+                job.position = position
+                job.updates.put_nowait(position)
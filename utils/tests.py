@@ -0,0 +1,104 @@
+import asyncio
+import json
+from contextlib import suppress
+
+import pytest
+
+from utils.broadcaster import LogBroadcaster
+from utils.scheduler import AgentScheduler, QueueFullError
+
+
+def test_scheduler_admits_by_priority_and_rejects_when_full():
+    async def run():
+        scheduler = AgentScheduler(max_concurrent=1, max_queue_size=2)
+        running = scheduler.submit("running")
+        low = scheduler.submit("low")
+        high = scheduler.submit("high", priority=5)
+        with pytest.raises(QueueFullError):
+            scheduler.submit("rejected")
+        positions = (scheduler.queue_position("high"), scheduler.queue_position("low"))
+
+        await scheduler.wait(running)
+        scheduler.release(running)
+        await asyncio.wait_for(scheduler.wait(high), timeout=1)
+        return scheduler, low, positions
+
+    scheduler, low, positions = asyncio.run(run())
+    assert positions == (1, 2)
+    assert low.position == 1 and not low.admitted.is_set()
+    stats = scheduler.stats()
+    assert (stats["running"], stats["queued"], stats["total_admitted"], stats["total_rejected"]) == (1, 1, 2, 1)
+
+
+def test_scheduler_cancelled_wait_leaves_the_queue():
+    async def run():
+        scheduler = AgentScheduler(max_concurrent=1)
+        running = scheduler.submit("running")
+        waiting = scheduler.submit("waiting")
+        task = asyncio.create_task(scheduler.wait(waiting))
+        await asyncio.sleep(0)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        scheduler.release(running)
+        return scheduler, waiting
+
+    scheduler, waiting = asyncio.run(run())
+    assert waiting.released and not waiting.admitted.is_set()
+    assert (scheduler.stats()["running"], scheduler.stats()["queued"]) == (0, 0)
+
+
+def test_scheduler_rejects_a_job_id_that_is_already_scheduled():
+    scheduler = AgentScheduler(max_concurrent=1)
+    scheduler.submit("agent")
+    with pytest.raises(ValueError):
+        scheduler.submit("agent")
+    assert scheduler.stats()["running"] == 1
+
+
+class _FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.received = []
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def send_text(self, text: str):
+        await self.unblocked.wait()
+        self.received.append(json.loads(text)["data"]["i"])
+
+
+def test_broadcaster_routes_by_session_and_only_drops_for_slow_clients():
+    async def run():
+        broadcaster = LogBroadcaster(max_queue_size=2)
+        broadcaster.start()
+        everything, session_a, slow_session_b = _FakeWebSocket(), _FakeWebSocket(), _FakeWebSocket(blocked=True)
+        broadcaster.connect(everything)
+        broadcaster.connect(session_a, session_id="a")
+        slow_connection = broadcaster.connect(slow_session_b, session_id="b")
+
+        for i in range(5):
+            broadcaster.publish("log", {"session_id": "b", "i": i})
+            await asyncio.sleep(0)  # the sender tasks run
+        broadcaster.publish("log", {"session_id": "a", "i": "a"})
+        await asyncio.sleep(0.01)
+        received_while_blocked = list(slow_session_b.received)
+
+        slow_session_b.unblocked.set()
+        await asyncio.sleep(0.01)
+        metrics = broadcaster.metrics()
+        broadcaster.disconnect(slow_connection)
+        return everything, session_a, slow_session_b, received_while_blocked, metrics
+
+    everything, session_a, slow_session_b, received_while_blocked, metrics = asyncio.run(run())
+    # the client without a session gets everything, in order, even though another client is stuck
+    assert everything.received == [0, 1, 2, 3, 4, "a"]
+    assert session_a.received == ["a"]
+    assert received_while_blocked == []
+    # 0 was already being sent when it got stuck, 1 and 2 were pushed out of its queue
+    assert slow_session_b.received == [0, 3, 4]
+    assert (metrics["published"], metrics["dropped"], metrics["connections"], metrics["session_connections"]) == (6, 2, 1, 2)
+
+
+# run this with:
+# pytest utils/tests.py
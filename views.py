@@ -17,7 +17,7 @@ from typing import AsyncGenerator, Optional, Dict
 
 # Third-party imports
 from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from langchain_openai import AzureChatOpenAI
@@ -34,8 +34,11 @@ from fileParser.llmclient import LLMClient
 from prompts import EXECUTION_AGENT_FINAL_OUTPUT
 from models.models import CommandQueryModel
 from controllers.agentController import AgentController
+from utils.scheduler import AgentScheduler, QueueFullError
 from browser_use import Agent, Browser, BrowserConfig
 from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.pool import BrowserPool
+from browser_use.events import AgentEvent, EventBus
 
 
 # Load environment variables
@@ -65,7 +68,7 @@ BASE_PROFILE_PATH =  "modules/BUDeveloperAgent/.profiles/browseruse_multi_user_p
 
 
 def get_user_browser_profile(user_id: str, debug_port: str, channel: str = 'chromium', headless: bool = False) -> BrowserProfile:
-   user_id = str("user_edge")
+   # one persistent profile per user, concurrent sessions must never share a user_data_dir (SingletonLock / profile corruption)
    profile_dir = Path(f"{BASE_PROFILE_PATH}/{user_id}")
    profile_dir.mkdir(parents=True, exist_ok=True)
    
@@ -97,6 +100,83 @@ def get_user_browser_profile(user_id: str, debug_port: str, channel: str = 'chro
        channel=channel,
    )
 
+# Warm browser pools, one per headless/headful mode, so requests lease an already-running browser
+# instead of paying the Chromium cold start on every /run-browser-task call
+BROWSER_POOL_MIN_SIZE = int(os.getenv("BROWSER_POOL_MIN_SIZE", "1"))
+BROWSER_POOL_MAX_SIZE = int(os.getenv("BROWSER_POOL_MAX_SIZE", "4"))
+BROWSER_POOL_MAX_RSS_MB = float(os.getenv("BROWSER_POOL_MAX_RSS_MB", "2048"))
+BROWSER_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "50"))
+# number of isolated contexts (sessions) sharing one Chromium process, 1 = one browser per session.
+# A shared browser's debugger port would give access to every session in it, so it is only exposed when this is 1
+BROWSER_POOL_CONTEXTS_PER_BROWSER = int(os.getenv("BROWSER_POOL_CONTEXTS_PER_BROWSER", "1"))
+# static assets (JS bundles, CSS, fonts, images) can be cached on disk and shared by every pooled session.
+# Opt-in: it routes every request of the context, which turns off Chromium's own HTTP cache (see BrowserProfile.http_cache_dir)
+BROWSER_HTTP_CACHE_DIR = os.getenv("BROWSER_HTTP_CACHE_DIR") or None
+BROWSER_HTTP_CACHE_MAX_SIZE_MB = float(os.getenv("BROWSER_HTTP_CACHE_MAX_SIZE_MB", "1024"))
+browser_pools: Dict[bool, BrowserPool] = {}
+
+# Admission control in front of AgentController.start(), bursts queue up instead of launching unbounded browsers
+agent_scheduler = AgentScheduler(
+    max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENT", str(BROWSER_POOL_MAX_SIZE))),
+    max_queue_size=int(os.getenv("AGENT_MAX_QUEUE_SIZE", "100")),
+    max_memory_percent=float(os.getenv("AGENT_MAX_MEMORY_PERCENT", "90")),
+    max_cpu_percent=float(os.getenv("AGENT_MAX_CPU_PERCENT")) if os.getenv("AGENT_MAX_CPU_PERCENT") else None,
+)
+_browser_pools_lock = asyncio.Lock()
+
+
+def get_pooled_browser_profile(channel: str = 'chromium', headless: bool = False) -> BrowserProfile:
+    """Profile for a pooled browser, each one gets its own debugger port and no shared user_data_dir"""
+    debug_port = get_free_port()
+    return BrowserProfile(
+        user_data_dir=None,
+        headless=headless,
+        args=[
+            f'--remote-debugging-port={debug_port}',
+            '--no-first-run',
+            '--disable-default-apps',
+            '--new-tab-page-url=about:blank',
+            '--homepage=about:blank'
+        ],
+        channel=channel,
+        http_cache_dir=BROWSER_HTTP_CACHE_DIR,
+        http_cache_max_size_mb=BROWSER_HTTP_CACHE_MAX_SIZE_MB,
+    )
+
+
+def get_debug_port(browser_profile: BrowserProfile) -> Optional[int]:
+    """Read the --remote-debugging-port a pooled browser was launched with"""
+    for arg in browser_profile.args:
+        if arg.startswith('--remote-debugging-port='):
+            return int(arg.split('=', 1)[1])
+    return None
+
+
+async def get_browser_pool(headless: bool) -> BrowserPool:
+    """Return the warm pool for this mode, starting it on first use"""
+    async with _browser_pools_lock:
+        if headless not in browser_pools:
+            pool = BrowserPool(
+                profile_factory=lambda: get_pooled_browser_profile(channel='chromium', headless=headless),
+                min_size=BROWSER_POOL_MIN_SIZE,
+                max_size=BROWSER_POOL_MAX_SIZE,
+                max_rss_mb=BROWSER_POOL_MAX_RSS_MB,
+                max_uses=BROWSER_POOL_MAX_USES,
+                contexts_per_browser=BROWSER_POOL_CONTEXTS_PER_BROWSER,
+            )
+            await pool.start()
+            browser_pools[headless] = pool
+        return browser_pools[headless]
+
+
+async def close_browser_pools():
+    """Shut down every pooled browser, called on application shutdown"""
+    async with _browser_pools_lock:
+        for pool in browser_pools.values():
+            await pool.close()
+        browser_pools.clear()
+
+
 # 
 @apply_decorators([exceptionHandler(returnVal='api')])
 async def execute_task_stream(request: Request, query_model: CommandQueryModel):
@@ -119,6 +199,7 @@ async def execute_task_stream(request: Request, query_model: CommandQueryModel):
         
         # Create a session ID for this execution
         session_id = data.get("session_id", str(uuid.uuid4()))
+        priority = int(data.get("priority", 0))
         logs_dir = f"./modules/BUDeveloperAgent/logs/session_{session_id}"
         os.makedirs(logs_dir, exist_ok=True)
 
@@ -175,12 +256,22 @@ async def execute_task_stream(request: Request, query_model: CommandQueryModel):
         #         instruction +=  f"If the user is not logged in, use the credentials {username} and {password}"
 
         # Define the agent executor
+        # Structured event stream for this session, subscribed before the agent starts so no event is missed
+        event_bus = EventBus(session_id=session_id)
+        event_subscription = event_bus.subscribe()
+
         async def agent_executor():
+            browser_pool = None
+            browser_session = None
             try:
+                # wait for a free agent slot, queue position events are streamed meanwhile
+                await agent_scheduler.wait(scheduled_job)
 
-                debug_port = get_free_port()
+                browser_pool = await get_browser_pool(headless)
+                browser_session = await browser_pool.acquire()
+                # the browser's debugger port controls every context in it, never hand it out for a shared browser
+                debug_port = get_debug_port(browser_session.browser_profile) if BROWSER_POOL_CONTEXTS_PER_BROWSER == 1 else None
                 print(f"Using debugger port: {debug_port}")
-                user_profile_config = get_user_browser_profile(user_id= 'Default', debug_port=debug_port, channel='chromium', headless=headless)
 
                 active_sessions[session_id] = {
                     "debugger_port": debug_port,
@@ -207,7 +298,8 @@ async def execute_task_stream(request: Request, query_model: CommandQueryModel):
                     # browser=browser,
                     generate_gif=False,
                     enable_memory=False,
-                    browser_profile=user_profile_config,
+                    browser_session=browser_session,
+                    event_bus=event_bus,
                     # planner_llm=llm,
                     # planner_interval=5,
                     # use_vision_for_planner=True,
@@ -238,36 +330,63 @@ async def execute_task_stream(request: Request, query_model: CommandQueryModel):
                     # Extract elements
                     elements_file_path = generate_unique_filename(f"{logs_dir}/elements", "json")
                     elements_file_path = extract_interacted_elements(cleaned_history_path, elements_file_path)
-                    await asyncio.sleep(1)
                     agent_logger.info(f"filepath : {elements_file_path}")
+                    event_bus.publish(AgentEvent(event="elements_file", message="Test Case Received as TASK", path=elements_file_path))
 
             except Exception as e:
                 agent_logger.error(f"Error in agent execution: {str(e)}")
+                event_bus.publish(AgentEvent(event="execution_failed", type="error", message=f"TEST_CASE_EXECUTION_FAILED: {str(e)}"))
                 return {"error": True, "msg": "TEST_CASE_EXECUTION_FAILED", "data": {"error": str(e)}}
             finally:
-                # Cleanup browser resources
                 try:
-                    if session_id in active_agent_controllers:
-                        print("Cleaning up session: ", session_id)
-                        del active_agent_controllers[session_id]
-                    # import time
-                    # time.sleep(10)
-                    # if browser:
-                        print("Closing browser")
-                        # await asyncio.wait_for(browser.close(), timeout=60.0)
-                except asyncio.TimeoutError:
-                    agent_logger.warning("Browser close timed out, forcing cleanup")
-                except Exception as e:
-                    agent_logger.debug(f"Error during browser cleanup: {str(e)}")
-                finally:    
-                    # del browser
-                    gc.collect()
-                if session_id in active_sessions:
-                    del active_sessions[session_id]
+                    event_bus.close()
+                    # Cleanup browser resources
+                    try:
+                        if session_id in active_agent_controllers:
+                            print("Cleaning up session: ", session_id)
+                            del active_agent_controllers[session_id]
+                        # import time
+                        # time.sleep(10)
+                        # if browser:
+                            print("Closing browser")
+                            # await asyncio.wait_for(browser.close(), timeout=60.0)
+                    except asyncio.TimeoutError:
+                        agent_logger.warning("Browser close timed out, forcing cleanup")
+                    except Exception as e:
+                        agent_logger.debug(f"Error during browser cleanup: {str(e)}")
+                    finally:    
+                        # hand the browser back to the warm pool, it gets reset to about:blank with empty storage
+                        if browser_pool and browser_session:
+                            if browser_session.http_cache:
+                                agent_logger.info(f"HTTP cache: {browser_session.http_cache.stats().model_dump()}")
+                            await browser_pool.release(browser_session)
+                        gc.collect()
+                finally:
+                    # the admission slot must be given back even if releasing the browser failed or was cancelled,
+                    # otherwise leaked slots make every later request queue forever
+                    if session_id in active_sessions:
+                        del active_sessions[session_id]
+                    agent_scheduler.release(scheduled_job)
+
+        try:
+            scheduled_job = agent_scheduler.submit(session_id, priority=priority)
+        except QueueFullError as e:
+            agent_logger.warning(f"Rejecting session {session_id}: {str(e)}")
+            return JSONResponse(
+                status_code=429,
+                content={"error": True, "msg": "QUEUE_FULL", "data": {"error": str(e), "scheduler": agent_scheduler.stats()}},
+            )
+        except ValueError as e:
+            return JSONResponse(
+                status_code=409,
+                content={"error": True, "msg": "SESSION_ALREADY_RUNNING", "data": {"error": str(e)}},
+            )
 
         # Run the agent executor
         agent_run_future = asyncio.ensure_future(agent_executor())
-        return StreamingResponse(log_streamer(agent_run_future, session_id), media_type="text/event-stream")
+        return StreamingResponse(
+            log_streamer(agent_run_future, session_id, scheduled_job, event_subscription), media_type="text/event-stream"
+        )
 
     except json.JSONDecodeError as e:
         agent_logger.error(f"Invalid JSON format in request: {str(e)}")